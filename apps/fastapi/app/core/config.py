@@ -27,6 +27,86 @@ class Settings(BaseSettings):
     POSTGRES_DB: str = os.getenv("POSTGRES_DB", "vibecode")
     DATABASE_URL: str = f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_SERVER}/{POSTGRES_DB}"
 
+    # Kubernetes settings
+    KUBERNETES_MAX_CONCURRENCY: int = int(os.getenv("KUBERNETES_MAX_CONCURRENCY", "16"))  # Max in-flight API calls from async handlers
+    KUBERNETES_INFORMER_ENABLED: bool = os.getenv("KUBERNETES_INFORMER_ENABLED", "true").lower() == "true"  # Serve status reads from a watch cache
+    KUBERNETES_WATCH_TIMEOUT_SECONDS: int = int(os.getenv("KUBERNETES_WATCH_TIMEOUT_SECONDS", "300"))  # Server-side timeout of each watch request
+    KUBERNETES_READ_QPS: float = float(os.getenv("KUBERNETES_READ_QPS", "50"))  # Sustained read requests per second; 0 disables the limit
+    KUBERNETES_READ_BURST: int = int(os.getenv("KUBERNETES_READ_BURST", "100"))  # Reads allowed at once above the sustained rate
+    KUBERNETES_WRITE_QPS: float = float(os.getenv("KUBERNETES_WRITE_QPS", "20"))  # Sustained write requests per second; 0 disables the limit
+    KUBERNETES_WRITE_BURST: int = int(os.getenv("KUBERNETES_WRITE_BURST", "40"))  # Writes allowed at once above the sustained rate
+    KUBERNETES_RETRY_MAX_ATTEMPTS: int = int(os.getenv("KUBERNETES_RETRY_MAX_ATTEMPTS", "5"))  # Attempts per request, the first included
+    KUBERNETES_RETRY_BASE_DELAY_SECONDS: float = float(os.getenv("KUBERNETES_RETRY_BASE_DELAY_SECONDS", "0.2"))  # Backoff before the first retry, doubled after each
+    KUBERNETES_RETRY_MAX_DELAY_SECONDS: float = float(os.getenv("KUBERNETES_RETRY_MAX_DELAY_SECONDS", "10"))  # Cap on backoff and on honored Retry-After
+    KUBERNETES_POOL_MAXSIZE: int = int(os.getenv("KUBERNETES_POOL_MAXSIZE", "64"))  # Pooled connections to the API server for regular requests
+    KUBERNETES_STREAM_POOL_MAXSIZE: int = int(os.getenv("KUBERNETES_STREAM_POOL_MAXSIZE", "32"))  # Pooled connections for watches and log follows
+    KUBERNETES_POOL_TIMEOUT_SECONDS: float = float(os.getenv("KUBERNETES_POOL_TIMEOUT_SECONDS", "10"))  # Max wait for a free pooled connection
+    KUBERNETES_TCP_KEEPALIVE_SECONDS: int = int(os.getenv("KUBERNETES_TCP_KEEPALIVE_SECONDS", "30"))  # Idle time before TCP keep-alive probes
+    KUBERNETES_CONNECT_TIMEOUT_SECONDS: float = float(os.getenv("KUBERNETES_CONNECT_TIMEOUT_SECONDS", "5"))  # Connect deadline of every request
+    KUBERNETES_READ_TIMEOUT_SECONDS: float = float(os.getenv("KUBERNETES_READ_TIMEOUT_SECONDS", "30"))  # Default read deadline of a request
+    KUBERNETES_STATUS_TIMEOUT_SECONDS: float = float(os.getenv("KUBERNETES_STATUS_TIMEOUT_SECONDS", "5"))  # Read deadline of status reads
+
+    # Warm pool settings
+    WARM_POOL_ENABLED: bool = os.getenv("WARM_POOL_ENABLED", "true").lower() == "true"  # Start projects on pre-started runtime pods
+    WARM_POOL_SIZES: str = os.getenv("WARM_POOL_SIZES", "python=2,javascript=2,go=1,java=0")  # Idle pods kept per language
+    WARM_POOL_HANDOFF_TIMEOUT_SECONDS: int = int(os.getenv("WARM_POOL_HANDOFF_TIMEOUT_SECONDS", "600"))  # Max wait for the Deployment before a claimed pod is removed
+
+    # Runtime image settings
+    RUNTIME_IMAGE_PINNING_ENABLED: bool = os.getenv("RUNTIME_IMAGE_PINNING_ENABLED", "true").lower() == "true"  # Run runtime images by the digest their tag resolved to
+    RUNTIME_IMAGE_PREPULL_ENABLED: bool = os.getenv("RUNTIME_IMAGE_PREPULL_ENABLED", "true").lower() == "true"  # Keep runtime images on every node with a DaemonSet
+    RUNTIME_IMAGE_REFRESH_INTERVAL_SECONDS: int = int(os.getenv("RUNTIME_IMAGE_REFRESH_INTERVAL_SECONDS", "3600"))  # Seconds between re-resolving tags to digests
+    RUNTIME_IMAGE_RESOLVE_TIMEOUT_SECONDS: float = float(os.getenv("RUNTIME_IMAGE_RESOLVE_TIMEOUT_SECONDS", "5"))  # Deadline of each registry request
+    RUNTIME_IMAGE_REGISTRY_URLS: str = os.getenv("RUNTIME_IMAGE_REGISTRY_URLS", "docker.io=https://registry-1.docker.io")  # API URL per registry host as "host=url,..."; others use https://host
+    RUNTIME_IMAGE_PAUSE_IMAGE: str = os.getenv("RUNTIME_IMAGE_PAUSE_IMAGE", "registry.k8s.io/pause:3.9")  # Main container of the pre-pull DaemonSet
+
+    # Scale-to-zero settings
+    IDLE_SCALE_TO_ZERO_ENABLED: bool = os.getenv("IDLE_SCALE_TO_ZERO_ENABLED", "true").lower() == "true"  # Stop projects without recent activity
+    IDLE_TIMEOUT_SECONDS: int = int(os.getenv("IDLE_TIMEOUT_SECONDS", "1800"))  # Inactivity before a project is scaled to zero
+    IDLE_SWEEP_INTERVAL_SECONDS: int = int(os.getenv("IDLE_SWEEP_INTERVAL_SECONDS", "60"))  # Seconds between idle checks
+    ACTIVATOR_WAKE_TIMEOUT_SECONDS: int = int(os.getenv("ACTIVATOR_WAKE_TIMEOUT_SECONDS", "120"))  # Max time a preview request waits for a project to wake
+
+    # Hibernation settings
+    OBJECT_STORE_PATH: str = os.getenv("OBJECT_STORE_PATH", "/var/lib/vibecode/objects")  # Root of the local content-addressed object store
+    OBJECT_STORE_DURABLE: bool = os.getenv("OBJECT_STORE_DURABLE", "false").lower() == "true"  # OBJECT_STORE_PATH is a persistent volume every API replica mounts; hibernation requires it
+    DATA_HELPER_IMAGE: str = os.getenv("DATA_HELPER_IMAGE", "busybox:1.36")  # Image of the pod that copies PVC data in and out
+    HIBERNATE_TIMEOUT_SECONDS: int = int(os.getenv("HIBERNATE_TIMEOUT_SECONDS", "600"))  # Max time of each hibernate/restore phase
+
+    # File delivery settings
+    FILE_DELIVERY_MODE: str = os.getenv("FILE_DELIVERY_MODE", "configmap")  # "configmap", or "bundle" for a tarball unpacked by an init container
+    BUNDLE_BASE_URL: str = os.getenv("BUNDLE_BASE_URL", "http://vibecode-fastapi.vibecode.svc.cluster.local:8000")  # In-cluster URL of this API, used by bundle init containers
+
+    # Hot file sync settings
+    FILE_SYNC_TIMEOUT_SECONDS: int = int(os.getenv("FILE_SYNC_TIMEOUT_SECONDS", "10"))  # Per-pod limit for pushing changed files
+    FILE_SYNC_RELOAD_HOOK: str = os.getenv("FILE_SYNC_RELOAD_HOOK", ".vibecode/reload.sh")  # Script in the project run after a sync, if present
+
+    # Teardown settings
+    TEARDOWN_TIMEOUT_SECONDS: int = int(os.getenv("TEARDOWN_TIMEOUT_SECONDS", "600"))  # Max time a bulk teardown is tracked until objects are gone
+    TEARDOWN_POLL_INTERVAL_SECONDS: int = int(os.getenv("TEARDOWN_POLL_INTERVAL_SECONDS", "5"))  # Seconds between checks for remaining objects
+    TEARDOWN_HANDLES_KEPT: int = int(os.getenv("TEARDOWN_HANDLES_KEPT", "100"))  # Finished teardowns kept for status queries
+
+    # Provisioning scheduler settings
+    PROVISIONING_MAX_CONCURRENCY: int = int(os.getenv("PROVISIONING_MAX_CONCURRENCY", "10"))  # Projects provisioned at once
+    PROVISIONING_INTERACTIVE_RESERVED: int = int(os.getenv("PROVISIONING_INTERACTIVE_RESERVED", "2"))  # Slots only interactive starts may use
+    PROVISIONING_INTERACTIVE_TIMEOUT_SECONDS: float = float(os.getenv("PROVISIONING_INTERACTIVE_TIMEOUT_SECONDS", "60"))  # Max queue wait of an interactive start
+    PROVISIONING_QUOTA_CHECK_ENABLED: bool = os.getenv("PROVISIONING_QUOTA_CHECK_ENABLED", "true").lower() == "true"  # Hold requests that exceed the namespace ResourceQuota
+    PROVISIONING_NODE_CHECK_ENABLED: bool = os.getenv("PROVISIONING_NODE_CHECK_ENABLED", "true").lower() == "true"  # Hold requests no node has room for; disable with a cluster autoscaler
+    PROVISIONING_CAPACITY_TTL_SECONDS: float = float(os.getenv("PROVISIONING_CAPACITY_TTL_SECONDS", "10"))  # Age at which the capacity snapshot is re-read
+    PROVISIONING_OWNER_WEIGHTS: str = os.getenv("PROVISIONING_OWNER_WEIGHTS", "")  # Fair-share weights as "owner_id=2,other_id=0.5"; default 1
+
+    # Orphan GC settings
+    ORPHAN_GC_ENABLED: bool = os.getenv("ORPHAN_GC_ENABLED", "true").lower() == "true"  # Periodically delete resources of projects missing from the database
+    ORPHAN_GC_INTERVAL_SECONDS: int = int(os.getenv("ORPHAN_GC_INTERVAL_SECONDS", "3600"))  # Seconds between collections
+    ORPHAN_GC_MIN_AGE_SECONDS: int = int(os.getenv("ORPHAN_GC_MIN_AGE_SECONDS", "900"))  # Projects with younger objects are left alone (may still be provisioning)
+    ORPHAN_GC_PAGE_SIZE: int = int(os.getenv("ORPHAN_GC_PAGE_SIZE", "500"))  # Objects per list page
+    ORPHAN_GC_BATCH_SIZE: int = int(os.getenv("ORPHAN_GC_BATCH_SIZE", "100"))  # Orphaned projects deleted per batch
+    ORPHAN_GC_BATCH_DELAY_SECONDS: float = float(os.getenv("ORPHAN_GC_BATCH_DELAY_SECONDS", "2"))  # Pause between delete batches
+    ORPHAN_GC_DRY_RUN: bool = os.getenv("ORPHAN_GC_DRY_RUN", "true").lower() == "true"  # Report orphans without deleting them; set to false to reclaim
+    ORPHAN_GC_DELETE_PVCS: bool = os.getenv("ORPHAN_GC_DELETE_PVCS", "false").lower() == "true"  # Also delete orphaned project volumes (user data, not recoverable)
+
+    # Log cache settings
+    LOG_CACHE_PROJECT_MAX_BYTES: int = int(os.getenv("LOG_CACHE_PROJECT_MAX_BYTES", str(1024 * 1024)))  # Log bytes buffered per project
+    LOG_CACHE_TOTAL_MAX_BYTES: int = int(os.getenv("LOG_CACHE_TOTAL_MAX_BYTES", str(64 * 1024 * 1024)))  # Log bytes buffered across projects
+
     model_config = SettingsConfigDict(env_file=".env", case_sensitive=True, extra="allow")
 
 settings = Settings()
@@ -0,0 +1,304 @@
+from kubernetes.client.rest import ApiException
+from typing import Dict, List, Optional, Any, Callable
+import logging
+import random
+import threading
+import time
+
+from app.core.config import settings
+from app.core.raw_api import RawWatch, call_raw
+from app.core.reconciler import live_spec_hash, set_cache_lookup
+from app.core.kubernetes import (
+    KubernetesClient,
+    stream_core_v1_api,
+    stream_apps_v1_api,
+)
+from app.core.kubernetes_provider import get_namespace
+
+logger = logging.getLogger(__name__)
+
+# Label selector shared by every object the API creates for a project
+VIBECODE_LABEL_SELECTOR = "app=vibecode"
+PROJECT_ID_LABEL = "project-id"
+
+# Backoff bounds (seconds) between failed list/watch attempts
+MIN_RETRY_DELAY = 1.0
+MAX_RETRY_DELAY = 30.0
+
+
+class ProjectResourceIndex:
+    """Thread-safe in-memory index of vibecode objects keyed by project id.
+
+    Objects are stored already summarized (the same dicts get_project_resources
+    returns) together with their spec hash annotation, so reads are plain
+    dictionary lookups.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # kind -> project id -> object name -> {"summary", "spec_hash"}
+        self._objects: Dict[str, Dict[str, Dict[str, Dict[str, Any]]]] = {}
+
+    def replace(self, kind: str, entries: List[Dict[str, Any]]) -> None:
+        """Replace every object of a kind, used after a full list"""
+        by_project: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for entry in entries:
+            by_project.setdefault(entry["project_id"], {})[entry["name"]] = {
+                "summary": entry["summary"],
+                "spec_hash": entry["spec_hash"],
+            }
+        with self._lock:
+            self._objects[kind] = by_project
+
+    def upsert(self, kind: str, project_id: str, name: str, summary: Dict[str, Any], spec_hash: Optional[str] = None) -> None:
+        """Add or update a single object"""
+        with self._lock:
+            self._objects.setdefault(kind, {}).setdefault(project_id, {})[name] = {
+                "summary": summary,
+                "spec_hash": spec_hash,
+            }
+
+    def remove(self, kind: str, project_id: str, name: str) -> None:
+        """Remove a single object"""
+        with self._lock:
+            project_objects = self._objects.get(kind, {}).get(project_id)
+            if project_objects is None:
+                return
+            project_objects.pop(name, None)
+            if not project_objects:
+                del self._objects[kind][project_id]
+
+    def get(self, kind: str, project_id: str) -> Dict[str, Dict[str, Any]]:
+        """Get the summaries of the objects of a kind that belong to a project"""
+        with self._lock:
+            entries = self._objects.get(kind, {}).get(project_id, {})
+            return {name: entry["summary"] for name, entry in entries.items()}
+
+    def get_entry(self, kind: str, project_id: str, name: str) -> Optional[Dict[str, Any]]:
+        """Get the summary and spec hash of a single object"""
+        with self._lock:
+            return self._objects.get(kind, {}).get(project_id, {}).get(name)
+
+    def project_ids(self) -> List[str]:
+        """Get every project id that has at least one indexed object"""
+        with self._lock:
+            ids = set()
+            for by_project in self._objects.values():
+                ids.update(by_project.keys())
+        return sorted(ids)
+
+
+class ResourceInformer:
+    """List-then-watch loop for one resource kind.
+
+    The loop lists every matching object, then watches from the list's
+    resourceVersion. When the watch times out or the connection drops it
+    resumes from the last resourceVersion it saw; only when the server reports
+    that version as expired (410 Gone) does it fall back to a full relist.
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        list_func: Callable[..., Any],
+        summarize: Callable[[Any], Dict[str, Any]],
+        index: ProjectResourceIndex,
+    ):
+        self.kind = kind
+        self.list_func = list_func
+        self.summarize = summarize
+        self.index = index
+        self.resource_version: Optional[str] = None
+        self.synced = threading.Event()
+        self._stop = threading.Event()
+        self._watch: Optional[RawWatch] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the informer loop in a daemon thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name=f"informer-{self.kind}", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the informer loop"""
+        self._stop.set()
+        if self._watch:
+            self._watch.stop()
+
+    def _entry(self, obj: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Build an index entry for an object, skipping ones without a project id"""
+        labels = obj["metadata"].get("labels") or {}
+        project_id = labels.get(PROJECT_ID_LABEL)
+        if not project_id:
+            return None
+        return {
+            "project_id": project_id,
+            "name": obj["metadata"]["name"],
+            "summary": self.summarize(obj),
+            "spec_hash": live_spec_hash(obj),
+        }
+
+    def _list(self) -> None:
+        """List every object of this kind and reset the index for it"""
+        response = call_raw(
+            self.list_func, namespace=get_namespace(), label_selector=VIBECODE_LABEL_SELECTOR
+        )
+        entries = [entry for entry in (self._entry(obj) for obj in response["items"]) if entry]
+        self.index.replace(self.kind, entries)
+        self.resource_version = response["metadata"]["resourceVersion"]
+        self.synced.set()
+        logger.info(f"Informer for {self.kind} listed {len(entries)} objects at resourceVersion {self.resource_version}")
+
+    def _watch_once(self) -> None:
+        """Watch from the current resourceVersion until the server ends the stream"""
+        # Events are parsed straight into dicts, like the list above
+        self._watch = RawWatch()
+        for event in self._watch.stream(
+            self.list_func,
+            namespace=get_namespace(),
+            label_selector=VIBECODE_LABEL_SELECTOR,
+            resource_version=self.resource_version,
+            timeout_seconds=settings.KUBERNETES_WATCH_TIMEOUT_SECONDS,
+            allow_watch_bookmarks=True,
+        ):
+            event_type = event["type"]
+            if event_type == "BOOKMARK":
+                # Bookmarks only carry a newer resourceVersion
+                self.resource_version = event["raw_object"]["metadata"]["resourceVersion"]
+                continue
+
+            obj = event["object"]
+            self.resource_version = obj["metadata"]["resourceVersion"]
+            entry = self._entry(obj)
+            if entry is None:
+                continue
+            if event_type == "DELETED":
+                self.index.remove(self.kind, entry["project_id"], entry["name"])
+            else:
+                self.index.upsert(
+                    self.kind, entry["project_id"], entry["name"], entry["summary"], entry["spec_hash"]
+                )
+
+            if self._stop.is_set():
+                break
+
+    def _run(self) -> None:
+        delay = MIN_RETRY_DELAY
+        while not self._stop.is_set():
+            try:
+                if self.resource_version is None:
+                    self._list()
+                self._watch_once()
+                delay = MIN_RETRY_DELAY
+            except ApiException as e:
+                if e.status == 410:  # Gone - resourceVersion too old, relist
+                    logger.info(f"Informer for {self.kind} resourceVersion expired, relisting")
+                    self.resource_version = None
+                    continue
+                logger.error(f"Informer for {self.kind} failed: {e}")
+                self._stop.wait(delay + random.uniform(0, delay))
+                delay = min(delay * 2, MAX_RETRY_DELAY)
+            except Exception as e:
+                logger.error(f"Informer for {self.kind} failed: {e}")
+                self._stop.wait(delay + random.uniform(0, delay))
+                delay = min(delay * 2, MAX_RETRY_DELAY)
+
+
+class ClusterInformer:
+    """Informers for every kind the API creates for a project, sharing one index"""
+
+    def __init__(self):
+        self.index = ProjectResourceIndex()
+        self.informers = {
+            "deployment": ResourceInformer(
+                "deployment", stream_apps_v1_api.list_namespaced_deployment,
+                KubernetesClient.summarize_deployment, self.index,
+            ),
+            "service": ResourceInformer(
+                "service", stream_core_v1_api.list_namespaced_service,
+                KubernetesClient.summarize_service, self.index,
+            ),
+            "pvc": ResourceInformer(
+                "pvc", stream_core_v1_api.list_namespaced_persistent_volume_claim,
+                KubernetesClient.summarize_pvc, self.index,
+            ),
+            "configmap": ResourceInformer(
+                "configmap", stream_core_v1_api.list_namespaced_config_map,
+                KubernetesClient.summarize_configmap, self.index,
+            ),
+            "pods": ResourceInformer(
+                "pods", stream_core_v1_api.list_namespaced_pod,
+                KubernetesClient.summarize_pod, self.index,
+            ),
+        }
+
+    def start(self) -> None:
+        """Start all informers and let the reconciler consult the cache"""
+        for informer in self.informers.values():
+            informer.start()
+        set_cache_lookup(self.lookup)
+        logger.info("Started cluster informers")
+
+    def stop(self) -> None:
+        """Stop all informers"""
+        set_cache_lookup(None)
+        for informer in self.informers.values():
+            informer.stop()
+        logger.info("Stopped cluster informers")
+
+    def lookup(self, kind: str, project_id: str, name: str) -> Optional[Dict[str, Any]]:
+        """Get the cached summary and spec hash of an object, if its informer has synced"""
+        informer = self.informers.get(kind)
+        if informer is None or not informer.synced.is_set():
+            return None
+        return self.index.get_entry(kind, project_id, name)
+
+    def has_synced(self) -> bool:
+        """Whether every informer has completed its initial list"""
+        return all(informer.synced.is_set() for informer in self.informers.values())
+
+    def get_project_resources(self, project_id: str) -> Dict[str, Any]:
+        """Get all Kubernetes resources for a project from the cache.
+
+        Returns the same structure as KubernetesClient.get_project_resources.
+        """
+        resource_names = KubernetesClient.generate_resource_names(project_id)
+        results = {}
+        for kind in ("deployment", "service", "pvc", "configmap"):
+            results[kind] = self.index.get(kind, project_id).get(resource_names[kind])
+        pods = self.index.get("pods", project_id)
+        results["pods"] = [pods[name] for name in sorted(pods)]
+        return results
+
+    def running_project_ids(self) -> List[str]:
+        """Get the ids of projects whose Deployment wants at least one replica"""
+        running = []
+        for project_id in self.index.project_ids():
+            resource_names = KubernetesClient.generate_resource_names(project_id)
+            deployment = self.index.get("deployment", project_id).get(resource_names["deployment"])
+            if deployment and deployment["replicas"]:
+                running.append(project_id)
+        return running
+
+
+_cluster_informer: Optional[ClusterInformer] = None
+_cluster_informer_lock = threading.Lock()
+
+
+def get_cluster_informer() -> ClusterInformer:
+    """Get the shared informer, started on application startup.
+
+    Created on first use: building the informers binds the list calls of
+    the Kubernetes backend, which must not be loaded at import.
+    """
+    global _cluster_informer
+    if _cluster_informer is None:
+        with _cluster_informer_lock:
+            if _cluster_informer is None:
+                _cluster_informer = ClusterInformer()
+    return _cluster_informer
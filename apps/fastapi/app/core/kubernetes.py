@@ -1,42 +1,40 @@
-from kubernetes import client, config
+from kubernetes import client
 from kubernetes.client.rest import ApiException
-from typing import Dict, List, Optional, Any, Tuple
+from kubernetes.stream import stream
+from typing import Dict, List, Optional, Any, Tuple, Callable, AsyncIterator
 from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+import asyncio
+import codecs
+import functools
+import hashlib
+import heapq
 import logging
+import threading
 import os
 import yaml
 import json
 import time
+import urllib3
+
+from app.core.config import settings
+from app.core.reconciler import reconcile
+from app.core.request_layer import request_timeout
+from app.core.raw_api import call_raw, merge_patch_raw, format_timestamp, parse_timestamp
+from app.core.quantity import parse_quantity
+from app.core.kubernetes_provider import kubernetes_provider, get_namespace, LazyApi
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Load Kubernetes configuration
-try:
-    # Try to load in-cluster configuration (when running inside a pod)
-    config.load_incluster_config()
-    logger.info("Loaded in-cluster Kubernetes configuration")
-except config.ConfigException:
-    try:
-        # Fall back to kubeconfig for local development
-        config.load_kube_config()
-        logger.info("Loaded kubeconfig configuration")
-    except config.ConfigException:
-        logger.error("Could not configure Kubernetes client")
-        raise
-
-# Initialize API clients
-core_v1_api = client.CoreV1Api()
-apps_v1_api = client.AppsV1Api()
-
-# Get the current namespace
-try:
-    with open("/var/run/secrets/kubernetes.io/serviceaccount/namespace", "r") as f:
-        NAMESPACE = f.read().strip()
-except FileNotFoundError:
-    NAMESPACE = "vibecode"  # Default namespace for local development
-    logger.warning(f"Using default namespace: {NAMESPACE}")
+# API clients and the namespace are resolved by the provider on first use,
+# so importing this module needs no cluster configuration
+core_v1_api = LazyApi("core_v1_api")
+apps_v1_api = LazyApi("apps_v1_api")
+stream_core_v1_api = LazyApi("stream_core_v1_api")
+stream_apps_v1_api = LazyApi("stream_apps_v1_api")
 
 # Constants
 DEFAULT_CONTAINER_IMAGE = "python:3.9-slim"
@@ -47,8 +45,128 @@ DEFAULT_CPU_REQUEST = "100m"
 DEFAULT_MEMORY_REQUEST = "128Mi"
 DEFAULT_STORAGE_SIZE = "1Gi"
 DEFAULT_STORAGE_CLASS = "standard"
+RESTARTED_AT_ANNOTATION = "kubectl.kubernetes.io/restartedAt"
+ROLLOUT_POLL_INTERVAL = 1.0
+LOG_STREAM_QUEUE_SIZE = 64  # Chunks buffered per log stream before reads pause
+
+# Resource kinds reported by get_project_resources, with their display names
+PROJECT_RESOURCE_KINDS = {
+    "deployment": "Deployment",
+    "service": "Service",
+    "pvc": "PVC",
+    "configmap": "ConfigMap",
+    "pods": "Pods",
+}
+
+# Init container that unpacks a project's file bundle into /app/src
+BUNDLE_FETCH_CONTAINER = "fetch-files"
+
+# Warm pool pods: one Deployment per runtime keeps idle pods ready to be
+# claimed by a project. A pod is claimed by flipping its state label, which
+# also takes it out of the pool Deployment's selector so it gets replaced.
+POOL_APP_LABEL = "vibecode-pool"
+POOL_RUNTIME_LABEL = "vibecode-pool-runtime"
+POOL_STATE_LABEL = "vibecode-pool-state"
+POOL_IDLE_COMMAND = ["sh", "-c", "mkdir -p /app/src && while true; do sleep 3600; done"]
+EXEC_STDIN_CHUNK_SIZE = 64 * 1024  # Bytes per websocket frame when writing exec stdin
+
+# Runtime images are pulled once per node and reused; with pinned digests a
+# cached image is never stale, so pods never wait on the registry for it
+IMAGE_PULL_POLICY = "IfNotPresent"
+
+# Image pre-pull DaemonSet: one init container per runtime image puts the
+# image on every node and exits, then a pause container keeps the pod up
+PREPULL_APP_LABEL = "vibecode-image-prepull"
+PREPULL_COMMAND = ["sh", "-c", "exit 0"]
+
+# Above this many ids a batch status call lists every app=vibecode object
+# instead of building a `project-id in (...)` selector
+BATCH_SELECTOR_MAX_IDS = 100
+
+# Kinds removed by bulk teardown; Deployments take their ReplicaSets along
+TEARDOWN_KINDS = ("deployment", "service", "configmap", "pvc", "pods")
+
+# Annotation on project ConfigMaps mapping each file key to its content hash
+FILE_HASHES_ANNOTATION = "vibecode.dev/file-hashes"
+FILE_HASH_CACHE_SIZE = 4096  # Projects whose ConfigMap file hashes are kept in memory
+
+# project id -> (resourceVersion, file hashes) of the last ConfigMap this
+# process wrote or read, so saves can diff without reading the ConfigMap
+_file_hash_cache: "OrderedDict[str, Tuple[str, Dict[str, str]]]" = OrderedDict()
+_file_hash_cache_lock = threading.Lock()
+
+
+def _remember_file_hashes(project_id: str, configmap: Dict[str, Any]) -> Tuple[str, Dict[str, str]]:
+    """Cache the file hashes of a live ConfigMap, computing them if it predates the annotation"""
+    annotations = configmap["metadata"].get("annotations") or {}
+    if FILE_HASHES_ANNOTATION in annotations:
+        hashes = json.loads(annotations[FILE_HASHES_ANNOTATION])
+    else:
+        hashes = KubernetesClient.file_hashes(configmap.get("data") or {})
+    entry = (configmap["metadata"]["resourceVersion"], hashes)
+    with _file_hash_cache_lock:
+        _file_hash_cache[project_id] = entry
+        _file_hash_cache.move_to_end(project_id)
+        while len(_file_hash_cache) > FILE_HASH_CACHE_SIZE:
+            _file_hash_cache.popitem(last=False)
+    return entry
+
+
+def _cached_file_hashes(project_id: str) -> Optional[Tuple[str, Dict[str, str]]]:
+    with _file_hash_cache_lock:
+        return _file_hash_cache.get(project_id)
+
+
+def _forget_file_hashes(project_id: str) -> None:
+    with _file_hash_cache_lock:
+        _file_hash_cache.pop(project_id, None)
+
+
+def _replacement(live: Dict[str, Any], body: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn a desired manifest into a full update of the live object.
+
+    A strategic merge patch of the manifest never removes what the template
+    dropped (env vars, args, an init container), while the spec hash would
+    already record the new spec. A replace sets exactly the manifest; the
+    live resourceVersion makes it fail with 409 on a concurrent change, and
+    annotations set by other controllers are kept.
+    """
+    metadata = dict(body["metadata"])
+    metadata["resourceVersion"] = live["metadata"]["resourceVersion"]
+    metadata["annotations"] = {
+        **(live["metadata"].get("annotations") or {}),
+        **(metadata.get("annotations") or {}),
+    }
+    return {**body, "metadata": metadata}
+
+
+# Executor for fanning out independent reads; kept separate from the
+# AsyncKubernetesClient pool so nested submissions cannot deadlock
+_fanout_executor: Optional[ThreadPoolExecutor] = None
+_fanout_executor_lock = threading.Lock()
+
+
+def _get_fanout_executor() -> ThreadPoolExecutor:
+    """Create the shared fan-out executor on first use"""
+    global _fanout_executor
+    if _fanout_executor is None:
+        with _fanout_executor_lock:
+            if _fanout_executor is None:
+                _fanout_executor = ThreadPoolExecutor(
+                    max_workers=settings.KUBERNETES_MAX_CONCURRENCY * len(PROJECT_RESOURCE_KINDS),
+                    thread_name_prefix="kubernetes-fanout",
+                )
+    return _fanout_executor
+
 
 class KubernetesClient:
+    """Blocking operations on the Kubernetes resources of projects.
+
+    The create_* methods have apply semantics: they render the desired object,
+    stamp it with a spec hash and only write when the live object differs (see
+    app.core.reconciler), so re-running provisioning never restarts pods.
+    """
+
     @staticmethod
     def generate_resource_names(project_id: str) -> Dict[str, str]:
         """Generate consistent resource names for a project"""
@@ -66,113 +184,121 @@ class KubernetesClient:
         storage_size: str = DEFAULT_STORAGE_SIZE,
         storage_class: str = DEFAULT_STORAGE_CLASS,
     ) -> Dict[str, Any]:
-        """Create a Persistent Volume Claim for a project"""
+        """Create or reconcile the Persistent Volume Claim for a project"""
         resource_names = KubernetesClient.generate_resource_names(project_id)
         pvc_name = resource_names["pvc"]
 
         # Define the PVC
-        pvc = client.V1PersistentVolumeClaim(
-            api_version="v1",
-            kind="PersistentVolumeClaim",
-            metadata=client.V1ObjectMeta(
-                name=pvc_name,
-                namespace=NAMESPACE,
-                labels={
+        pvc = {
+            "apiVersion": "v1",
+            "kind": "PersistentVolumeClaim",
+            "metadata": {
+                "name": pvc_name,
+                "namespace": get_namespace(),
+                "labels": {
                     "app": "vibecode",
                     "project-id": project_id,
                 },
+            },
+            "spec": {
+                "accessModes": ["ReadWriteOnce"],
+                "resources": {
+                    "requests": {"storage": storage_size},
+                },
+                "storageClassName": storage_class,
+            },
+        }
+
+        action, summary = reconcile(
+            "pvc",
+            pvc,
+            read=lambda: call_raw(
+                core_v1_api.read_namespaced_persistent_volume_claim,
+                name=pvc_name, namespace=get_namespace(),
             ),
-            spec=client.V1PersistentVolumeClaimSpec(
-                access_modes=["ReadWriteOnce"],
-                resources=client.V1ResourceRequirements(
-                    requests={"storage": storage_size}
-                ),
-                storage_class_name=storage_class,
+            create=lambda body: call_raw(
+                core_v1_api.create_namespaced_persistent_volume_claim,
+                namespace=get_namespace(), body=body,
             ),
+            # Most of a PVC spec is immutable; only labels, annotations and
+            # the storage request (volume expansion) can change
+            patch=lambda live, body: call_raw(
+                core_v1_api.patch_namespaced_persistent_volume_claim,
+                name=pvc_name,
+                namespace=get_namespace(),
+                body={
+                    "metadata": {
+                        "labels": body["metadata"]["labels"],
+                        "annotations": body["metadata"]["annotations"],
+                    },
+                    "spec": {"resources": {"requests": body["spec"]["resources"]["requests"]}},
+                },
+            ),
+            summarize=KubernetesClient.summarize_pvc,
         )
-
-        try:
-            # Create the PVC
-            api_response = core_v1_api.create_namespaced_persistent_volume_claim(
-                namespace=NAMESPACE, body=pvc
-            )
-            logger.info(f"Created PVC: {pvc_name}")
-            return {
-                "name": api_response.metadata.name,
-                "status": api_response.status.phase if api_response.status else "Unknown",
-            }
-        except ApiException as e:
-            logger.error(f"Exception when creating PVC: {e}")
-            if e.status == 409:  # Conflict - PVC already exists
-                logger.info(f"PVC {pvc_name} already exists, retrieving it")
-                api_response = core_v1_api.read_namespaced_persistent_volume_claim(
-                    name=pvc_name, namespace=NAMESPACE
-                )
-                return {
-                    "name": api_response.metadata.name,
-                    "status": api_response.status.phase if api_response.status else "Unknown",
-                }
-            raise
+        return {
+            "name": summary["name"],
+            "status": summary["status"],
+            "action": action,
+        }
 
     @staticmethod
     def create_configmap_for_files(
         project_id: str, files: List[Dict[str, str]]
     ) -> Dict[str, Any]:
-        """Create a ConfigMap containing project files"""
+        """Create or reconcile the ConfigMap containing project files"""
         resource_names = KubernetesClient.generate_resource_names(project_id)
         configmap_name = resource_names["configmap"]
 
         # Prepare data for ConfigMap
-        data = {}
-        for file in files:
-            filename = file.get("name", "")
-            content = file.get("content", "")
-            if filename and content:
-                data[filename] = content
+        data = KubernetesClient.configmap_data(files)
 
         # Define the ConfigMap
-        configmap = client.V1ConfigMap(
-            api_version="v1",
-            kind="ConfigMap",
-            metadata=client.V1ObjectMeta(
-                name=configmap_name,
-                namespace=NAMESPACE,
-                labels={
+        configmap = {
+            "apiVersion": "v1",
+            "kind": "ConfigMap",
+            "metadata": {
+                "name": configmap_name,
+                "namespace": get_namespace(),
+                "labels": {
                     "app": "vibecode",
                     "project-id": project_id,
                 },
+                "annotations": {
+                    FILE_HASHES_ANNOTATION: KubernetesClient.encode_file_hashes(
+                        KubernetesClient.file_hashes(data)
+                    ),
+                },
+            },
+            "data": data,
+        }
+        # The write below changes the resourceVersion; the next save re-reads it
+        _forget_file_hashes(project_id)
+
+        action, summary = reconcile(
+            "configmap",
+            configmap,
+            read=lambda: call_raw(
+                core_v1_api.read_namespaced_config_map,
+                name=configmap_name, namespace=get_namespace(),
+            ),
+            create=lambda body: call_raw(
+                core_v1_api.create_namespaced_config_map,
+                namespace=get_namespace(), body=body,
+            ),
+            patch=lambda live, body: call_raw(
+                core_v1_api.replace_namespaced_config_map,
+                name=configmap_name, namespace=get_namespace(), body=_replacement(live, body),
             ),
-            data=data,
+            summarize=KubernetesClient.summarize_configmap,
         )
-
-        try:
-            # Create the ConfigMap
-            api_response = core_v1_api.create_namespaced_config_map(
-                namespace=NAMESPACE, body=configmap
-            )
-            logger.info(f"Created ConfigMap: {configmap_name}")
-            return {
-                "name": api_response.metadata.name,
-                "data_keys": list(api_response.data.keys()) if api_response.data else [],
-            }
-        except ApiException as e:
-            logger.error(f"Exception when creating ConfigMap: {e}")
-            if e.status == 409:  # Conflict - ConfigMap already exists
-                logger.info(f"ConfigMap {configmap_name} already exists, updating it")
-                api_response = core_v1_api.replace_namespaced_config_map(
-                    name=configmap_name, namespace=NAMESPACE, body=configmap
-                )
-                return {
-                    "name": api_response.metadata.name,
-                    "data_keys": list(api_response.data.keys()) if api_response.data else [],
-                }
-            raise
+        return {**summary, "action": action}
 
     @staticmethod
     def create_deployment(
         project_id: str,
         pvc_name: str,
-        configmap_name: str,
+        configmap_name: Optional[str],
         container_image: str = DEFAULT_CONTAINER_IMAGE,
         container_port: int = DEFAULT_CONTAINER_PORT,
         cpu_limit: str = DEFAULT_CPU_LIMIT,
@@ -182,8 +308,13 @@ class KubernetesClient:
         command: Optional[List[str]] = None,
         args: Optional[List[str]] = None,
         env_vars: Optional[List[Dict[str, str]]] = None,
+        bundle_url: Optional[str] = None,
     ) -> Dict[str, Any]:
-        """Create a Deployment for a project"""
+        """Create or reconcile the Deployment for a project.
+
+        Project files are mounted from the ConfigMap, or, when bundle_url is
+        given, fetched and unpacked into an emptyDir by an init container.
+        """
         resource_names = KubernetesClient.generate_resource_names(project_id)
         deployment_name = resource_names["deployment"]
 
@@ -195,193 +326,216 @@ class KubernetesClient:
         k8s_env_vars = []
         if env_vars:
             for env_var in env_vars:
-                k8s_env_vars.append(
-                    client.V1EnvVar(
-                        name=env_var.get("name", ""),
-                        value=env_var.get("value", ""),
-                    )
-                )
+                k8s_env_vars.append({
+                    "name": env_var.get("name", ""),
+                    "value": env_var.get("value", ""),
+                })
+
+        container = {
+            "name": f"project-{project_id}",
+            "image": container_image,
+            "imagePullPolicy": IMAGE_PULL_POLICY,
+            "command": command,
+            "ports": [{"containerPort": container_port}],
+            "resources": {
+                "limits": {
+                    "cpu": cpu_limit,
+                    "memory": memory_limit,
+                },
+                "requests": {
+                    "cpu": cpu_request,
+                    "memory": memory_request,
+                },
+            },
+            "volumeMounts": [
+                {"name": "project-data", "mountPath": "/app/data"},
+                {"name": "project-files", "mountPath": "/app/src"},
+            ],
+            "env": k8s_env_vars,
+            "workingDir": "/app/src",
+        }
+        if args is not None:
+            container["args"] = args
+
+        # Project files come from the ConfigMap or from a bundle
+        pod_spec = {
+            "containers": [container],
+            "volumes": [
+                {
+                    "name": "project-data",
+                    "persistentVolumeClaim": {"claimName": pvc_name},
+                },
+            ],
+        }
+        if bundle_url:
+            pod_spec["volumes"].append({"name": "project-files", "emptyDir": {}})
+            pod_spec["initContainers"] = [
+                {
+                    "name": BUNDLE_FETCH_CONTAINER,
+                    "image": settings.DATA_HELPER_IMAGE,
+                    "imagePullPolicy": IMAGE_PULL_POLICY,
+                    "command": ["sh", "-c", 'set -o pipefail; wget -qO- "$BUNDLE_URL" | tar xzf - -C /app/src'],
+                    "env": [{"name": "BUNDLE_URL", "value": bundle_url}],
+                    "volumeMounts": [
+                        {"name": "project-files", "mountPath": "/app/src"},
+                    ],
+                }
+            ]
+        else:
+            pod_spec["volumes"].append({
+                "name": "project-files",
+                "configMap": {"name": configmap_name},
+            })
 
         # Define the Deployment
-        deployment = client.V1Deployment(
-            api_version="apps/v1",
-            kind="Deployment",
-            metadata=client.V1ObjectMeta(
-                name=deployment_name,
-                namespace=NAMESPACE,
-                labels={
+        deployment = {
+            "apiVersion": "apps/v1",
+            "kind": "Deployment",
+            "metadata": {
+                "name": deployment_name,
+                "namespace": get_namespace(),
+                "labels": {
                     "app": "vibecode",
                     "project-id": project_id,
                 },
-            ),
-            spec=client.V1DeploymentSpec(
-                replicas=1,
-                selector=client.V1LabelSelector(
-                    match_labels={
+            },
+            "spec": {
+                "replicas": 1,
+                # Surge a new pod before removing the old one on restarts
+                "strategy": {
+                    "type": "RollingUpdate",
+                    "rollingUpdate": {
+                        "maxSurge": 1,
+                        "maxUnavailable": 0,
+                    },
+                },
+                "selector": {
+                    "matchLabels": {
                         "app": "vibecode",
                         "project-id": project_id,
-                    }
-                ),
-                template=client.V1PodTemplateSpec(
-                    metadata=client.V1ObjectMeta(
-                        labels={
+                    },
+                },
+                "template": {
+                    "metadata": {
+                        "labels": {
                             "app": "vibecode",
                             "project-id": project_id,
-                        }
-                    ),
-                    spec=client.V1PodSpec(
-                        containers=[
-                            client.V1Container(
-                                name=f"project-{project_id}",
-                                image=container_image,
-                                command=command,
-                                args=args,
-                                ports=[
-                                    client.V1ContainerPort(
-                                        container_port=container_port
-                                    )
-                                ],
-                                resources=client.V1ResourceRequirements(
-                                    limits={
-                                        "cpu": cpu_limit,
-                                        "memory": memory_limit,
-                                    },
-                                    requests={
-                                        "cpu": cpu_request,
-                                        "memory": memory_request,
-                                    },
-                                ),
-                                volume_mounts=[
-                                    client.V1VolumeMount(
-                                        name="project-data",
-                                        mount_path="/app/data",
-                                    ),
-                                    client.V1VolumeMount(
-                                        name="project-files",
-                                        mount_path="/app/src",
-                                    ),
-                                ],
-                                env=k8s_env_vars,
-                                working_dir="/app/src",
-                            )
-                        ],
-                        volumes=[
-                            client.V1Volume(
-                                name="project-data",
-                                persistent_volume_claim=client.V1PersistentVolumeClaimVolumeSource(
-                                    claim_name=pvc_name
-                                ),
-                            ),
-                            client.V1Volume(
-                                name="project-files",
-                                config_map=client.V1ConfigMapVolumeSource(
-                                    name=configmap_name
-                                ),
-                            ),
-                        ],
-                    ),
-                ),
-            ),
-        )
+                        },
+                    },
+                    "spec": pod_spec,
+                },
+            },
+        }
 
-        try:
-            # Create the Deployment
-            api_response = apps_v1_api.create_namespaced_deployment(
-                namespace=NAMESPACE, body=deployment
-            )
-            logger.info(f"Created Deployment: {deployment_name}")
-            return {
-                "name": api_response.metadata.name,
-                "replicas": api_response.spec.replicas,
-                "created_at": datetime.now(timezone.utc).isoformat(),
-            }
-        except ApiException as e:
-            logger.error(f"Exception when creating Deployment: {e}")
-            if e.status == 409:  # Conflict - Deployment already exists
-                logger.info(f"Deployment {deployment_name} already exists, updating it")
-                api_response = apps_v1_api.replace_namespaced_deployment(
-                    name=deployment_name, namespace=NAMESPACE, body=deployment
+        def replace_deployment(live: Dict[str, Any], body: Dict[str, Any]) -> Dict[str, Any]:
+            body = _replacement(live, body)
+            # Keep the live replica count so a stopped project stays stopped
+            body["spec"]["replicas"] = live["spec"].get("replicas")
+            # Keep the last restart; dropping it would roll the pods again
+            live_template_annotations = live["spec"]["template"]["metadata"].get("annotations") or {}
+            if RESTARTED_AT_ANNOTATION in live_template_annotations:
+                body["spec"]["template"]["metadata"].setdefault("annotations", {})[RESTARTED_AT_ANNOTATION] = (
+                    live_template_annotations[RESTARTED_AT_ANNOTATION]
                 )
-                return {
-                    "name": api_response.metadata.name,
-                    "replicas": api_response.spec.replicas,
-                    "updated_at": datetime.now(timezone.utc).isoformat(),
-                }
-            raise
+            return call_raw(
+                apps_v1_api.replace_namespaced_deployment,
+                name=deployment_name, namespace=get_namespace(), body=body,
+            )
+
+        action, summary = reconcile(
+            "deployment",
+            deployment,
+            read=lambda: call_raw(
+                apps_v1_api.read_namespaced_deployment,
+                name=deployment_name, namespace=get_namespace(),
+            ),
+            create=lambda body: call_raw(
+                apps_v1_api.create_namespaced_deployment,
+                namespace=get_namespace(), body=body,
+            ),
+            patch=replace_deployment,
+            summarize=KubernetesClient.summarize_deployment,
+        )
+        result = {
+            "name": summary["name"],
+            "replicas": summary["replicas"],
+            "action": action,
+        }
+        if action == "created":
+            result["created_at"] = datetime.now(timezone.utc).isoformat()
+        elif action == "patched":
+            result["updated_at"] = datetime.now(timezone.utc).isoformat()
+        return result
 
     @staticmethod
     def create_service(
         project_id: str, container_port: int = DEFAULT_CONTAINER_PORT
     ) -> Dict[str, Any]:
-        """Create a Service for a project"""
+        """Create or reconcile the Service for a project"""
         resource_names = KubernetesClient.generate_resource_names(project_id)
         service_name = resource_names["service"]
 
         # Define the Service
-        service = client.V1Service(
-            api_version="v1",
-            kind="Service",
-            metadata=client.V1ObjectMeta(
-                name=service_name,
-                namespace=NAMESPACE,
-                labels={
+        service = {
+            "apiVersion": "v1",
+            "kind": "Service",
+            "metadata": {
+                "name": service_name,
+                "namespace": get_namespace(),
+                "labels": {
                     "app": "vibecode",
                     "project-id": project_id,
                 },
-            ),
-            spec=client.V1ServiceSpec(
-                selector={
+            },
+            "spec": {
+                "selector": {
                     "app": "vibecode",
                     "project-id": project_id,
                 },
-                ports=[
-                    client.V1ServicePort(
-                        port=container_port,
-                        target_port=container_port,
-                        protocol="TCP",
-                    )
+                "ports": [
+                    {
+                        "port": container_port,
+                        "targetPort": container_port,
+                        "protocol": "TCP",
+                    }
                 ],
-                type="ClusterIP",
-            ),
-        )
+                "type": "ClusterIP",
+            },
+        }
 
-        try:
-            # Create the Service
-            api_response = core_v1_api.create_namespaced_service(
-                namespace=NAMESPACE, body=service
+        def replace_service(live: Dict[str, Any], body: Dict[str, Any]) -> Dict[str, Any]:
+            body = _replacement(live, body)
+            # The allocated cluster IP cannot change; carry it over
+            for field in ("clusterIP", "clusterIPs", "ipFamilies", "ipFamilyPolicy"):
+                if field in live["spec"]:
+                    body["spec"][field] = live["spec"][field]
+            return call_raw(
+                core_v1_api.replace_namespaced_service,
+                name=service_name, namespace=get_namespace(), body=body,
             )
-            logger.info(f"Created Service: {service_name}")
-            return {
-                "name": api_response.metadata.name,
-                "cluster_ip": api_response.spec.cluster_ip,
-                "ports": [
-                    {"port": port.port, "target_port": port.target_port}
-                    for port in api_response.spec.ports
-                ],
-            }
-        except ApiException as e:
-            logger.error(f"Exception when creating Service: {e}")
-            if e.status == 409:  # Conflict - Service already exists
-                logger.info(f"Service {service_name} already exists, retrieving it")
-                api_response = core_v1_api.read_namespaced_service(
-                    name=service_name, namespace=NAMESPACE
-                )
-                return {
-                    "name": api_response.metadata.name,
-                    "cluster_ip": api_response.spec.cluster_ip,
-                    "ports": [
-                        {"port": port.port, "target_port": port.target_port}
-                        for port in api_response.spec.ports
-                    ],
-                }
-            raise
+
+        action, summary = reconcile(
+            "service",
+            service,
+            read=lambda: call_raw(
+                core_v1_api.read_namespaced_service,
+                name=service_name, namespace=get_namespace(),
+            ),
+            create=lambda body: call_raw(
+                core_v1_api.create_namespaced_service,
+                namespace=get_namespace(), body=body,
+            ),
+            patch=replace_service,
+            summarize=KubernetesClient.summarize_service,
+        )
+        return {**summary, "action": action}
 
     @staticmethod
     def get_deployment_status(deployment_name: str) -> Dict[str, Any]:
         """Get the status of a Deployment"""
         try:
             api_response = apps_v1_api.read_namespaced_deployment_status(
-                name=deployment_name, namespace=NAMESPACE
+                name=deployment_name, namespace=get_namespace()
             )
             return {
                 "name": api_response.metadata.name,
@@ -410,19 +564,20 @@ class KubernetesClient:
         """Get logs from the pod for a project"""
         try:
             # Get pods with the project-id label
-            pods = core_v1_api.list_namespaced_pod(
-                namespace=NAMESPACE,
+            pods = call_raw(
+                core_v1_api.list_namespaced_pod,
+                namespace=get_namespace(),
                 label_selector=f"project-id={project_id}",
             )
 
-            if not pods.items:
+            if not pods["items"]:
                 return "No pods found for this project"
 
             # Get the first pod (there should only be one for a project)
-            pod_name = pods.items[0].metadata.name
+            pod_name = pods["items"][0]["metadata"]["name"]
             logs = core_v1_api.read_namespaced_pod_log(
                 name=pod_name,
-                namespace=NAMESPACE,
+                namespace=get_namespace(),
                 tail_lines=tail_lines,
             )
             return logs
@@ -431,24 +586,153 @@ class KubernetesClient:
             return f"Error getting logs: {str(e)}"
 
     @staticmethod
-    def start_container(project_id: str) -> Dict[str, Any]:
-        """Start a container for a project by scaling the deployment to 1 replica"""
-        resource_names = KubernetesClient.generate_resource_names(project_id)
-        deployment_name = resource_names["deployment"]
+    def log_sort_key(line: str) -> str:
+        """Sort key for a `timestamps=True` log line.
+
+        RFC3339Nano timestamps drop trailing zeros from the fraction, so the
+        fraction is padded to nanoseconds to make keys compare as strings.
+        """
+        timestamp = line.split(" ", 1)[0].rstrip("Z")
+        seconds, _, fraction = timestamp.partition(".")
+        return f"{seconds}.{fraction.ljust(9, '0')}"
+
+    @staticmethod
+    def read_pod_log_lines(
+        pod_name: str,
+        tail_lines: Optional[int] = None,
+        since_seconds: Optional[int] = None,
+    ) -> List[str]:
+        """Read the logs of one pod as `timestamps=True` lines"""
+        kwargs: Dict[str, Any] = {"timestamps": True}
+        if tail_lines is not None:
+            kwargs["tail_lines"] = tail_lines
+        if since_seconds is not None:
+            kwargs["since_seconds"] = since_seconds
+        logs = core_v1_api.read_namespaced_pod_log(
+            name=pod_name, namespace=get_namespace(), **kwargs
+        )
+        return [line for line in logs.splitlines() if line]
+
+    @staticmethod
+    def get_merged_pod_logs(
+        project_id: str,
+        tail_lines: int = 100,
+        previous: bool = False,
+        max_lines: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+    ) -> str:
+        """Get the logs of every pod of a project merged into one timeline.
 
+        Every pod (and, with previous=True, every pod's previous container
+        instance) is read concurrently with timestamps. The streams are then
+        k-way merged newest-first with a heap, stopping as soon as the line or
+        byte budget is spent, and returned oldest-first with each line tagged
+        with its source pod.
+        """
         try:
-            # Get the current deployment
-            deployment = apps_v1_api.read_namespaced_deployment(
-                name=deployment_name, namespace=NAMESPACE
+            pods = call_raw(
+                core_v1_api.list_namespaced_pod,
+                namespace=get_namespace(),
+                label_selector=f"project-id={project_id}",
             )
+        except ApiException as e:
+            logger.error(f"Exception when getting pod logs: {e}")
+            return f"Error getting logs: {str(e)}"
 
-            # Set replicas to 1
-            deployment.spec.replicas = 1
+        if not pods["items"]:
+            return "No pods found for this project"
 
-            # Update the deployment
-            api_response = apps_v1_api.replace_namespaced_deployment(
-                name=deployment_name, namespace=NAMESPACE, body=deployment
-            )
+        pod_names = [pod["metadata"]["name"] for pod in pods["items"]]
+        sources = [(pod_name, False) for pod_name in pod_names]
+        if previous:
+            sources += [(pod_name, True) for pod_name in pod_names]
+
+        def read_logs(pod_name: str, previous_container: bool) -> List[str]:
+            try:
+                logs = core_v1_api.read_namespaced_pod_log(
+                    name=pod_name,
+                    namespace=get_namespace(),
+                    tail_lines=tail_lines,
+                    timestamps=True,
+                    previous=previous_container,
+                )
+            except ApiException as e:
+                # A pod whose container never restarted has no previous logs (400);
+                # that is expected, anything else is worth logging. Either way the
+                # pod contributes no lines and the other pods are still merged.
+                if not (previous_container and e.status == 400):
+                    logger.error(f"Exception when getting logs of pod {pod_name}: {e}")
+                return []
+            tag = f"[{pod_name}{' (previous)' if previous_container else ''}]"
+            return [f"{tag} {line}" for line in logs.splitlines() if line]
+
+        executor = _get_fanout_executor()
+        futures = [executor.submit(read_logs, pod_name, prev) for pod_name, prev in sources]
+        streams = [future.result() for future in futures]
+
+        # Merge newest-first so the budget keeps the most recent lines
+        def sort_key(tagged_line: str) -> str:
+            return KubernetesClient.log_sort_key(tagged_line.split("] ", 1)[1])
+
+        selected = []
+        used_bytes = 0
+        for line in heapq.merge(*(reversed(stream) for stream in streams), key=sort_key, reverse=True):
+            line_bytes = len(line.encode("utf-8")) + 1
+            if max_lines is not None and len(selected) >= max_lines:
+                break
+            if max_bytes is not None and used_bytes + line_bytes > max_bytes:
+                break
+            selected.append(line)
+            used_bytes += line_bytes
+
+        selected.reverse()
+        return "\n".join(selected)
+
+    @staticmethod
+    def open_pod_log_stream(project_id: str, tail_lines: int = 100) -> Optional[Any]:
+        """Open a follow-mode log stream for the pod of a project.
+
+        Returns the raw urllib3 response (the caller must close it), or None
+        when the project has no pods.
+        """
+        pods = call_raw(
+            core_v1_api.list_namespaced_pod,
+            namespace=get_namespace(),
+            label_selector=f"project-id={project_id}",
+        )
+        if not pods["items"]:
+            return None
+
+        pod_name = pods["items"][0]["metadata"]["name"]
+        return stream_core_v1_api.read_namespaced_pod_log(
+            name=pod_name,
+            namespace=get_namespace(),
+            tail_lines=tail_lines,
+            follow=True,
+            _preload_content=False,
+            _request_timeout=request_timeout("stream"),
+        )
+
+    @staticmethod
+    def scale_deployment(project_id: str, replicas: int) -> client.V1Scale:
+        """Set the replica count of a project deployment in a single call.
+
+        Patches the scale subresource, so only spec.replicas is sent and no
+        resourceVersion is involved; concurrent start/stop clicks cannot fail
+        with 409 conflicts and the last write wins.
+        """
+        resource_names = KubernetesClient.generate_resource_names(project_id)
+        return apps_v1_api.patch_namespaced_deployment_scale(
+            name=resource_names["deployment"],
+            namespace=get_namespace(),
+            body={"spec": {"replicas": replicas}},
+        )
+
+    @staticmethod
+    def start_container(project_id: str) -> Dict[str, Any]:
+        """Start a container for a project by scaling the deployment to 1 replica"""
+        try:
+            api_response = KubernetesClient.scale_deployment(project_id, 1)
 
             logger.info(f"Started container for project {project_id}")
             return {
@@ -463,22 +747,8 @@ class KubernetesClient:
     @staticmethod
     def stop_container(project_id: str) -> Dict[str, Any]:
         """Stop a container for a project by scaling the deployment to 0 replicas"""
-        resource_names = KubernetesClient.generate_resource_names(project_id)
-        deployment_name = resource_names["deployment"]
-
         try:
-            # Get the current deployment
-            deployment = apps_v1_api.read_namespaced_deployment(
-                name=deployment_name, namespace=NAMESPACE
-            )
-
-            # Set replicas to 0
-            deployment.spec.replicas = 0
-
-            # Update the deployment
-            api_response = apps_v1_api.replace_namespaced_deployment(
-                name=deployment_name, namespace=NAMESPACE, body=deployment
-            )
+            api_response = KubernetesClient.scale_deployment(project_id, 0)
 
             logger.info(f"Stopped container for project {project_id}")
             return {
@@ -491,213 +761,1363 @@ class KubernetesClient:
             raise
 
     @staticmethod
-    def delete_project_resources(project_id: str) -> Dict[str, Any]:
-        """Delete all Kubernetes resources for a project"""
+    def restart_container(project_id: str) -> Dict[str, Any]:
+        """Restart a container for a project with a rolling restart.
+
+        Stamps the pod template with a restartedAt annotation (what
+        `kubectl rollout restart` does) in a single patch. The Deployment's
+        RollingUpdate strategy brings the new pod up before the old one is
+        terminated, so the preview stays available.
+        """
         resource_names = KubernetesClient.generate_resource_names(project_id)
-        results = {}
+        deployment_name = resource_names["deployment"]
+        restarted_at = datetime.now(timezone.utc).isoformat()
 
-        # Delete Deployment
         try:
-            apps_v1_api.delete_namespaced_deployment(
-                name=resource_names["deployment"], namespace=NAMESPACE
+            api_response = apps_v1_api.patch_namespaced_deployment(
+                name=deployment_name,
+                namespace=get_namespace(),
+                body={
+                    "spec": {
+                        "template": {
+                            "metadata": {
+                                "annotations": {RESTARTED_AT_ANNOTATION: restarted_at}
+                            }
+                        }
+                    }
+                },
             )
-            results["deployment"] = "deleted"
-        except ApiException as e:
-            if e.status != 404:  # Not Found
-                logger.error(f"Exception when deleting Deployment: {e}")
-                results["deployment"] = f"error: {str(e)}"
-            else:
-                results["deployment"] = "not found"
 
-        # Delete Service
-        try:
-            core_v1_api.delete_namespaced_service(
-                name=resource_names["service"], namespace=NAMESPACE
-            )
-            results["service"] = "deleted"
+            logger.info(f"Restarted container for project {project_id}")
+            return {
+                "name": api_response.metadata.name,
+                "replicas": api_response.spec.replicas,
+                "generation": api_response.metadata.generation,
+                "restarted_at": restarted_at,
+            }
         except ApiException as e:
-            if e.status != 404:  # Not Found
-                logger.error(f"Exception when deleting Service: {e}")
-                results["service"] = f"error: {str(e)}"
-            else:
-                results["service"] = "not found"
+            logger.error(f"Exception when restarting container: {e}")
+            raise
 
-        # Delete ConfigMap
-        try:
-            core_v1_api.delete_namespaced_config_map(
-                name=resource_names["configmap"], namespace=NAMESPACE
-            )
-            results["configmap"] = "deleted"
-        except ApiException as e:
-            if e.status != 404:  # Not Found
-                logger.error(f"Exception when deleting ConfigMap: {e}")
-                results["configmap"] = f"error: {str(e)}"
-            else:
-                results["configmap"] = "not found"
+    @staticmethod
+    def get_rollout_status(project_id: str) -> Dict[str, Any]:
+        """Get whether the latest rollout of a project deployment has completed"""
+        resource_names = KubernetesClient.generate_resource_names(project_id)
+        deployment = apps_v1_api.read_namespaced_deployment_status(
+            name=resource_names["deployment"], namespace=get_namespace()
+        )
+        replicas = deployment.spec.replicas or 0
+        status = deployment.status
+        updated_replicas = status.updated_replicas or 0
+        available_replicas = status.available_replicas or 0
+        total_replicas = status.replicas or 0
+
+        # Same checks as `kubectl rollout status`
+        complete = (
+            (status.observed_generation or 0) >= (deployment.metadata.generation or 0)
+            and updated_replicas >= replicas
+            and total_replicas <= updated_replicas
+            and available_replicas >= updated_replicas
+        )
+        return {
+            "name": deployment.metadata.name,
+            "complete": complete,
+            "replicas": replicas,
+            "updated_replicas": updated_replicas,
+            "available_replicas": available_replicas,
+        }
+
+    @staticmethod
+    def delete_project_resource(kind: str, project_id: str) -> str:
+        """Delete one kind of project resource, returning "deleted", "not found" or an error"""
+        resource_names = KubernetesClient.generate_resource_names(project_id)
+        delete_funcs = {
+            "deployment": apps_v1_api.delete_namespaced_deployment,
+            "service": core_v1_api.delete_namespaced_service,
+            "configmap": core_v1_api.delete_namespaced_config_map,
+            "pvc": core_v1_api.delete_namespaced_persistent_volume_claim,
+        }
+
+        if kind == "configmap":
+            _forget_file_hashes(project_id)
 
-        # Delete PVC
         try:
-            core_v1_api.delete_namespaced_persistent_volume_claim(
-                name=resource_names["pvc"], namespace=NAMESPACE
+            # Dependents (ReplicaSets, Pods) are garbage collected after the call returns
+            delete_funcs[kind](
+                name=resource_names[kind], namespace=get_namespace(), propagation_policy="Background"
             )
-            results["pvc"] = "deleted"
+            return "deleted"
         except ApiException as e:
             if e.status != 404:  # Not Found
-                logger.error(f"Exception when deleting PVC: {e}")
-                results["pvc"] = f"error: {str(e)}"
-            else:
-                results["pvc"] = "not found"
+                logger.error(f"Exception when deleting {PROJECT_RESOURCE_KINDS[kind]}: {e}")
+                return f"error: {str(e)}"
+            return "not found"
+
+    @staticmethod
+    def delete_project_resources(project_id: str) -> Dict[str, Any]:
+        """Delete all Kubernetes resources for a project, issuing the deletes concurrently"""
+        executor = _get_fanout_executor()
+        futures = {
+            kind: executor.submit(KubernetesClient.delete_project_resource, kind, project_id)
+            for kind in ("deployment", "service", "configmap", "pvc")
+        }
+        results = {kind: future.result() for kind, future in futures.items()}
 
         logger.info(f"Deleted resources for project {project_id}: {results}")
         return results
 
     @staticmethod
-    def get_project_resources(project_id: str) -> Dict[str, Any]:
-        """Get all Kubernetes resources for a project"""
-        resource_names = KubernetesClient.generate_resource_names(project_id)
-        results = {}
+    def project_selectors(project_ids: List[str]) -> List[str]:
+        """Split project ids into `project-id in (...)` label selectors of bounded length"""
+        project_ids = list(dict.fromkeys(project_ids))
+        return [
+            f"project-id in ({','.join(project_ids[i:i + BATCH_SELECTOR_MAX_IDS])})"
+            for i in range(0, len(project_ids), BATCH_SELECTOR_MAX_IDS)
+        ]
 
-        # Get Deployment
+    @staticmethod
+    def delete_collection(kind: str, label_selector: str) -> str:
+        """Delete every object of a kind matching a selector, returning "deleted" or an error"""
+        delete_funcs = {
+            "deployment": apps_v1_api.delete_collection_namespaced_deployment,
+            "service": core_v1_api.delete_collection_namespaced_service,
+            "configmap": core_v1_api.delete_collection_namespaced_config_map,
+            "pvc": core_v1_api.delete_collection_namespaced_persistent_volume_claim,
+            "pods": core_v1_api.delete_collection_namespaced_pod,
+        }
         try:
-            deployment = apps_v1_api.read_namespaced_deployment(
-                name=resource_names["deployment"], namespace=NAMESPACE
+            delete_funcs[kind](
+                namespace=get_namespace(), label_selector=label_selector, propagation_policy="Background"
             )
-            results["deployment"] = {
-                "name": deployment.metadata.name,
-                "replicas": deployment.spec.replicas,
-                "available_replicas": deployment.status.available_replicas if deployment.status.available_replicas else 0,
-                "ready_replicas": deployment.status.ready_replicas if deployment.status.ready_replicas else 0,
-            }
+            return "deleted"
         except ApiException as e:
-            if e.status == 404:  # Not Found
-                results["deployment"] = None
-            else:
-                logger.error(f"Exception when getting Deployment: {e}")
-                results["deployment"] = f"error: {str(e)}"
+            logger.error(f"Exception when deleting {PROJECT_RESOURCE_KINDS[kind]} collection: {e}")
+            return f"error: {str(e)}"
 
-        # Get Service
-        try:
-            service = core_v1_api.read_namespaced_service(
-                name=resource_names["service"], namespace=NAMESPACE
-            )
-            results["service"] = {
-                "name": service.metadata.name,
-                "cluster_ip": service.spec.cluster_ip,
-                "ports": [
-                    {"port": port.port, "target_port": port.target_port}
-                    for port in service.spec.ports
-                ],
-            }
-        except ApiException as e:
-            if e.status == 404:  # Not Found
-                results["service"] = None
-            else:
-                logger.error(f"Exception when getting Service: {e}")
-                results["service"] = f"error: {str(e)}"
+    @staticmethod
+    def delete_projects_resources(project_ids: List[str], kinds: Tuple[str, ...] = TEARDOWN_KINDS) -> Dict[str, Any]:
+        """Delete the resources of many projects with one delete_collection call per kind.
 
-        # Get PVC
-        try:
-            pvc = core_v1_api.read_namespaced_persistent_volume_claim(
-                name=resource_names["pvc"], namespace=NAMESPACE
-            )
-            results["pvc"] = {
-                "name": pvc.metadata.name,
-                "status": pvc.status.phase if pvc.status else "Unknown",
-                "capacity": pvc.status.capacity.get("storage", "Unknown") if pvc.status and pvc.status.capacity else "Unknown",
-            }
-        except ApiException as e:
-            if e.status == 404:  # Not Found
-                results["pvc"] = None
-            else:
-                logger.error(f"Exception when getting PVC: {e}")
-                results["pvc"] = f"error: {str(e)}"
+        Ids are grouped into label selectors of up to BATCH_SELECTOR_MAX_IDS
+        projects, and every (kind, selector) call runs concurrently with
+        background propagation, so the call returns once the API server has
+        accepted the deletes rather than when the objects are gone. Pods are
+        deleted too, which also removes claimed pool pods and data helpers.
+        `kinds` narrows the teardown, e.g. to keep the volumes.
+        """
+        for project_id in project_ids:
+            _forget_file_hashes(project_id)
 
-        # Get ConfigMap
-        try:
-            configmap = core_v1_api.read_namespaced_config_map(
-                name=resource_names["configmap"], namespace=NAMESPACE
-            )
-            results["configmap"] = {
-                "name": configmap.metadata.name,
-                "data_keys": list(configmap.data.keys()) if configmap.data else [],
-            }
-        except ApiException as e:
-            if e.status == 404:  # Not Found
-                results["configmap"] = None
-            else:
-                logger.error(f"Exception when getting ConfigMap: {e}")
-                results["configmap"] = f"error: {str(e)}"
+        executor = _get_fanout_executor()
+        futures = [
+            (kind, executor.submit(KubernetesClient.delete_collection, kind, label_selector))
+            for label_selector in KubernetesClient.project_selectors(project_ids)
+            for kind in kinds
+        ]
+        results: Dict[str, List[str]] = {kind: [] for kind in kinds}
+        for kind, future in futures:
+            results[kind].append(future.result())
 
-        # Get Pods
-        try:
-            pods = core_v1_api.list_namespaced_pod(
-                namespace=NAMESPACE,
-                label_selector=f"project-id={project_id}",
+        errors = [result for kind_results in results.values() for result in kind_results if result != "deleted"]
+        logger.info(f"Deleted resources of {len(project_ids)} projects with {len(futures)} calls")
+        return {"calls": len(futures), "results": results, "errors": errors}
+
+    @staticmethod
+    def list_project_objects(kind: str, page_size: int) -> Dict[str, Any]:
+        """Page through every app=vibecode object of a kind with limit/continue.
+
+        Returns the objects reduced to their project id, name, creation time
+        and (for PVCs) storage size, plus the number of pages read, so
+        memory stays small even for large clusters.
+        """
+        list_funcs = {
+            "deployment": apps_v1_api.list_namespaced_deployment,
+            "service": core_v1_api.list_namespaced_service,
+            "configmap": core_v1_api.list_namespaced_config_map,
+            "pvc": core_v1_api.list_namespaced_persistent_volume_claim,
+            "pods": core_v1_api.list_namespaced_pod,
+        }
+        objects = []
+        pages = 0
+        continue_token = None
+        while True:
+            kwargs = {"_continue": continue_token} if continue_token else {}
+            response = call_raw(
+                list_funcs[kind],
+                namespace=get_namespace(), label_selector="app=vibecode", limit=page_size, **kwargs
             )
-            results["pods"] = [
-                {
-                    "name": pod.metadata.name,
-                    "status": pod.status.phase,
-                    "ready": all(
-                        container_status.ready
-                        for container_status in pod.status.container_statuses
-                    )
-                    if pod.status.container_statuses
-                    else False,
-                    "restart_count": sum(
-                        container_status.restart_count
-                        for container_status in pod.status.container_statuses
-                    )
-                    if pod.status.container_statuses
-                    else 0,
-                    "start_time": pod.status.start_time.isoformat()
-                    if pod.status.start_time
-                    else None,
-                }
-                for pod in pods.items
-            ]
+            pages += 1
+            for obj in response["items"]:
+                metadata = obj["metadata"]
+                project_id = (metadata.get("labels") or {}).get("project-id")
+                if not project_id:
+                    continue
+                storage = None
+                if kind == "pvc":
+                    # Bound claims report what was provisioned, pending ones what was asked for
+                    capacity = (obj.get("status") or {}).get("capacity") or {}
+                    requests = (obj["spec"].get("resources") or {}).get("requests") or {}
+                    storage = capacity.get("storage") or requests.get("storage")
+                objects.append({
+                    "project_id": project_id,
+                    "name": metadata["name"],
+                    "created_at": parse_timestamp(metadata.get("creationTimestamp")),
+                    "storage": storage,
+                })
+            continue_token = response["metadata"].get("continue")
+            if not continue_token:
+                break
+        return {"objects": objects, "pages": pages}
+
+    @staticmethod
+    def count_projects_objects(project_ids: List[str]) -> Dict[str, int]:
+        """Count the objects of each teardown kind still left for many projects"""
+        list_funcs = {
+            "deployment": apps_v1_api.list_namespaced_deployment,
+            "service": core_v1_api.list_namespaced_service,
+            "configmap": core_v1_api.list_namespaced_config_map,
+            "pvc": core_v1_api.list_namespaced_persistent_volume_claim,
+            "pods": core_v1_api.list_namespaced_pod,
+        }
+        executor = _get_fanout_executor()
+        futures = [
+            (kind, executor.submit(
+                call_raw, list_funcs[kind], namespace=get_namespace(), label_selector=label_selector
+            ))
+            for label_selector in KubernetesClient.project_selectors(project_ids)
+            for kind in TEARDOWN_KINDS
+        ]
+        counts = {kind: 0 for kind in TEARDOWN_KINDS}
+        for kind, future in futures:
+            counts[kind] += len(future.result()["items"])
+        return counts
+
+    @staticmethod
+    def summarize_deployment(deployment: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract the status fields reported for a project Deployment"""
+        # A freshly created Deployment may not have a status yet
+        status = deployment.get("status") or {}
+        return {
+            "name": deployment["metadata"]["name"],
+            "replicas": deployment["spec"].get("replicas"),
+            "available_replicas": status.get("availableReplicas") or 0,
+            "ready_replicas": status.get("readyReplicas") or 0,
+        }
+
+    @staticmethod
+    def summarize_daemonset(daemonset: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract the rollout fields reported for a DaemonSet"""
+        status = daemonset.get("status") or {}
+        return {
+            "name": daemonset["metadata"]["name"],
+            "desired": status.get("desiredNumberScheduled") or 0,
+            "ready": status.get("numberReady") or 0,
+            "updated": status.get("updatedNumberScheduled") or 0,
+        }
+
+    @staticmethod
+    def summarize_service(service: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract the status fields reported for a project Service"""
+        return {
+            "name": service["metadata"]["name"],
+            "cluster_ip": service["spec"].get("clusterIP"),
+            "ports": [
+                {"port": port.get("port"), "target_port": port.get("targetPort")}
+                for port in service["spec"].get("ports") or []
+            ],
+        }
+
+    @staticmethod
+    def summarize_pvc(pvc: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract the status fields reported for a project PVC"""
+        status = pvc.get("status") or {}
+        return {
+            "name": pvc["metadata"]["name"],
+            "status": status.get("phase") or "Unknown",
+            "capacity": (status.get("capacity") or {}).get("storage", "Unknown"),
+        }
+
+    @staticmethod
+    def summarize_configmap(configmap: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract the status fields reported for a project ConfigMap"""
+        return {
+            "name": configmap["metadata"]["name"],
+            "data_keys": list(configmap.get("data") or {}),
+        }
+
+    @staticmethod
+    def summarize_pod(pod: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract the status fields reported for a project Pod"""
+        status = pod.get("status") or {}
+        container_statuses = status.get("containerStatuses") or []
+        return {
+            "name": pod["metadata"]["name"],
+            "status": status.get("phase"),
+            "ready": all(
+                container_status.get("ready", False)
+                for container_status in container_statuses
+            )
+            if container_statuses
+            else False,
+            "restart_count": sum(
+                container_status.get("restartCount", 0)
+                for container_status in container_statuses
+            ),
+            "start_time": format_timestamp(status.get("startTime")),
+            "terminating": pod["metadata"].get("deletionTimestamp") is not None,
+        }
+
+    @staticmethod
+    def fetch_project_resource(kind: str, project_id: str) -> Any:
+        """Read and summarize one kind of project resource.
+
+        Returns None when the object does not exist and an error string when
+        the read fails, matching the entries of get_project_resources. The
+        response is parsed as plain JSON, skipping model deserialization.
+        """
+        resource_names = KubernetesClient.generate_resource_names(project_id)
+        timeout = request_timeout("status")
+
+        try:
+            if kind == "deployment":
+                deployment = call_raw(
+                    apps_v1_api.read_namespaced_deployment,
+                    name=resource_names["deployment"], namespace=get_namespace(), _request_timeout=timeout,
+                )
+                return KubernetesClient.summarize_deployment(deployment)
+            elif kind == "service":
+                service = call_raw(
+                    core_v1_api.read_namespaced_service,
+                    name=resource_names["service"], namespace=get_namespace(), _request_timeout=timeout,
+                )
+                return KubernetesClient.summarize_service(service)
+            elif kind == "pvc":
+                pvc = call_raw(
+                    core_v1_api.read_namespaced_persistent_volume_claim,
+                    name=resource_names["pvc"], namespace=get_namespace(), _request_timeout=timeout,
+                )
+                return KubernetesClient.summarize_pvc(pvc)
+            elif kind == "configmap":
+                configmap = call_raw(
+                    core_v1_api.read_namespaced_config_map,
+                    name=resource_names["configmap"], namespace=get_namespace(), _request_timeout=timeout,
+                )
+                return KubernetesClient.summarize_configmap(configmap)
+            elif kind == "pods":
+                pods = call_raw(
+                    core_v1_api.list_namespaced_pod,
+                    namespace=get_namespace(),
+                    label_selector=f"project-id={project_id}",
+                    _request_timeout=timeout,
+                )
+                return [KubernetesClient.summarize_pod(pod) for pod in pods["items"]]
+            raise ValueError(f"Unknown project resource kind: {kind}")
         except ApiException as e:
-            logger.error(f"Exception when getting Pods: {e}")
-            results["pods"] = f"error: {str(e)}"
+            if e.status == 404 and kind != "pods":  # Not Found
+                return None
+            logger.error(f"Exception when getting {PROJECT_RESOURCE_KINDS[kind]}: {e}")
+            return f"error: {str(e)}"
+        except urllib3.exceptions.HTTPError as e:
+            # Timed out or could not connect, even after retries
+            logger.error(f"Exception when getting {PROJECT_RESOURCE_KINDS[kind]}: {e}")
+            return f"error: {str(e)}"
+
+    @staticmethod
+    def get_project_resources(project_id: str) -> Dict[str, Any]:
+        """Get all Kubernetes resources for a project.
+
+        The five reads are independent, so they are issued concurrently and a
+        status call costs about one API round trip instead of five.
+        """
+        executor = _get_fanout_executor()
+        futures = {
+            kind: executor.submit(KubernetesClient.fetch_project_resource, kind, project_id)
+            for kind in PROJECT_RESOURCE_KINDS
+        }
+        return {kind: future.result() for kind, future in futures.items()}
+
+    @staticmethod
+    def get_projects_resources(project_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get all Kubernetes resources for many projects with one list call per kind.
+
+        Returns a dict keyed by project id, each value shaped like the result of
+        get_project_resources. A failed list marks that kind as an error string
+        for every requested project.
+        """
+        project_ids = list(dict.fromkeys(project_ids))
+        if len(project_ids) <= BATCH_SELECTOR_MAX_IDS:
+            label_selector = f"app=vibecode,project-id in ({','.join(project_ids)})"
+        else:
+            # Very long selectors can exceed URL limits; list everything instead
+            label_selector = "app=vibecode"
+
+        list_funcs = {
+            "deployment": apps_v1_api.list_namespaced_deployment,
+            "service": core_v1_api.list_namespaced_service,
+            "pvc": core_v1_api.list_namespaced_persistent_volume_claim,
+            "configmap": core_v1_api.list_namespaced_config_map,
+            "pods": core_v1_api.list_namespaced_pod,
+        }
+        summarizers = {
+            "deployment": KubernetesClient.summarize_deployment,
+            "service": KubernetesClient.summarize_service,
+            "pvc": KubernetesClient.summarize_pvc,
+            "configmap": KubernetesClient.summarize_configmap,
+            "pods": KubernetesClient.summarize_pod,
+        }
+
+        executor = _get_fanout_executor()
+        futures = {
+            kind: executor.submit(
+                call_raw,
+                list_func,
+                namespace=get_namespace(),
+                label_selector=label_selector,
+                _request_timeout=request_timeout("status"),
+            )
+            for kind, list_func in list_funcs.items()
+        }
+
+        results = {
+            project_id: {kind: [] if kind == "pods" else None for kind in PROJECT_RESOURCE_KINDS}
+            for project_id in project_ids
+        }
+        resource_names = {
+            project_id: KubernetesClient.generate_resource_names(project_id)
+            for project_id in project_ids
+        }
+
+        for kind, future in futures.items():
+            try:
+                items = future.result()["items"]
+            except (ApiException, urllib3.exceptions.HTTPError) as e:
+                logger.error(f"Exception when listing {PROJECT_RESOURCE_KINDS[kind]}: {e}")
+                for project_id in project_ids:
+                    results[project_id][kind] = f"error: {str(e)}"
+                continue
+
+            # Join by the project-id label
+            for item in items:
+                project_id = (item["metadata"].get("labels") or {}).get("project-id")
+                if project_id not in results:
+                    continue
+                if kind == "pods":
+                    results[project_id]["pods"].append(summarizers[kind](item))
+                elif item["metadata"]["name"] == resource_names[project_id][kind]:
+                    results[project_id][kind] = summarizers[kind](item)
 
         return results
 
     @staticmethod
-    def update_project_files(project_id: str, files: List[Dict[str, str]]) -> Dict[str, Any]:
-        """Update the ConfigMap with new project files"""
-        resource_names = KubernetesClient.generate_resource_names(project_id)
-        configmap_name = resource_names["configmap"]
+    def list_running_project_ids() -> List[str]:
+        """Get the ids of projects whose Deployment wants at least one replica"""
+        deployments = call_raw(
+            apps_v1_api.list_namespaced_deployment,
+            namespace=get_namespace(), label_selector="app=vibecode",
+        )
+        running = []
+        for deployment in deployments["items"]:
+            project_id = (deployment["metadata"].get("labels") or {}).get("project-id")
+            if project_id and deployment["spec"].get("replicas"):
+                running.append(project_id)
+        return running
 
-        # Prepare data for ConfigMap
+    @staticmethod
+    def get_cluster_capacity() -> Dict[str, Any]:
+        """Get the capacity left for new project pods.
+
+        "quota" maps each resource limited by a ResourceQuota in the namespace
+        to the amount left under the tightest quota ({} when there is none),
+        and "quota_hard" to the tightest hard limit. "nodes" lists the
+        schedulable, ready, untainted nodes with their allocatable cpu, memory
+        and pods minus what scheduled pods request, and the allocatable
+        amounts themselves. Either is None when it cannot be read (e.g. no
+        RBAC for nodes), and callers should then not limit on it.
+
+        Both cluster-wide lists are served from the API server's watch cache
+        (resourceVersion "0") rather than a quorum read of etcd, and only
+        bound, non-terminated pods are listed.
+        """
+        capacity: Dict[str, Any] = {"quota": None, "quota_hard": None, "nodes": None, "errors": []}
+
+        try:
+            quotas = call_raw(core_v1_api.list_namespaced_resource_quota, namespace=get_namespace())
+            remaining: Dict[str, float] = {}
+            limits: Dict[str, float] = {}
+            for quota in quotas["items"]:
+                status = quota.get("status") or {}
+                used = status.get("used") or {}
+                for resource, hard in (status.get("hard") or {}).items():
+                    limit = parse_quantity(hard)
+                    left = limit - parse_quantity(used.get(resource, "0"))
+                    remaining[resource] = min(remaining.get(resource, left), left)
+                    limits[resource] = min(limits.get(resource, limit), limit)
+            capacity["quota"] = remaining
+            capacity["quota_hard"] = limits
+        except (ApiException, urllib3.exceptions.HTTPError, ValueError) as e:
+            logger.error(f"Exception when reading resource quotas: {e}")
+            capacity["errors"].append(f"quota: {str(e)}")
+
+        try:
+            nodes = call_raw(core_v1_api.list_node, field_selector="spec.unschedulable!=true", resource_version="0")
+            pods = call_raw(
+                core_v1_api.list_pod_for_all_namespaces,
+                field_selector="spec.nodeName!=,status.phase!=Succeeded,status.phase!=Failed",
+                resource_version="0",
+            )
+            requested: Dict[str, Dict[str, float]] = {}
+            for pod in pods["items"]:
+                node_name = pod["spec"].get("nodeName")
+                if not node_name:
+                    continue
+                node_requests = requested.setdefault(node_name, {"cpu": 0.0, "memory": 0.0, "pods": 0.0})
+                node_requests["pods"] += 1
+                for container in pod["spec"].get("containers") or []:
+                    requests = (container.get("resources") or {}).get("requests") or {}
+                    node_requests["cpu"] += parse_quantity(requests.get("cpu"), default=0)
+                    node_requests["memory"] += parse_quantity(requests.get("memory"), default=0)
+
+            free_nodes = []
+            for node in nodes["items"]:
+                spec = node.get("spec") or {}
+                status = node.get("status") or {}
+                ready = any(
+                    condition.get("type") == "Ready" and condition.get("status") == "True"
+                    for condition in status.get("conditions") or []
+                )
+                # Project pods carry no tolerations
+                tainted = any(
+                    taint.get("effect") in ("NoSchedule", "NoExecute") for taint in spec.get("taints") or []
+                )
+                if spec.get("unschedulable") or not ready or tainted:
+                    continue
+                allocatable = {
+                    resource: parse_quantity((status.get("allocatable") or {}).get(resource), default=0)
+                    for resource in ("cpu", "memory", "pods")
+                }
+                node_requests = requested.get(node["metadata"]["name"], {})
+                free_nodes.append({
+                    "name": node["metadata"]["name"],
+                    **{
+                        resource: amount - node_requests.get(resource, 0)
+                        for resource, amount in allocatable.items()
+                    },
+                    "allocatable": allocatable,
+                })
+            capacity["nodes"] = free_nodes
+        except (ApiException, urllib3.exceptions.HTTPError, ValueError) as e:
+            logger.error(f"Exception when reading node capacity: {e}")
+            capacity["errors"].append(f"nodes: {str(e)}")
+
+        return capacity
+
+    @staticmethod
+    def configmap_data(files: List[Dict[str, str]]) -> Dict[str, str]:
+        """Map project files to ConfigMap data, skipping unnamed and empty files"""
         data = {}
         for file in files:
             filename = file.get("name", "")
             content = file.get("content", "")
             if filename and content:
                 data[filename] = content
+        return data
 
-        try:
-            # Get the current ConfigMap
-            configmap = core_v1_api.read_namespaced_config_map(
-                name=configmap_name, namespace=NAMESPACE
+    @staticmethod
+    def file_hashes(data: Dict[str, str]) -> Dict[str, str]:
+        """Hash the content of every ConfigMap key"""
+        return {
+            key: hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+            for key, content in data.items()
+        }
+
+    @staticmethod
+    def encode_file_hashes(hashes: Dict[str, str]) -> str:
+        """Serialize file hashes for the ConfigMap annotation"""
+        return json.dumps(hashes, sort_keys=True, separators=(",", ":"))
+
+    @staticmethod
+    def update_project_files(project_id: str, files: List[Dict[str, str]]) -> Dict[str, Any]:
+        """Update the ConfigMap with new project files, sending only the keys that changed.
+
+        Current file hashes come from an in-memory cache, falling back to one
+        read of the ConfigMap's file hash annotation. Added and changed keys
+        are sent with their content and removed keys as null in a single
+        JSON merge patch, together with the new hashes. The patch carries the
+        cached resourceVersion, so a ConfigMap changed elsewhere is rejected
+        with 409 and the diff is redone against a fresh read.
+        """
+        resource_names = KubernetesClient.generate_resource_names(project_id)
+        configmap_name = resource_names["configmap"]
+
+        # Prepare data for ConfigMap
+        data = KubernetesClient.configmap_data(files)
+        hashes = KubernetesClient.file_hashes(data)
+
+        for attempt in range(2):
+            try:
+                cached = _cached_file_hashes(project_id)
+                if cached is None:
+                    cached = _remember_file_hashes(
+                        project_id,
+                        call_raw(
+                            core_v1_api.read_namespaced_config_map,
+                            name=configmap_name, namespace=get_namespace(),
+                        ),
+                    )
+                resource_version, live_hashes = cached
+
+                # Diff against the current file list
+                changed = [key for key, file_hash in hashes.items() if live_hashes.get(key) != file_hash]
+                removed = [key for key in live_hashes if key not in hashes]
+                result = {
+                    "name": configmap_name,
+                    "data_keys": list(data.keys()),
+                    "changed_keys": changed,
+                    "removed_keys": removed,
+                }
+                if not changed and not removed:
+                    return result
+
+                patch = {
+                    "metadata": {
+                        "resourceVersion": resource_version,
+                        "annotations": {
+                            FILE_HASHES_ANNOTATION: KubernetesClient.encode_file_hashes(hashes)
+                        },
+                    },
+                    # null removes a key
+                    "data": {
+                        **{key: data[key] for key in changed},
+                        **{key: None for key in removed},
+                    },
+                }
+                api_response = merge_patch_raw(
+                    core_v1_api, "/api/v1/namespaces/{namespace}/configmaps/{name}", patch,
+                    name=configmap_name, namespace=get_namespace(),
+                )
+                _remember_file_hashes(project_id, api_response)
+                logger.info(f"Updated ConfigMap: {configmap_name} ({len(changed)} changed, {len(removed)} removed)")
+                return {**result, "updated_at": datetime.now(timezone.utc).isoformat()}
+            except ApiException as e:
+                _forget_file_hashes(project_id)
+                if e.status == 404:  # Not Found - ConfigMap doesn't exist
+                    logger.info(f"ConfigMap {configmap_name} not found, creating it")
+                    return KubernetesClient.create_configmap_for_files(project_id, files)
+                if e.status == 409 and attempt == 0:  # Conflict - changed elsewhere, re-read
+                    continue
+                logger.error(f"Exception when updating ConfigMap: {e}")
+                raise
+
+    @staticmethod
+    def create_pool_deployment(language: str, container_image: str, replicas: int) -> Dict[str, Any]:
+        """Create or reconcile the warm pool Deployment of a runtime"""
+        deployment_name = f"{POOL_APP_LABEL}-{language}"
+        selector_labels = {
+            "app": POOL_APP_LABEL,
+            POOL_RUNTIME_LABEL: language,
+        }
+
+        # Define the Deployment; pods idle until claimed by a project
+        deployment = {
+            "apiVersion": "apps/v1",
+            "kind": "Deployment",
+            "metadata": {
+                "name": deployment_name,
+                "namespace": get_namespace(),
+                "labels": selector_labels,
+            },
+            "spec": {
+                "replicas": replicas,
+                "selector": {"matchLabels": selector_labels},
+                "template": {
+                    "metadata": {
+                        "labels": {**selector_labels, POOL_STATE_LABEL: "idle"},
+                    },
+                    "spec": {
+                        "containers": [
+                            {
+                                "name": "runtime",
+                                "image": container_image,
+                                "imagePullPolicy": IMAGE_PULL_POLICY,
+                                "command": POOL_IDLE_COMMAND,
+                                "resources": {
+                                    "limits": {
+                                        "cpu": DEFAULT_CPU_LIMIT,
+                                        "memory": DEFAULT_MEMORY_LIMIT,
+                                    },
+                                    "requests": {
+                                        "cpu": DEFAULT_CPU_REQUEST,
+                                        "memory": DEFAULT_MEMORY_REQUEST,
+                                    },
+                                },
+                                "volumeMounts": [
+                                    {"name": "project-files", "mountPath": "/app/src"},
+                                ],
+                                "workingDir": "/app/src",
+                            }
+                        ],
+                        "volumes": [
+                            {"name": "project-files", "emptyDir": {}},
+                        ],
+                        # Claimed pods are handed off and deleted; don't wait long
+                        "terminationGracePeriodSeconds": 5,
+                    },
+                },
+            },
+        }
+
+        action, summary = reconcile(
+            "pool",
+            deployment,
+            read=lambda: call_raw(
+                apps_v1_api.read_namespaced_deployment,
+                name=deployment_name, namespace=get_namespace(),
+            ),
+            create=lambda body: call_raw(
+                apps_v1_api.create_namespaced_deployment,
+                namespace=get_namespace(), body=body,
+            ),
+            patch=lambda live, body: call_raw(
+                apps_v1_api.replace_namespaced_deployment,
+                name=deployment_name, namespace=get_namespace(), body=_replacement(live, body),
+            ),
+            summarize=KubernetesClient.summarize_deployment,
+        )
+
+        # The spec hash ignores replicas, so pool size changes are applied here
+        if summary["replicas"] != replicas:
+            apps_v1_api.patch_namespaced_deployment_scale(
+                name=deployment_name,
+                namespace=get_namespace(),
+                body={"spec": {"replicas": replicas}},
             )
+            action = "scaled" if action == "unchanged" else action
+        return {
+            "name": summary["name"],
+            "replicas": replicas,
+            "action": action,
+        }
+
+    @staticmethod
+    def create_image_prepull_daemonset(images: Dict[str, str], pause_image: str) -> Dict[str, Any]:
+        """Create or reconcile the DaemonSet that keeps runtime images on every node.
 
-            # Update the data
-            configmap.data = data
+        `images` maps a short name (used for the init container) to an image
+        reference. Changing a reference rolls the DaemonSet, so every node
+        pulls the new image before projects are started on it.
+        """
+        selector_labels = {"app": PREPULL_APP_LABEL}
+        # Tiny requests so the pre-pull pods fit on full nodes and under quotas
+        resources = {
+            "limits": {"cpu": "100m", "memory": "64Mi"},
+            "requests": {"cpu": "10m", "memory": "16Mi"},
+        }
 
-            # Update the ConfigMap
-            api_response = core_v1_api.replace_namespaced_config_map(
-                name=configmap_name, namespace=NAMESPACE, body=configmap
+        daemonset = {
+            "apiVersion": "apps/v1",
+            "kind": "DaemonSet",
+            "metadata": {
+                "name": PREPULL_APP_LABEL,
+                "namespace": get_namespace(),
+                "labels": selector_labels,
+            },
+            "spec": {
+                "selector": {"matchLabels": selector_labels},
+                # Re-pull on a quarter of the nodes at a time when an image changes
+                "updateStrategy": {
+                    "type": "RollingUpdate",
+                    "rollingUpdate": {"maxUnavailable": "25%"},
+                },
+                "template": {
+                    "metadata": {"labels": selector_labels},
+                    "spec": {
+                        "initContainers": [
+                            {
+                                "name": f"pull-{name}",
+                                "image": image,
+                                "imagePullPolicy": IMAGE_PULL_POLICY,
+                                "command": PREPULL_COMMAND,
+                                "resources": resources,
+                            }
+                            for name, image in sorted(images.items())
+                        ],
+                        "containers": [
+                            {
+                                "name": "pause",
+                                "image": pause_image,
+                                "imagePullPolicy": IMAGE_PULL_POLICY,
+                                "resources": resources,
+                            }
+                        ],
+                        "terminationGracePeriodSeconds": 1,
+                    },
+                },
+            },
+        }
+
+        action, summary = reconcile(
+            "daemonset",
+            daemonset,
+            read=lambda: call_raw(
+                apps_v1_api.read_namespaced_daemon_set,
+                name=PREPULL_APP_LABEL, namespace=get_namespace(),
+            ),
+            create=lambda body: call_raw(
+                apps_v1_api.create_namespaced_daemon_set,
+                namespace=get_namespace(), body=body,
+            ),
+            patch=lambda live, body: call_raw(
+                apps_v1_api.replace_namespaced_daemon_set,
+                name=PREPULL_APP_LABEL, namespace=get_namespace(), body=_replacement(live, body),
+            ),
+            summarize=KubernetesClient.summarize_daemonset,
+        )
+        return {**summary, "action": action}
+
+    @staticmethod
+    def get_image_prepull_status() -> Optional[Dict[str, Any]]:
+        """Get the rollout of the image pre-pull DaemonSet, or None if it does not exist"""
+        try:
+            daemonset = call_raw(
+                apps_v1_api.read_namespaced_daemon_set,
+                name=PREPULL_APP_LABEL, namespace=get_namespace(),
+                _request_timeout=request_timeout("status"),
             )
-            logger.info(f"Updated ConfigMap: {configmap_name}")
-            return {
-                "name": api_response.metadata.name,
-                "data_keys": list(api_response.data.keys()) if api_response.data else [],
-                "updated_at": datetime.now(timezone.utc).isoformat(),
+        except ApiException as e:
+            if e.status == 404:  # Not Found
+                return None
+            logger.error(f"Exception when reading image pre-pull DaemonSet: {e}")
+            raise
+        return KubernetesClient.summarize_daemonset(daemonset)
+
+    @staticmethod
+    def list_node_images() -> List[Dict[str, Any]]:
+        """Get the image names each node reports as present.
+
+        Nodes report their largest images only (50 by default, see the
+        kubelet's nodeStatusMaxImages), each under its tag and digest names.
+        """
+        nodes = call_raw(core_v1_api.list_node)
+        return [
+            {
+                "name": node["metadata"]["name"],
+                "images": [
+                    name
+                    for image in (node.get("status") or {}).get("images") or []
+                    for name in image.get("names") or []
+                ],
             }
+            for node in nodes["items"]
+        ]
+
+    @staticmethod
+    def claim_pool_pod(language: str, project_id: str) -> Optional[str]:
+        """Claim a ready idle pool pod of a runtime for a project.
+
+        The claim is a JSON patch whose first op tests that the pod is still
+        idle, so two concurrent claims of the same pod cannot both succeed;
+        the loser moves on to the next candidate. The claimed pod gets the
+        project labels (so the project Service routes to it) and leaves the
+        pool selector (so the pool Deployment replaces it). Returns the pod
+        name, or None when no idle pod is ready.
+        """
+        pods = call_raw(
+            core_v1_api.list_namespaced_pod,
+            namespace=get_namespace(),
+            label_selector=f"app={POOL_APP_LABEL},{POOL_RUNTIME_LABEL}={language},{POOL_STATE_LABEL}=idle",
+        )
+        for pod in pods["items"]:
+            pod_name = pod["metadata"]["name"]
+            summary = KubernetesClient.summarize_pod(pod)
+            if pod["metadata"].get("deletionTimestamp") or summary["status"] != "Running" or not summary["ready"]:
+                continue
+            try:
+                call_raw(
+                    core_v1_api.patch_namespaced_pod,
+                    name=pod_name,
+                    namespace=get_namespace(),
+                    body=[
+                        {"op": "test", "path": f"/metadata/labels/{POOL_STATE_LABEL}", "value": "idle"},
+                        {"op": "replace", "path": f"/metadata/labels/{POOL_STATE_LABEL}", "value": "claimed"},
+                        {"op": "replace", "path": "/metadata/labels/app", "value": "vibecode"},
+                        {"op": "add", "path": "/metadata/labels/project-id", "value": project_id},
+                    ],
+                )
+            except ApiException as e:
+                if e.status in (404, 409, 422):  # Gone, or claimed by someone else
+                    continue
+                raise
+            logger.info(f"Claimed pool pod {pod_name} for project {project_id}")
+            return pod_name
+        return None
+
+    @staticmethod
+    def exec_in_pod(
+        pod_name: str,
+        command: List[str],
+        stdin: Optional[bytes] = None,
+        timeout_seconds: float = 30,
+    ) -> str:
+        """Run a command in a pod, returning its stdout.
+
+        Raises RuntimeError when the command exits non-zero or does not finish
+        in time. `stream` temporarily swaps the request method of the ApiClient
+        it is given, so exec uses a private ApiClient to keep concurrent calls
+        on the shared one safe.
+        """
+        configuration = kubernetes_provider.get().api_client.configuration
+        exec_api = client.CoreV1Api(api_client=client.ApiClient(configuration))
+        response = stream(
+            exec_api.connect_get_namespaced_pod_exec,
+            pod_name,
+            get_namespace(),
+            command=command,
+            stdin=stdin is not None,
+            stdout=True,
+            stderr=True,
+            tty=False,
+            _preload_content=False,
+        )
+        try:
+            if stdin is not None:
+                for offset in range(0, len(stdin), EXEC_STDIN_CHUNK_SIZE):
+                    response.write_stdin(stdin[offset:offset + EXEC_STDIN_CHUNK_SIZE])
+            response.run_forever(timeout=timeout_seconds)
+            if response.is_open():
+                raise RuntimeError(f"Command in pod {pod_name} did not finish in {timeout_seconds}s")
+            # Buffered output of the finished command; stdout is decoded as
+            # utf-8, so binary output must be encoded (e.g. base64) in the pod
+            stdout = response.read_stdout()
+            stderr = response.read_stderr()
+            if response.returncode != 0:
+                raise RuntimeError(f"Command in pod {pod_name} exited with {response.returncode}: {stderr}")
+            return stdout
+        finally:
+            response.close()
+
+    @staticmethod
+    def delete_claimed_pods(project_id: str) -> List[str]:
+        """Delete the pool pods claimed by a project, returning their names"""
+        pods = call_raw(
+            core_v1_api.list_namespaced_pod,
+            namespace=get_namespace(),
+            label_selector=f"project-id={project_id},{POOL_STATE_LABEL}=claimed",
+        )
+        deleted = []
+        for pod in pods["items"]:
+            pod_name = pod["metadata"]["name"]
+            try:
+                call_raw(core_v1_api.delete_namespaced_pod, name=pod_name, namespace=get_namespace())
+                deleted.append(pod_name)
+            except ApiException as e:
+                if e.status != 404:  # Not Found
+                    logger.error(f"Exception when deleting claimed pod {pod_name}: {e}")
+        return deleted
+
+    @staticmethod
+    def create_data_helper_pod(project_id: str, container_image: str) -> str:
+        """Create a pod that mounts a project PVC at /app/data, for copying data in or out.
+
+        Returns the pod name. An existing helper pod is reused.
+        """
+        resource_names = KubernetesClient.generate_resource_names(project_id)
+        pod_name = f"project-{project_id}-data-helper"
+
+        # Define the Pod; it only idles while commands are exec'd into it
+        pod = {
+            "apiVersion": "v1",
+            "kind": "Pod",
+            "metadata": {
+                "name": pod_name,
+                "namespace": get_namespace(),
+                "labels": {
+                    "app": "vibecode-data-helper",
+                    "project-id": project_id,
+                },
+            },
+            "spec": {
+                "containers": [
+                    {
+                        "name": "data-helper",
+                        "image": container_image,
+                        "command": ["sh", "-c", "while true; do sleep 3600; done"],
+                        "volumeMounts": [
+                            {"name": "project-data", "mountPath": "/app/data"},
+                        ],
+                    }
+                ],
+                "volumes": [
+                    {
+                        "name": "project-data",
+                        "persistentVolumeClaim": {"claimName": resource_names["pvc"]},
+                    },
+                ],
+                "restartPolicy": "Never",
+                "terminationGracePeriodSeconds": 0,
+            },
+        }
+
+        try:
+            call_raw(core_v1_api.create_namespaced_pod, namespace=get_namespace(), body=pod)
+            logger.info(f"Created data helper pod: {pod_name}")
         except ApiException as e:
-            if e.status == 404:  # Not Found - ConfigMap doesn't exist
-                logger.info(f"ConfigMap {configmap_name} not found, creating it")
-                return KubernetesClient.create_configmap_for_files(project_id, files)
-            logger.error(f"Exception when updating ConfigMap: {e}")
+            if e.status != 409:  # Conflict - already exists
+                logger.error(f"Exception when creating data helper pod: {e}")
+                raise
+        return pod_name
+
+    @staticmethod
+    def get_pod_phase(pod_name: str) -> Optional[str]:
+        """Get the phase of a pod, or None if it does not exist"""
+        try:
+            pod = call_raw(core_v1_api.read_namespaced_pod, name=pod_name, namespace=get_namespace())
+            return (pod.get("status") or {}).get("phase")
+        except ApiException as e:
+            if e.status == 404:  # Not Found
+                return None
             raise
+
+    @staticmethod
+    def list_project_pod_names(project_id: str) -> List[str]:
+        """Get the names of the pods serving a project"""
+        pods = call_raw(
+            core_v1_api.list_namespaced_pod,
+            namespace=get_namespace(),
+            label_selector=f"app=vibecode,project-id={project_id}",
+        )
+        return [pod["metadata"]["name"] for pod in pods["items"]]
+
+    @staticmethod
+    def list_running_project_pods(project_id: str) -> List[str]:
+        """Get the names of the running pods serving a project, claimed pool pods included"""
+        pods = call_raw(
+            core_v1_api.list_namespaced_pod,
+            namespace=get_namespace(),
+            label_selector=f"app in (vibecode,{POOL_APP_LABEL}),project-id={project_id}",
+        )
+        return [
+            pod["metadata"]["name"]
+            for pod in pods["items"]
+            if (pod.get("status") or {}).get("phase") == "Running" and not pod["metadata"].get("deletionTimestamp")
+        ]
+
+    @staticmethod
+    def delete_pod(pod_name: str) -> str:
+        """Delete a pod without a grace period, returning "deleted" or "not found" as the status"""
+        try:
+            call_raw(
+                core_v1_api.delete_namespaced_pod,
+                name=pod_name, namespace=get_namespace(), grace_period_seconds=0,
+            )
+            return "deleted"
+        except ApiException as e:
+            if e.status != 404:  # Not Found
+                logger.error(f"Exception when deleting pod {pod_name}: {e}")
+                raise
+            return "not found"
+
+
+class AsyncKubernetesClient:
+    """Asyncio variant of KubernetesClient for use from async route handlers.
+
+    The official client is built on blocking urllib3 calls, so every operation
+    is run on a dedicated thread pool instead of the event loop. The pool size
+    caps how many API calls can be in flight at once (KUBERNETES_MAX_CONCURRENCY),
+    and requests beyond the cap queue without blocking other handlers.
+    """
+
+    _executor: Optional[ThreadPoolExecutor] = None
+    _executor_lock = threading.Lock()
+
+    @classmethod
+    def _get_executor(cls) -> ThreadPoolExecutor:
+        """Create the shared executor on first use"""
+        if cls._executor is None:
+            with cls._executor_lock:
+                if cls._executor is None:
+                    cls._executor = ThreadPoolExecutor(
+                        max_workers=settings.KUBERNETES_MAX_CONCURRENCY,
+                        thread_name_prefix="kubernetes-api",
+                    )
+        return cls._executor
+
+    @classmethod
+    async def _run(cls, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking KubernetesClient call without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            cls._get_executor(), functools.partial(func, *args, **kwargs)
+        )
+
+    @classmethod
+    async def create_pvc(cls, project_id: str, **kwargs: Any) -> Dict[str, Any]:
+        """Create a Persistent Volume Claim for a project"""
+        return await cls._run(KubernetesClient.create_pvc, project_id, **kwargs)
+
+    @classmethod
+    async def create_configmap_for_files(
+        cls, project_id: str, files: List[Dict[str, str]]
+    ) -> Dict[str, Any]:
+        """Create a ConfigMap containing project files"""
+        return await cls._run(KubernetesClient.create_configmap_for_files, project_id, files)
+
+    @classmethod
+    async def create_deployment(
+        cls, project_id: str, pvc_name: str, configmap_name: Optional[str], **kwargs: Any
+    ) -> Dict[str, Any]:
+        """Create a Deployment for a project"""
+        return await cls._run(
+            KubernetesClient.create_deployment,
+            project_id,
+            pvc_name=pvc_name,
+            configmap_name=configmap_name,
+            **kwargs,
+        )
+
+    @classmethod
+    async def create_service(cls, project_id: str, **kwargs: Any) -> Dict[str, Any]:
+        """Create a Service for a project"""
+        return await cls._run(KubernetesClient.create_service, project_id, **kwargs)
+
+    @classmethod
+    async def get_deployment_status(cls, deployment_name: str) -> Dict[str, Any]:
+        """Get the status of a Deployment"""
+        return await cls._run(KubernetesClient.get_deployment_status, deployment_name)
+
+    @classmethod
+    async def get_pod_logs(cls, project_id: str, tail_lines: int = 100) -> str:
+        """Get logs from the pod for a project"""
+        return await cls._run(KubernetesClient.get_pod_logs, project_id, tail_lines)
+
+    @classmethod
+    async def get_cached_pod_logs(cls, project_id: str, tail_lines: int = 100) -> str:
+        """Get logs from the pod for a project, fetching only lines newer than the cache"""
+        from app.core.log_cache import log_cache
+
+        return await cls._run(log_cache.get_logs, project_id, tail_lines)
+
+    @classmethod
+    async def get_merged_pod_logs(cls, project_id: str, **kwargs: Any) -> str:
+        """Get the logs of every pod of a project merged into one timeline"""
+        return await cls._run(KubernetesClient.get_merged_pod_logs, project_id, **kwargs)
+
+    @classmethod
+    async def stream_pod_logs(cls, project_id: str, tail_lines: int = 100) -> AsyncIterator[str]:
+        """Follow the logs of a project pod, yielding lines as they are written.
+
+        A dedicated reader thread moves chunks from the HTTP response into a
+        bounded queue. When the consumer falls behind the queue fills, the
+        reader stops reading and TCP flow control pushes back on the API
+        server. Closing the generator (e.g. on client disconnect) closes the
+        response, which ends the reader thread.
+        """
+        response = await cls._run(KubernetesClient.open_pod_log_stream, project_id, tail_lines)
+        if response is None:
+            return
+
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=LOG_STREAM_QUEUE_SIZE)
+        stopped = threading.Event()
+
+        def reader() -> None:
+            try:
+                for chunk in response.stream(amt=None, decode_content=False):
+                    if stopped.is_set():
+                        break
+                    # Blocks while the queue is full
+                    asyncio.run_coroutine_threadsafe(queue.put(chunk), loop).result()
+            except Exception as e:
+                if not stopped.is_set():
+                    logger.error(f"Exception when streaming pod logs: {e}")
+            finally:
+                if not stopped.is_set():
+                    asyncio.run_coroutine_threadsafe(queue.put(None), loop)
+
+        threading.Thread(target=reader, name=f"log-stream-{project_id}", daemon=True).start()
+
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        pending = ""
+        try:
+            while True:
+                chunk = await queue.get()
+                if chunk is None:
+                    break
+                pending += decoder.decode(chunk)
+                *lines, pending = pending.split("\n")
+                for line in lines:
+                    yield line
+            pending += decoder.decode(b"", final=True)
+            if pending:
+                yield pending
+        finally:
+            stopped.set()
+            response.close()
+            # Unblock a reader waiting on a full queue
+            while not queue.empty():
+                queue.get_nowait()
+
+    @classmethod
+    async def start_container(cls, project_id: str) -> Dict[str, Any]:
+        """Start a container for a project"""
+        return await cls._run(KubernetesClient.start_container, project_id)
+
+    @classmethod
+    async def stop_container(cls, project_id: str) -> Dict[str, Any]:
+        """Stop a container for a project"""
+        return await cls._run(KubernetesClient.stop_container, project_id)
+
+    @classmethod
+    async def restart_container(cls, project_id: str) -> Dict[str, Any]:
+        """Restart a container for a project with a rolling restart"""
+        return await cls._run(KubernetesClient.restart_container, project_id)
+
+    @classmethod
+    async def wait_for_rollout(cls, project_id: str, timeout_seconds: float) -> Dict[str, Any]:
+        """Poll until the latest rollout completes or the timeout expires"""
+        deadline = time.monotonic() + timeout_seconds
+        while True:
+            rollout = await cls._run(KubernetesClient.get_rollout_status, project_id)
+            if rollout["complete"] or time.monotonic() >= deadline:
+                rollout["timed_out"] = not rollout["complete"]
+                return rollout
+            await asyncio.sleep(ROLLOUT_POLL_INTERVAL)
+
+    @classmethod
+    async def delete_project_resources(cls, project_id: str) -> Dict[str, Any]:
+        """Delete all Kubernetes resources for a project"""
+        return await cls._run(KubernetesClient.delete_project_resources, project_id)
+
+    @classmethod
+    async def delete_projects_resources(cls, project_ids: List[str], kinds: Tuple[str, ...] = TEARDOWN_KINDS) -> Dict[str, Any]:
+        """Delete the resources of many projects by label selector"""
+        return await cls._run(KubernetesClient.delete_projects_resources, project_ids, kinds)
+
+    @classmethod
+    async def list_project_objects(cls, kind: str, page_size: int) -> Dict[str, Any]:
+        """Page through every app=vibecode object of a kind"""
+        return await cls._run(KubernetesClient.list_project_objects, kind, page_size)
+
+    @classmethod
+    async def count_projects_objects(cls, project_ids: List[str]) -> Dict[str, int]:
+        """Count the objects still left for many projects"""
+        return await cls._run(KubernetesClient.count_projects_objects, project_ids)
+
+    @classmethod
+    async def delete_project_resource(cls, kind: str, project_id: str) -> str:
+        """Delete one kind of project resource"""
+        return await cls._run(KubernetesClient.delete_project_resource, kind, project_id)
+
+    @classmethod
+    async def get_project_resources(cls, project_id: str) -> Dict[str, Any]:
+        """Get all Kubernetes resources for a project, from the informer cache when synced"""
+        from app.core.informer import get_cluster_informer
+
+        if settings.KUBERNETES_INFORMER_ENABLED and get_cluster_informer().has_synced():
+            return get_cluster_informer().get_project_resources(project_id)
+        return await cls._run(KubernetesClient.get_project_resources, project_id)
+
+    @classmethod
+    async def get_projects_resources(cls, project_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get all Kubernetes resources for many projects, from the informer cache when synced"""
+        from app.core.informer import get_cluster_informer
+
+        if settings.KUBERNETES_INFORMER_ENABLED and get_cluster_informer().has_synced():
+            return {
+                project_id: get_cluster_informer().get_project_resources(project_id)
+                for project_id in project_ids
+            }
+        return await cls._run(KubernetesClient.get_projects_resources, project_ids)
+
+    @classmethod
+    async def get_cluster_capacity(cls) -> Dict[str, Any]:
+        """Get the namespace quota and node capacity left for new project pods"""
+        return await cls._run(KubernetesClient.get_cluster_capacity)
+
+    @classmethod
+    async def list_running_project_ids(cls) -> List[str]:
+        """Get the ids of running projects, from the informer cache when synced"""
+        from app.core.informer import get_cluster_informer
+
+        if settings.KUBERNETES_INFORMER_ENABLED and get_cluster_informer().has_synced():
+            return get_cluster_informer().running_project_ids()
+        return await cls._run(KubernetesClient.list_running_project_ids)
+
+    @classmethod
+    async def update_project_files(
+        cls, project_id: str, files: List[Dict[str, str]]
+    ) -> Dict[str, Any]:
+        """Update the ConfigMap with new project files"""
+        return await cls._run(KubernetesClient.update_project_files, project_id, files)
+
+    @classmethod
+    async def create_pool_deployment(cls, language: str, container_image: str, replicas: int) -> Dict[str, Any]:
+        """Create or reconcile the warm pool Deployment of a runtime"""
+        return await cls._run(KubernetesClient.create_pool_deployment, language, container_image, replicas)
+
+    @classmethod
+    async def create_image_prepull_daemonset(cls, images: Dict[str, str], pause_image: str) -> Dict[str, Any]:
+        """Create or reconcile the DaemonSet that keeps runtime images on every node"""
+        return await cls._run(KubernetesClient.create_image_prepull_daemonset, images, pause_image)
+
+    @classmethod
+    async def get_image_prepull_status(cls) -> Optional[Dict[str, Any]]:
+        """Get the rollout of the image pre-pull DaemonSet, or None if it does not exist"""
+        return await cls._run(KubernetesClient.get_image_prepull_status)
+
+    @classmethod
+    async def list_node_images(cls) -> List[Dict[str, Any]]:
+        """Get the image names each node reports as present"""
+        return await cls._run(KubernetesClient.list_node_images)
+
+    @classmethod
+    async def claim_pool_pod(cls, language: str, project_id: str) -> Optional[str]:
+        """Claim a ready idle pool pod of a runtime for a project"""
+        return await cls._run(KubernetesClient.claim_pool_pod, language, project_id)
+
+    @classmethod
+    async def exec_in_pod(cls, pod_name: str, command: List[str], **kwargs: Any) -> str:
+        """Run a command in a pod, returning its stdout"""
+        return await cls._run(KubernetesClient.exec_in_pod, pod_name, command, **kwargs)
+
+    @classmethod
+    async def delete_claimed_pods(cls, project_id: str) -> List[str]:
+        """Delete the pool pods claimed by a project"""
+        return await cls._run(KubernetesClient.delete_claimed_pods, project_id)
+
+    @classmethod
+    async def create_data_helper_pod(cls, project_id: str, container_image: str) -> str:
+        """Create a pod that mounts a project PVC at /app/data"""
+        return await cls._run(KubernetesClient.create_data_helper_pod, project_id, container_image)
+
+    @classmethod
+    async def wait_for_pod_running(cls, pod_name: str, timeout_seconds: float) -> None:
+        """Poll until a pod is running, raising TimeoutError when it does not start in time"""
+        deadline = time.monotonic() + timeout_seconds
+        while True:
+            phase = await cls._run(KubernetesClient.get_pod_phase, pod_name)
+            if phase == "Running":
+                return
+            if phase in ("Failed", "Succeeded"):
+                raise RuntimeError(f"Pod {pod_name} ended with phase {phase}")
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Pod {pod_name} did not start in {timeout_seconds}s")
+            await asyncio.sleep(ROLLOUT_POLL_INTERVAL)
+
+    @classmethod
+    async def wait_for_project_pods_terminated(cls, project_id: str, timeout_seconds: float) -> None:
+        """Poll until no pod serves a project, raising TimeoutError when they linger"""
+        deadline = time.monotonic() + timeout_seconds
+        while await cls._run(KubernetesClient.list_project_pod_names, project_id):
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Pods of project {project_id} did not terminate in {timeout_seconds}s")
+            await asyncio.sleep(ROLLOUT_POLL_INTERVAL)
+
+    @classmethod
+    async def list_running_project_pods(cls, project_id: str) -> List[str]:
+        """Get the names of the running pods serving a project"""
+        return await cls._run(KubernetesClient.list_running_project_pods, project_id)
+
+    @classmethod
+    async def delete_pod(cls, pod_name: str) -> str:
+        """Delete a pod immediately"""
+        return await cls._run(KubernetesClient.delete_pod, pod_name)
@@ -0,0 +1,156 @@
+from fastapi import HTTPException
+from typing import Any, Callable, Optional
+import logging
+import threading
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Namespace file mounted into pods that run with a service account
+SERVICE_ACCOUNT_NAMESPACE_PATH = "/var/run/secrets/kubernetes.io/serviceaccount/namespace"
+DEFAULT_NAMESPACE = "vibecode"  # Namespace used for local development
+
+
+class KubernetesBackend:
+    """The API clients and namespace every Kubernetes call goes through"""
+
+    def __init__(
+        self,
+        api_client: Any,
+        core_v1_api: Any,
+        apps_v1_api: Any,
+        stream_core_v1_api: Any,
+        stream_apps_v1_api: Any,
+        namespace: str,
+    ):
+        self.api_client = api_client
+        self.core_v1_api = core_v1_api
+        self.apps_v1_api = apps_v1_api
+        self.stream_core_v1_api = stream_core_v1_api
+        self.stream_apps_v1_api = stream_apps_v1_api
+        self.namespace = namespace
+
+
+def load_cluster_backend() -> KubernetesBackend:
+    """Load the in-cluster configuration, or the kubeconfig for local development"""
+    from kubernetes import client, config
+    from app.core.request_layer import build_api_client
+
+    try:
+        # Try to load in-cluster configuration (when running inside a pod)
+        config.load_incluster_config()
+        logger.info("Loaded in-cluster Kubernetes configuration")
+    except config.ConfigException:
+        # Fall back to kubeconfig for local development; raises when there is none
+        config.load_kube_config()
+        logger.info("Loaded kubeconfig configuration")
+
+    # Every request is rate limited and retried by the shared request layer
+    # and has a deadline
+    api_client = build_api_client("default", settings.KUBERNETES_POOL_MAXSIZE, block=True)
+
+    # Watches and log follows hold their connection for minutes, so they get a
+    # separate non-blocking pool and cannot starve regular requests
+    stream_api_client = build_api_client("stream", settings.KUBERNETES_STREAM_POOL_MAXSIZE, block=False)
+
+    try:
+        with open(SERVICE_ACCOUNT_NAMESPACE_PATH, "r") as f:
+            namespace = f.read().strip()
+    except FileNotFoundError:
+        namespace = DEFAULT_NAMESPACE
+        logger.warning(f"Using default namespace: {namespace}")
+
+    return KubernetesBackend(
+        api_client=api_client,
+        core_v1_api=client.CoreV1Api(api_client),
+        apps_v1_api=client.AppsV1Api(api_client),
+        stream_core_v1_api=client.CoreV1Api(stream_api_client),
+        stream_apps_v1_api=client.AppsV1Api(stream_api_client),
+        namespace=namespace,
+    )
+
+
+class KubernetesProvider:
+    """Resolves the Kubernetes backend on first use instead of at import.
+
+    Importing the kubernetes package and loading its configuration is slow
+    and fails on machines without a cluster, so nothing touches either until
+    a call actually needs the API. Tests inject their own backend with
+    set_backend; a failed load is retried on the next use.
+    """
+
+    def __init__(self, loader: Callable[[], KubernetesBackend] = load_cluster_backend):
+        self._loader = loader
+        self._backend: Optional[KubernetesBackend] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> KubernetesBackend:
+        """Get the backend, loading it on first use"""
+        if self._backend is None:
+            with self._lock:
+                if self._backend is None:
+                    self._backend = self._loader()
+        return self._backend
+
+    def set_backend(self, backend: Optional[KubernetesBackend]) -> None:
+        """Replace the backend, e.g. with one pointing at a fake API server"""
+        with self._lock:
+            self._backend = backend
+
+    def reset(self) -> None:
+        """Forget the backend so the next use loads it again"""
+        self.set_backend(None)
+
+    def available(self) -> bool:
+        """Whether a backend is loaded or can be loaded"""
+        try:
+            self.get()
+            return True
+        except Exception as e:
+            logger.warning(f"Kubernetes is not available: {e}")
+            return False
+
+
+# Shared provider
+kubernetes_provider = KubernetesProvider()
+
+
+def get_namespace() -> str:
+    """Get the namespace project resources live in"""
+    return kubernetes_provider.get().namespace
+
+
+def require_kubernetes() -> KubernetesBackend:
+    """Dependency for routes that need the cluster; 503 when it is not configured"""
+    try:
+        return kubernetes_provider.get()
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Kubernetes is not available: {str(e)}")
+
+
+class LazyApi:
+    """Stand-in for one of the backend's API objects, resolved on each attribute access"""
+
+    def __init__(self, name: str):
+        self._name = name
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(getattr(kubernetes_provider.get(), self._name), attr)
+
+
+class LazyKubernetesClient:
+    """Stand-in for AsyncKubernetesClient that imports the client module on first use.
+
+    Services and routers call through this, so importing them does not pull
+    in the kubernetes package.
+    """
+
+    def __getattr__(self, attr: str) -> Any:
+        from app.core.kubernetes import AsyncKubernetesClient
+
+        return getattr(AsyncKubernetesClient, attr)
+
+
+# Shared lazy async client
+k8s = LazyKubernetesClient()
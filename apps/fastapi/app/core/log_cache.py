@@ -0,0 +1,208 @@
+from kubernetes.client.rest import ApiException
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set
+import logging
+import math
+import threading
+
+from app.core.config import settings
+from app.core.informer import get_cluster_informer
+from app.core.kubernetes import KubernetesClient, core_v1_api
+from app.core.kubernetes_provider import get_namespace
+from app.core.raw_api import call_raw
+
+logger = logging.getLogger(__name__)
+
+# Extra seconds requested on incremental fetches to absorb clock skew; the
+# overlap is removed by de-duplicating at the boundary timestamp
+SINCE_SECONDS_SLACK = 1
+
+
+def _parse_log_timestamp(line: str) -> datetime:
+    """Parse the RFC3339Nano timestamp prefix of a log line"""
+    seconds = KubernetesClient.log_sort_key(line).split(".", 1)[0]
+    return datetime.strptime(seconds, "%Y-%m-%dT%H:%M:%S").replace(tzinfo=timezone.utc)
+
+
+def _line_bytes(line: str) -> int:
+    """Size of a log line on the wire, newline included"""
+    return len(line.encode("utf-8")) + 1
+
+
+class ProjectLogBuffer:
+    """Bounded ring buffer of `timestamps=True` log lines for one pod"""
+
+    def __init__(self, pod_name: str, max_bytes: int):
+        self.pod_name = pod_name
+        self.max_bytes = max_bytes
+        self.lines: deque = deque()
+        self.size = 0
+        self.last_key: Optional[str] = None
+        # Lines already buffered at last_key, used to de-duplicate the overlap
+        self.boundary: Set[str] = set()
+        # Whether the buffer holds the pod's entire log
+        self.complete = False
+        self.lock = threading.Lock()
+
+    def append(self, line: str) -> bool:
+        """Append a line unless it was already seen"""
+        key = KubernetesClient.log_sort_key(line)
+        if self.last_key is not None:
+            if key < self.last_key or (key == self.last_key and line in self.boundary):
+                return False
+        if key != self.last_key:
+            self.last_key = key
+            self.boundary = set()
+        self.boundary.add(line)
+
+        self.lines.append(line)
+        self.size += _line_bytes(line)
+        while self.size > self.max_bytes and self.lines:
+            self.size -= _line_bytes(self.lines.popleft())
+            self.complete = False
+        return True
+
+    def clear(self) -> int:
+        """Drop every buffered line, returning the bytes freed"""
+        freed = self.size
+        self.lines.clear()
+        self.size = 0
+        self.last_key = None
+        self.boundary = set()
+        self.complete = False
+        return freed
+
+    def covers(self, tail_lines: int) -> bool:
+        """Whether the last tail_lines lines can be served from the buffer"""
+        return self.complete or len(self.lines) >= tail_lines
+
+    def tail(self, tail_lines: int) -> List[str]:
+        """Get the last tail_lines lines without their timestamps"""
+        start = max(len(self.lines) - tail_lines, 0)
+        return [
+            line.split(" ", 1)[1] if " " in line else ""
+            for i, line in enumerate(self.lines) if i >= start
+        ]
+
+
+class LogCache:
+    """Per-project log buffers with a global byte cap and LRU eviction.
+
+    The first view of a project fetches tail_lines lines. Later views fetch
+    only lines written since the last buffered timestamp (via since_seconds,
+    since this client has no since_time) and serve the requested tail from
+    memory whenever the buffer already covers it. A refresh is bounded by
+    tail_lines like the first fetch, so a project viewed again after hours
+    of chatty output never downloads more than the view shows.
+    """
+
+    def __init__(self, project_max_bytes: int, total_max_bytes: int):
+        self.project_max_bytes = project_max_bytes
+        self.total_max_bytes = total_max_bytes
+        self._buffers: "OrderedDict[str, ProjectLogBuffer]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.fetched_bytes = 0
+
+    def _first_pod_name(self, project_id: str) -> Optional[str]:
+        """Find the pod whose logs are shown, skipping terminating and helper pods"""
+        if settings.KUBERNETES_INFORMER_ENABLED and get_cluster_informer().has_synced():
+            # The informer only indexes app=vibecode pods, so helper pods are never here
+            pods = get_cluster_informer().get_project_resources(project_id)["pods"]
+        else:
+            response = call_raw(
+                core_v1_api.list_namespaced_pod,
+                namespace=get_namespace(),
+                label_selector=f"app=vibecode,project-id={project_id}",
+            )
+            pods = sorted(
+                (KubernetesClient.summarize_pod(pod) for pod in response["items"]),
+                key=lambda pod: pod["name"],
+            )
+        names = [pod["name"] for pod in pods if not pod.get("terminating")]
+        return names[0] if names else None
+
+    def _buffer_for(self, project_id: str, pod_name: str) -> ProjectLogBuffer:
+        """Get the buffer of a project, replacing it when the pod changed"""
+        with self._lock:
+            buffer = self._buffers.get(project_id)
+            if buffer is None or buffer.pod_name != pod_name:
+                buffer = ProjectLogBuffer(pod_name, self.project_max_bytes)
+                self._buffers[project_id] = buffer
+            self._buffers.move_to_end(project_id)
+            return buffer
+
+    def _evict(self) -> None:
+        """Evict least recently used projects until under the global cap"""
+        with self._lock:
+            total = sum(buffer.size for buffer in self._buffers.values())
+            while total > self.total_max_bytes and len(self._buffers) > 1:
+                project_id, buffer = self._buffers.popitem(last=False)
+                total -= buffer.size
+                logger.info(f"Evicted log cache for project {project_id}")
+
+    def _fill(self, buffer: ProjectLogBuffer, tail_lines: int) -> None:
+        """Rebuild a buffer from the last tail_lines lines"""
+        lines = KubernetesClient.read_pod_log_lines(buffer.pod_name, tail_lines=tail_lines)
+        buffer.clear()
+        for line in lines:
+            buffer.append(line)
+        self.fetched_bytes += sum(_line_bytes(line) for line in lines)
+        buffer.complete = len(lines) < tail_lines
+
+    def _refresh(self, buffer: ProjectLogBuffer, tail_lines: int) -> None:
+        """Append only the lines written since the last buffered timestamp, at most tail_lines of them.
+
+        limit_bytes is not used: it keeps the oldest bytes of the window,
+        while a view needs the newest.
+        """
+        elapsed = datetime.now(timezone.utc) - _parse_log_timestamp(buffer.last_key)
+        since_seconds = max(math.ceil(elapsed.total_seconds()), 0) + SINCE_SECONDS_SLACK
+        lines = KubernetesClient.read_pod_log_lines(
+            buffer.pod_name, tail_lines=tail_lines, since_seconds=since_seconds
+        )
+        self.fetched_bytes += sum(_line_bytes(line) for line in lines)
+        if len(lines) >= tail_lines:
+            # The window may hold more than was returned, leaving a gap after
+            # the buffered lines; the new lines alone are the tail
+            buffer.clear()
+        for line in lines:
+            buffer.append(line)
+
+    def get_logs(self, project_id: str, tail_lines: int = 100) -> str:
+        """Get the last tail_lines log lines of a project's pod"""
+        try:
+            pod_name = self._first_pod_name(project_id)
+            if pod_name is None:
+                return "No pods found for this project"
+
+            buffer = self._buffer_for(project_id, pod_name)
+            with buffer.lock:
+                if buffer.last_key is None or not buffer.covers(tail_lines):
+                    self._fill(buffer, tail_lines)
+                else:
+                    self._refresh(buffer, tail_lines)
+                logs = "\n".join(buffer.tail(tail_lines))
+            self._evict()
+            return logs
+        except ApiException as e:
+            logger.error(f"Exception when getting pod logs: {e}")
+            return f"Error getting logs: {str(e)}"
+
+    def invalidate(self, project_id: str) -> None:
+        """Forget the buffered logs of a project"""
+        with self._lock:
+            self._buffers.pop(project_id, None)
+
+    def stats(self) -> Dict[str, int]:
+        """Get cache size and transfer counters"""
+        with self._lock:
+            return {
+                "projects": len(self._buffers),
+                "buffered_bytes": sum(buffer.size for buffer in self._buffers.values()),
+                "fetched_bytes": self.fetched_bytes,  # Bytes transferred from the API server
+            }
+
+
+# Shared log cache
+log_cache = LogCache(settings.LOG_CACHE_PROJECT_MAX_BYTES, settings.LOG_CACHE_TOTAL_MAX_BYTES)
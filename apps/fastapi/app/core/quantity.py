@@ -0,0 +1,27 @@
+from typing import Optional
+import re
+
+# Kubernetes resource quantities: "100m", "1.5", "128Mi", "1G", "2e3"
+QUANTITY_RE = re.compile(r"^([+-]?[0-9.]+)(?:([eE][+-]?[0-9]+)|(n|u|m|k|M|G|T|P|E|Ki|Mi|Gi|Ti|Pi|Ei))?$")
+QUANTITY_SUFFIXES = {
+    None: 1,
+    "n": 10**-9, "u": 10**-6, "m": 10**-3,
+    "k": 10**3, "M": 10**6, "G": 10**9, "T": 10**12, "P": 10**15, "E": 10**18,
+    "Ki": 2**10, "Mi": 2**20, "Gi": 2**30, "Ti": 2**40, "Pi": 2**50, "Ei": 2**60,
+}
+
+
+def parse_quantity(quantity: Optional[str], default: Optional[float] = None) -> float:
+    """Convert a resource quantity such as "100m" or "1Gi" to a number (cores, bytes, count).
+
+    Raises ValueError for malformed quantities unless a default is given.
+    """
+    match = QUANTITY_RE.match(str(quantity).strip()) if quantity is not None else None
+    if not match:
+        if default is not None:
+            return default
+        raise ValueError(f"Invalid quantity: {quantity!r}")
+    number, exponent, suffix = match.groups()
+    if exponent:
+        return float(number + exponent)
+    return float(number) * QUANTITY_SUFFIXES[suffix]
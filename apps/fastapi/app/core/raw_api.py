@@ -0,0 +1,88 @@
+from kubernetes import watch
+from typing import Dict, Optional, Any, Callable
+from datetime import datetime
+import json
+
+try:
+    import orjson
+except ImportError:  # Optional; the standard library parser is used without it
+    orjson = None
+
+
+def loads(data: Any) -> Any:
+    """Parse a JSON document with orjson when available"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def call_raw(func: Callable[..., Any], **kwargs) -> Dict[str, Any]:
+    """Call a generated API method and return the response body as plain dicts.
+
+    `_preload_content=False` hands back the undecoded HTTP response, which is
+    parsed in one pass instead of being deserialized into model objects
+    (datetime parsing and a constructor per nested field). Objects keep their
+    API field names (camelCase). Errors still raise ApiException.
+    """
+    response = func(_preload_content=False, **kwargs)
+    try:
+        return loads(response.data)
+    finally:
+        response.release_conn()
+
+
+MERGE_PATCH_CONTENT_TYPE = "application/merge-patch+json"
+
+
+def merge_patch_raw(api: Any, path: str, body: Dict[str, Any], **path_params) -> Dict[str, Any]:
+    """Send a JSON merge patch (RFC 7386) and return the response body as plain dicts.
+
+    The generated patch methods of this client version cannot choose the
+    patch type: a dict body always goes out as a strategic merge patch. A
+    merge patch is spelled out here so that null deletes a key and maps
+    are merged key by key, whatever the object's patch strategy.
+    """
+    response = api.api_client.call_api(
+        path, "PATCH",
+        path_params,
+        [],
+        {"Accept": "application/json", "Content-Type": MERGE_PATCH_CONTENT_TYPE},
+        body=body,
+        auth_settings=["BearerToken"],
+        _return_http_data_only=True,
+        _preload_content=False,
+    )
+    try:
+        return loads(response.data)
+    finally:
+        response.release_conn()
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Parse an API timestamp such as "2024-01-01T00:00:00Z"; None stays None"""
+    return datetime.fromisoformat(value.replace("Z", "+00:00")) if value else None
+
+
+def format_timestamp(value: Optional[str]) -> Optional[str]:
+    """Render an API timestamp the way datetime.isoformat() does, as the models did"""
+    if value and value.endswith("Z"):
+        return value[:-1] + "+00:00"
+    return value
+
+
+class RawWatch(watch.Watch):
+    """Watch whose events carry the object as a plain dict.
+
+    The stock Watch re-encodes every event object and deserializes it into a
+    model; here the event line is parsed once and the dict is used as is.
+    """
+
+    def unmarshal_event(self, data: Any, return_type: Any) -> Dict[str, Any]:
+        event = loads(data)
+        event["raw_object"] = event["object"]
+        obj = event["object"]
+        if event["type"] not in ("ERROR", "BOOKMARK") and isinstance(obj, dict):
+            resource_version = (obj.get("metadata") or {}).get("resourceVersion")
+            if resource_version:
+                self.resource_version = resource_version
+        return event
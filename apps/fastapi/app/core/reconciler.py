@@ -0,0 +1,140 @@
+from kubernetes.client.rest import ApiException
+from typing import Dict, Optional, Any, Callable, Tuple
+import hashlib
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Annotation holding the hash of the desired spec an object was last written from
+SPEC_HASH_ANNOTATION = "vibecode.dev/spec-hash"
+
+# How long a reconcile waits for a terminating object to go before recreating it
+TERMINATING_WAIT_SECONDS = 60.0
+TERMINATING_POLL_INTERVAL = 0.5
+
+# Optional lookup of (kind, project_id, name) -> {"spec_hash", "summary"} from a
+# watch cache, registered by the informer so reconciles can skip reads too
+_cache_lookup: Optional[Callable[[str, str, str], Optional[Dict[str, Any]]]] = None
+
+
+def set_cache_lookup(lookup: Optional[Callable[[str, str, str], Optional[Dict[str, Any]]]]) -> None:
+    """Register (or clear) the cache consulted before reading live objects"""
+    global _cache_lookup
+    _cache_lookup = lookup
+
+
+def compute_spec_hash(manifest: Dict[str, Any]) -> str:
+    """Hash the desired state of a manifest.
+
+    The hash annotation itself is excluded, and so is a Deployment's
+    spec.replicas: replicas are owned by start/stop, not by the desired spec.
+    """
+    metadata = manifest.get("metadata", {})
+    annotations = {
+        key: value for key, value in (metadata.get("annotations") or {}).items()
+        if key != SPEC_HASH_ANNOTATION
+    }
+    body = {**manifest, "metadata": {**metadata, "annotations": annotations}}
+    if not annotations:
+        del body["metadata"]["annotations"]
+    if body.get("kind") == "Deployment":
+        body["spec"] = {key: value for key, value in body.get("spec", {}).items() if key != "replicas"}
+    encoded = json.dumps(body, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def stamp_spec_hash(manifest: Dict[str, Any]) -> str:
+    """Compute the spec hash and store it as an annotation on the manifest"""
+    spec_hash = compute_spec_hash(manifest)
+    manifest["metadata"].setdefault("annotations", {})[SPEC_HASH_ANNOTATION] = spec_hash
+    return spec_hash
+
+
+def is_terminating(obj: Dict[str, Any]) -> bool:
+    """Whether a live object has been deleted and is waiting on its finalizers"""
+    return bool(obj["metadata"].get("deletionTimestamp"))
+
+
+def live_spec_hash(obj: Dict[str, Any]) -> Optional[str]:
+    """Get the spec hash annotation of a live object; None once it is terminating"""
+    if is_terminating(obj):
+        return None
+    annotations = obj["metadata"].get("annotations") or {}
+    return annotations.get(SPEC_HASH_ANNOTATION)
+
+
+def wait_until_gone(kind: str, name: str, read: Callable[[], Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Poll a terminating object until it is deleted, raising RuntimeError when it lingers.
+
+    Returns None once it is gone, or the new object if it was recreated meanwhile.
+    """
+    deadline = time.monotonic() + TERMINATING_WAIT_SECONDS
+    logger.info(f"Waiting for terminating {kind} {name} to be deleted")
+    while True:
+        try:
+            live = read()
+        except ApiException as e:
+            if e.status == 404:  # Not Found - gone
+                return None
+            raise
+        if not is_terminating(live):
+            return live
+        if time.monotonic() >= deadline:
+            raise RuntimeError(f"{kind} {name} is still terminating after {TERMINATING_WAIT_SECONDS:g}s")
+        time.sleep(TERMINATING_POLL_INTERVAL)
+
+
+def reconcile(
+    kind: str,
+    manifest: Dict[str, Any],
+    read: Callable[[], Dict[str, Any]],
+    create: Callable[[Dict[str, Any]], Dict[str, Any]],
+    patch: Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]],
+    summarize: Callable[[Dict[str, Any]], Dict[str, Any]],
+) -> Tuple[str, Dict[str, Any]]:
+    """Bring one object to the desired manifest, writing only when it changed.
+
+    Manifests and live objects are plain API dicts (camelCase field names).
+    Returns the action taken ("created", "patched" or "unchanged") and a
+    summary of the resulting object. An unchanged object costs one read, or no
+    call at all when the watch cache already holds its hash. An object that
+    is being deleted counts as absent: the reconcile waits for it to go and
+    creates it again, rather than keeping something about to disappear.
+    """
+    spec_hash = stamp_spec_hash(manifest)
+    name = manifest["metadata"]["name"]
+    project_id = (manifest["metadata"].get("labels") or {}).get("project-id", "")
+
+    if _cache_lookup is not None:
+        cached = _cache_lookup(kind, project_id, name)
+        if cached is not None and cached["spec_hash"] == spec_hash:
+            return "unchanged", cached["summary"]
+
+    try:
+        live = read()
+    except ApiException as e:
+        if e.status != 404:  # Not Found
+            raise
+        live = None
+
+    if live is not None and is_terminating(live):
+        live = wait_until_gone(kind, name, read)
+
+    if live is None:
+        try:
+            created = create(manifest)
+            logger.info(f"Created {kind}: {name}")
+            return "created", summarize(created)
+        except ApiException as e:
+            if e.status != 409:  # Conflict - created concurrently
+                raise
+            live = read()
+
+    if live_spec_hash(live) == spec_hash:
+        return "unchanged", summarize(live)
+
+    patched = patch(live, manifest)
+    logger.info(f"Patched {kind}: {name}")
+    return "patched", summarize(patched)
@@ -0,0 +1,365 @@
+from kubernetes import client
+from kubernetes.client.rest import ApiException
+from typing import Dict, List, Optional, Any, Callable, Tuple
+import logging
+import random
+import socket
+import threading
+import time
+
+import urllib3
+from urllib3.connection import HTTPConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Methods that can be sent twice with the same effect. Patches are too,
+# except JSON patches, whose `test` ops make a replay fail or double-apply.
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE", "PATCH"}
+
+
+def is_json_patch(method: str, body: Any) -> bool:
+    """Whether a request is a JSON patch (RFC 6902).
+
+    Told apart by the body: the generated client labels every PATCH
+    application/json-patch+json and the REST client only rewrites it to a
+    strategic merge patch on the wire when the body is not a list, so the
+    header seen here does not say which patch type is sent.
+    """
+    return method.upper() == "PATCH" and isinstance(body, list)
+
+# Statuses worth retrying: throttling is safe for any method because the
+# server rejected the request before acting on it, errors only when idempotent
+THROTTLED_STATUS = 429
+RETRYABLE_ERROR_STATUSES = {500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at `rate` tokens per second up to `burst`.
+
+    Callers reserve a token and sleep off any debt outside the lock, so
+    waiters are served in arrival order and a burst is smoothed instead of
+    rejected. A rate of zero or less disables the limit.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, blocking until it is available; returns the seconds waited"""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+def parse_retry_after(exception: ApiException) -> Optional[float]:
+    """Get the Retry-After delay of a response in seconds, if it sent one"""
+    value = (exception.headers or {}).get("Retry-After")
+    try:
+        return max(float(value), 0.0) if value is not None else None
+    except ValueError:
+        # HTTP-date form; the API server only sends seconds
+        return None
+
+
+class RequestLayer:
+    """Rate limits and retries every request made to the Kubernetes API.
+
+    Reads and writes draw from separate token buckets, so a burst of project
+    creations queues instead of overwhelming the API server and cannot
+    starve status reads. Throttled (429) requests are retried after the
+    server's Retry-After; 5xx responses and connection errors are retried
+    with full-jitter exponential backoff, but only for idempotent requests.
+    """
+
+    def __init__(
+        self,
+        read_qps: float,
+        read_burst: int,
+        write_qps: float,
+        write_burst: int,
+        max_attempts: int,
+        base_delay: float,
+        max_delay: float,
+    ):
+        self.read_bucket = TokenBucket(read_qps, read_burst)
+        self.write_bucket = TokenBucket(write_qps, write_burst)
+        self.max_attempts = max(max_attempts, 1)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Any] = {
+            "reads": 0,
+            "writes": 0,
+            "throttled": 0,  # Requests that waited for a token
+            "throttle_wait_seconds": 0.0,
+            "retries": 0,
+            "retries_by_reason": {},
+            "retry_after_honored": 0,
+            "exhausted": 0,  # Requests that failed after the last retry
+        }
+
+    def _count(self, key: str, amount: Any = 1) -> None:
+        with self._lock:
+            self._counters[key] += amount
+
+    def _count_retry(self, reason: str) -> None:
+        with self._lock:
+            self._counters["retries"] += 1
+            by_reason = self._counters["retries_by_reason"]
+            by_reason[reason] = by_reason.get(reason, 0) + 1
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff before retry number `attempt` (from 1)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+    def execute(self, method: str, body: Any, send: Callable[[], Any]) -> Any:
+        """Send a request through the rate limiter, retrying it when that is safe"""
+        method = method.upper()
+        is_read = method in READ_METHODS
+        idempotent = method in IDEMPOTENT_METHODS and not is_json_patch(method, body)
+        bucket = self.read_bucket if is_read else self.write_bucket
+
+        attempt = 1
+        while True:
+            waited = bucket.acquire()
+            self._count("reads" if is_read else "writes")
+            if waited > 0:
+                self._count("throttled")
+                self._count("throttle_wait_seconds", waited)
+
+            try:
+                return send()
+            except ApiException as e:
+                if e.status == THROTTLED_STATUS:
+                    reason = str(e.status)
+                elif e.status in RETRYABLE_ERROR_STATUSES and idempotent:
+                    reason = str(e.status)
+                else:
+                    raise
+                if attempt >= self.max_attempts:
+                    self._count("exhausted")
+                    raise
+                retry_after = parse_retry_after(e)
+                if retry_after is not None:
+                    self._count("retry_after_honored")
+                    delay = min(retry_after, self.max_delay)
+                else:
+                    delay = self.backoff(attempt)
+            except urllib3.exceptions.HTTPError as e:
+                if not idempotent:
+                    raise
+                if attempt >= self.max_attempts:
+                    self._count("exhausted")
+                    raise
+                reason = "connection"
+                delay = self.backoff(attempt)
+
+            self._count_retry(reason)
+            logger.warning(
+                f"Retrying {method} after {reason} in {delay:.2f}s (attempt {attempt + 1}/{self.max_attempts})"
+            )
+            time.sleep(delay)
+            attempt += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Get request, throttling and retry counters"""
+        with self._lock:
+            counters = dict(self._counters)
+            counters["retries_by_reason"] = dict(counters["retries_by_reason"])
+            counters["throttle_wait_seconds"] = round(counters["throttle_wait_seconds"], 3)
+            return counters
+
+
+def request_timeout(operation: str = "default") -> Tuple[float, Optional[float]]:
+    """Get the (connect, read) timeout of a kind of operation.
+
+    "status" is for the reads behind status endpoints, which should fail fast;
+    "stream" is for watches and log follows, which may legitimately stay
+    silent for minutes and rely on TCP keep-alive to notice dead peers.
+    """
+    connect = settings.KUBERNETES_CONNECT_TIMEOUT_SECONDS
+    if operation == "status":
+        return (connect, settings.KUBERNETES_STATUS_TIMEOUT_SECONDS)
+    if operation == "stream":
+        return (connect, None)
+    return (connect, settings.KUBERNETES_READ_TIMEOUT_SECONDS)
+
+
+def is_streaming_request(query_params: Optional[List[Tuple[str, Any]]]) -> bool:
+    """Whether a request is a watch or a log follow"""
+    return any(key in ("watch", "follow") and value for key, value in (query_params or []))
+
+
+class PoolMetrics:
+    """Connection usage and wait-time counters of one connection pool"""
+
+    def __init__(self, maxsize: int, block: bool):
+        self.maxsize = maxsize
+        self.block = block
+        self._lock = threading.Lock()
+        self.in_use = 0
+        self.max_in_use = 0
+        self.checkouts = 0
+        self.waits = 0  # Checkouts that had to wait for a free connection
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.timeouts = 0  # Checkouts that gave up waiting
+        self.discarded = 0  # Connections closed because the pool was full
+
+    def checked_out(self, waited: float) -> None:
+        with self._lock:
+            self.in_use += 1
+            self.max_in_use = max(self.max_in_use, self.in_use)
+            self.checkouts += 1
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+            if waited > 0.001:
+                self.waits += 1
+
+    def checked_in(self, discarded: bool) -> None:
+        with self._lock:
+            self.in_use = max(self.in_use - 1, 0)
+            if discarded:
+                self.discarded += 1
+
+    def timed_out(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "maxsize": self.maxsize,
+                "block": self.block,
+                "in_use": self.in_use,
+                "max_in_use": self.max_in_use,
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "wait_seconds": round(self.wait_seconds, 3),
+                "max_wait_seconds": round(self.max_wait_seconds, 3),
+                "timeouts": self.timeouts,
+                "discarded": self.discarded,
+            }
+
+
+# Pool name -> metrics of every ApiClient built by build_api_client
+_pool_metrics: Dict[str, PoolMetrics] = {}
+
+
+def pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Get the usage and wait-time counters of every connection pool"""
+    return {name: metrics.stats() for name, metrics in _pool_metrics.items()}
+
+
+def _instrumented_pool(pool_class: type, metrics: PoolMetrics) -> type:
+    """Subclass a urllib3 connection pool to record checkouts into metrics"""
+
+    class InstrumentedPool(pool_class):
+        def _get_conn(self, timeout=None):
+            if timeout is None and self.block:
+                # urlopen passes no pool timeout, which would wait forever
+                timeout = settings.KUBERNETES_POOL_TIMEOUT_SECONDS
+            started = time.perf_counter()
+            try:
+                conn = super()._get_conn(timeout=timeout)
+            except urllib3.exceptions.EmptyPoolError:
+                metrics.timed_out()
+                raise
+            metrics.checked_out(time.perf_counter() - started)
+            return conn
+
+        def _put_conn(self, conn):
+            discarded = self.pool is not None and self.pool.full()
+            metrics.checked_in(discarded)
+            super()._put_conn(conn)
+
+    InstrumentedPool.__name__ = f"Instrumented{pool_class.__name__}"
+    return InstrumentedPool
+
+
+def keepalive_socket_options() -> List[Tuple[int, int, int]]:
+    """Socket options enabling TCP keep-alive probes on API server connections"""
+    options = list(HTTPConnection.default_socket_options)
+    options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    idle = settings.KUBERNETES_TCP_KEEPALIVE_SECONDS
+    # Probe tuning is Linux-specific; elsewhere the system defaults apply
+    if hasattr(socket, "TCP_KEEPIDLE"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, idle))
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, max(idle // 3, 1)))
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPCNT, 3))
+    return options
+
+
+def build_api_client(name: str, maxsize: int, block: bool) -> "ThrottledApiClient":
+    """Build an ApiClient with a sized, instrumented, keep-alive connection pool.
+
+    With block set, requests beyond maxsize wait for a free connection
+    (bounded by KUBERNETES_POOL_TIMEOUT_SECONDS) instead of opening a
+    throwaway connection that is discarded after one use.
+    """
+    configuration = client.Configuration.get_default_copy()
+    configuration.connection_pool_maxsize = maxsize
+    # The request layer owns retries; urllib3's own would multiply them
+    configuration.retries = False
+    api_client = ThrottledApiClient(configuration)
+
+    metrics = PoolMetrics(maxsize, block)
+    _pool_metrics[name] = metrics
+    pool_manager = api_client.rest_client.pool_manager
+    pool_manager.pool_classes_by_scheme = {
+        "http": _instrumented_pool(HTTPConnectionPool, metrics),
+        "https": _instrumented_pool(HTTPSConnectionPool, metrics),
+    }
+    pool_manager.connection_pool_kw["block"] = block
+    pool_manager.connection_pool_kw["socket_options"] = keepalive_socket_options()
+    return api_client
+
+
+class ThrottledApiClient(client.ApiClient):
+    """ApiClient whose requests all go through the shared request layer.
+
+    Requests without an explicit `_request_timeout` get the default
+    deadline, or the stream one for watches and log follows.
+    """
+
+    def request(self, method, url, query_params=None, headers=None, post_params=None,
+                body=None, _preload_content=True, _request_timeout=None):
+        if _request_timeout is None:
+            _request_timeout = request_timeout("stream" if is_streaming_request(query_params) else "default")
+        return request_layer.execute(
+            method,
+            body,
+            lambda: super(ThrottledApiClient, self).request(
+                method, url, query_params=query_params, headers=headers, post_params=post_params,
+                body=body, _preload_content=_preload_content, _request_timeout=_request_timeout,
+            ),
+        )
+
+
+# Shared request layer
+request_layer = RequestLayer(
+    read_qps=settings.KUBERNETES_READ_QPS,
+    read_burst=settings.KUBERNETES_READ_BURST,
+    write_qps=settings.KUBERNETES_WRITE_QPS,
+    write_burst=settings.KUBERNETES_WRITE_BURST,
+    max_attempts=settings.KUBERNETES_RETRY_MAX_ATTEMPTS,
+    base_delay=settings.KUBERNETES_RETRY_BASE_DELAY_SECONDS,
+    max_delay=settings.KUBERNETES_RETRY_MAX_DELAY_SECONDS,
+)
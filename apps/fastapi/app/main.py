@@ -4,9 +4,15 @@ from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.models.project import Project
 from app.core.init_db import init_db
+from app.core.config import settings
+from app.core.kubernetes_provider import kubernetes_provider
+from app.services.warm_pool import warm_pool
+from app.services.idle_controller import idle_controller
+from app.services.orphan_gc import orphan_collector
+from app.services.runtime_images import runtime_images
 from app.core.auth import get_current_user, create_access_token
 from app.models.user import User
-from app.routers import auth, test, projects, containers, test_containers, proxy_test_containers, mock_containers, exact_proxy_containers
+from app.routers import auth, test, projects, containers, preview, bundles, test_containers, proxy_test_containers, mock_containers, exact_proxy_containers
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime, timedelta
@@ -32,6 +38,8 @@ app.include_router(auth.router)
 app.include_router(test.router)
 app.include_router(projects.router)
 app.include_router(containers.router)
+app.include_router(preview.router)
+app.include_router(bundles.router)
 app.include_router(test_containers.router)
 app.include_router(proxy_test_containers.router)
 app.include_router(mock_containers.router)
@@ -41,6 +49,37 @@ app.include_router(exact_proxy_containers.router)
 @app.on_event("startup")
 async def startup_event():
     init_db()
+    # The API still serves projects without a cluster; container routes return 503
+    if not kubernetes_provider.available():
+        return
+    if settings.KUBERNETES_INFORMER_ENABLED:
+        from app.core.informer import get_cluster_informer
+
+        get_cluster_informer().start()
+    if settings.RUNTIME_IMAGE_PINNING_ENABLED or settings.RUNTIME_IMAGE_PREPULL_ENABLED:
+        # Resolves digests in the background; images run by tag until then
+        runtime_images.start()
+    if settings.WARM_POOL_ENABLED:
+        await warm_pool.ensure_pools()
+    if settings.IDLE_SCALE_TO_ZERO_ENABLED:
+        idle_controller.start()
+    if settings.ORPHAN_GC_ENABLED:
+        orphan_collector.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if settings.IDLE_SCALE_TO_ZERO_ENABLED:
+        await idle_controller.stop()
+    if settings.ORPHAN_GC_ENABLED:
+        await orphan_collector.stop()
+    if settings.RUNTIME_IMAGE_PINNING_ENABLED or settings.RUNTIME_IMAGE_PREPULL_ENABLED:
+        await runtime_images.stop()
+    await preview.close_http_client()
+    # Started only with a cluster; importing the informer needs the kubernetes package
+    if settings.KUBERNETES_INFORMER_ENABLED and kubernetes_provider.available():
+        from app.core.informer import get_cluster_informer
+
+        get_cluster_informer().stop()
 
 class File(BaseModel):
     name: str
@@ -207,6 +246,13 @@ async def create_test_project(db: Session = Depends(get_db)):
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/api/fastapi/kubernetes/stats")
+async def kubernetes_stats():
+    """Get Kubernetes API request, retry and connection pool counters"""
+    from app.core.request_layer import request_layer, pool_stats
+
+    return {"requests": request_layer.stats(), "pools": pool_stats()}
+
 @app.get("/api/fastapi/projects")
 async def get_all_projects(db: Session = Depends(get_db)):
     """Get all projects without authentication"""
@@ -0,0 +1,24 @@
+"""Add last activity time to Project model
+
+Revision ID: add_last_activity_at
+Revises: add_kubernetes_fields
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_last_activity_at'
+down_revision = 'add_kubernetes_fields'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Shared by every API process so idle scale-to-zero sees all activity
+    op.add_column('projects', sa.Column('last_activity_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('projects', 'last_activity_at')
@@ -27,6 +27,7 @@ class Project(Base):
     container_status = Column(String)  # Status of the container (e.g., "Running", "Pending", "Failed")
     container_created_at = Column(DateTime)  # When the container was created
     container_last_started_at = Column(DateTime)  # When the container was last started
+    last_activity_at = Column(DateTime)  # Last API, log or preview activity, shared by all API processes
     container_image = Column(String)  # The container image being used
     container_port = Column(String)   # The port the container is exposing
     k8s_resources = Column(JSON, default={})  # Additional Kubernetes resource information as JSON
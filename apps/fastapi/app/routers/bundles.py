@@ -0,0 +1,58 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.orm import Session
+import asyncio
+import logging
+
+from app.core.database import get_db
+from app.models.project import Project as ProjectDB
+from app.services.bundles import check_project_bundle_token, project_bundle_ref, publish_bundle
+from app.services.object_store import object_store
+
+logger = logging.getLogger(__name__)
+
+# Internal endpoint fetched by the bundle init container of project pods
+router = APIRouter(prefix="/internal/bundles", tags=["internal"])
+
+@router.get("/{digest}")
+async def get_bundle(digest: str):
+    """Serve a project file bundle by its content digest"""
+    try:
+        bundle = await asyncio.to_thread(object_store.get, digest)
+    except (FileNotFoundError, ValueError):
+        raise HTTPException(status_code=404, detail="Bundle not found")
+
+    # Content-addressed, so a digest always names the same bytes
+    return Response(
+        content=bundle,
+        media_type="application/gzip",
+        headers={"Cache-Control": "public, max-age=31536000, immutable", "ETag": f'"{digest}"'},
+    )
+
+@router.get("/projects/{project_id}")
+async def get_project_bundle(
+    project_id: str,
+    token: str = Query("", description="The project's bundle token, from its bundle URL"),
+    db: Session = Depends(get_db)
+):
+    """Serve the current file bundle of a project, rebuilding it from the database if the store lost it"""
+    # The route is reachable from every pod; only the project's own URL may read it
+    if not check_project_bundle_token(project_id, token):
+        raise HTTPException(status_code=403, detail="Invalid bundle token")
+    try:
+        digest = await asyncio.to_thread(object_store.get_ref, project_bundle_ref(project_id))
+        if digest is not None and await asyncio.to_thread(object_store.size, digest) is None:
+            digest = None
+    except ValueError:
+        digest = None
+    if digest is None:
+        # Store wiped or never published on this volume; the database has the files
+        project = db.query(ProjectDB).filter(ProjectDB.id == project_id).first()
+        if not project:
+            raise HTTPException(status_code=404, detail="Bundle not found")
+        logger.info(f"Rebuilding missing file bundle of project {project_id}")
+        digest = (await publish_bundle(project_id, project.files or []))["digest"]
+
+    # The ref moves on every save, so only the digest route is cacheable
+    response = await get_bundle(digest)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
@@ -1,15 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from datetime import datetime, timezone
+import asyncio
+import json
 import uuid
 
 from app.core.database import get_db
 from app.models.project import Project as ProjectDB
-from app.schemas.project import ContainerAction, ContainerActionResponse, ContainerConfig
-from app.core.kubernetes import KubernetesClient
-
-router = APIRouter(prefix="/api/containers", tags=["containers"])
+from app.schemas.project import ContainerAction, ContainerActionResponse, ContainerConfig, ContainerStatusBatchRequest, ContainerTeardownRequest
+from app.core.kubernetes_provider import k8s, require_kubernetes
+from app.services.provisioning import provision_project_resources, ProvisioningError
+from app.services.warm_pool import warm_pool
+from app.services.idle_controller import activity_tracker
+from app.services.hibernation import hibernate_project, release_archive
+from app.services.file_sync import sync_project_files
+from app.services.teardown import teardown_tracker
+from app.services.orphan_gc import orphan_collector
+from app.services.scheduler import provisioning_scheduler, project_cost
+from app.services.runtime_images import runtime_images
+from app.core.config import settings
+
+router = APIRouter(prefix="/api/containers", tags=["containers"], dependencies=[Depends(require_kubernetes)])
+
+# Seconds between SSE keep-alive comments on an idle log stream
+LOG_STREAM_KEEPALIVE_SECONDS = 15
+
+def update_project_container_status(project: ProjectDB, resources: Dict[str, Any]) -> bool:
+    """Copy the first pod's state onto the project row, returning whether it changed"""
+    if resources["deployment"] and resources["pods"]:
+        pods = resources["pods"]
+        if isinstance(pods, list) and len(pods) > 0:
+            pod = pods[0]
+            running = pod["status"] == "Running" and pod["ready"]
+            project.container_running = running
+            project.container_status = pod["status"]
+            return True
+    return False
+
+def hibernation_record(project: ProjectDB) -> Optional[Dict[str, Any]]:
+    """Get the archive reference of a hibernated project, if any"""
+    return (project.k8s_resources or {}).get("hibernation")
 
 @router.post("/{project_id}/action", response_model=ContainerActionResponse)
 async def container_action(
@@ -22,6 +54,7 @@ async def container_action(
     project = db.query(ProjectDB).filter(ProjectDB.id == project_id).first()
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
+    activity_tracker.touch(project_id)
 
     try:
         if action.action == "start":
@@ -30,8 +63,23 @@ async def container_action(
                 # Container resources don't exist yet, create them
                 return await create_container_resources(project_id, db)
 
+            # Serve from a warm pool pod while the Deployment scales up
+            claim = None
+            if settings.WARM_POOL_ENABLED and not project.container_running:
+                claim = await warm_pool.claim(
+                    project_id, project.language, project.files or [], project.container_image
+                )
+
             # Start existing container
-            result = KubernetesClient.start_container(project_id)
+            try:
+                result = await k8s.start_container(project_id)
+            except Exception:
+                if claim:
+                    await warm_pool.release(project_id)
+                raise
+            if claim:
+                result["warm_pod"] = claim
+                warm_pool.schedule_handoff(project_id)
 
             # Update project in database
             project.container_running = True
@@ -53,7 +101,9 @@ async def container_action(
                     detail="Container resources don't exist for this project"
                 )
 
-            result = KubernetesClient.stop_container(project_id)
+            result = await k8s.stop_container(project_id)
+            if settings.WARM_POOL_ENABLED:
+                result["released_pods"] = await warm_pool.release(project_id)
 
             # Update project in database
             project.container_running = False
@@ -72,9 +122,12 @@ async def container_action(
                 # Container resources don't exist yet, create them
                 return await create_container_resources(project_id, db)
 
-            # Stop then start
-            KubernetesClient.stop_container(project_id)
-            result = KubernetesClient.start_container(project_id)
+            # Rolling restart; the old pod keeps serving until the new one is ready
+            result = await k8s.restart_container(project_id)
+            if action.wait:
+                result["rollout"] = await k8s.wait_for_rollout(
+                    project_id, action.timeout_seconds
+                )
 
             # Update project in database
             project.container_running = True
@@ -96,7 +149,16 @@ async def container_action(
                     detail="Container resources don't exist for this project"
                 )
 
-            logs = KubernetesClient.get_pod_logs(project_id, action.tail_lines)
+            if action.all_pods or action.previous:
+                logs = await k8s.get_merged_pod_logs(
+                    project_id,
+                    tail_lines=action.tail_lines,
+                    previous=bool(action.previous),
+                    max_lines=action.tail_lines,
+                    max_bytes=action.max_bytes
+                )
+            else:
+                logs = await k8s.get_cached_pod_logs(project_id, action.tail_lines)
 
             return ContainerActionResponse(
                 success=True,
@@ -110,20 +172,17 @@ async def container_action(
                 return ContainerActionResponse(
                     success=True,
                     message=f"No container resources exist for project {project_id}",
-                    data={"exists": False, "status": "Not Created"}
+                    data={
+                        "exists": False,
+                        "status": "Hibernated" if hibernation_record(project) else "Not Created"
+                    }
                 )
 
-            resources = KubernetesClient.get_project_resources(project_id)
+            resources = await k8s.get_project_resources(project_id)
 
             # Update project status based on resources
-            if resources["deployment"] and resources["pods"]:
-                pods = resources["pods"]
-                if isinstance(pods, list) and len(pods) > 0:
-                    pod = pods[0]
-                    running = pod["status"] == "Running" and pod["ready"]
-                    project.container_running = running
-                    project.container_status = pod["status"]
-                    db.commit()
+            if update_project_container_status(project, resources):
+                db.commit()
 
             return ContainerActionResponse(
                 success=True,
@@ -131,6 +190,74 @@ async def container_action(
                 data=resources
             )
 
+        elif action.action == "sync":
+            # Push the project files into the running pods without a restart
+            if not project.deployment_name:
+                raise HTTPException(
+                    status_code=400,
+                    detail="Container resources don't exist for this project"
+                )
+            if not (project.k8s_resources or {}).get("bundle"):
+                raise HTTPException(
+                    status_code=400,
+                    detail="Hot sync needs a project provisioned in bundle file delivery mode"
+                )
+
+            # Resend every file and remove the ones deleted since the pods' last known state
+            bundle = project.k8s_resources["bundle"]
+            result = await sync_project_files(
+                project_id,
+                project.files or [],
+                bundle.get("file_hashes"),
+                reload=bool(action.reload),
+                resend=True,
+            )
+            if result["confirmed"] and result["pods"]:
+                project.k8s_resources = {
+                    **project.k8s_resources,
+                    "bundle": {**bundle, "file_hashes": result["file_hashes"]},
+                }
+                db.commit()
+
+            return ContainerActionResponse(
+                success=result["confirmed"],
+                message=f"Synced files into {len(result['pods'])} pod(s) of project {project_id}"
+                if result["confirmed"]
+                else f"Files of project {project_id} not confirmed in every pod",
+                data=result
+            )
+
+        elif action.action == "hibernate":
+            # Archive the project data and free every resource; start restores it
+            if not project.deployment_name:
+                raise HTTPException(
+                    status_code=400,
+                    detail="Container resources don't exist for this project"
+                )
+
+            result = await hibernate_project(project_id)
+
+            # Update project in database
+            project.deployment_name = None
+            project.service_name = None
+            project.pvc_name = None
+            project.container_running = False
+            project.container_status = "Hibernated"
+            project.k8s_resources = {
+                "hibernation": {
+                    "archive": result["archive"],
+                    "size_bytes": result["size_bytes"],
+                    "hibernated_at": result["hibernated_at"]
+                }
+            }
+            db.commit()
+
+            return ContainerActionResponse(
+                success=True,
+                message=f"Hibernated project {project_id}",
+                data=result
+            )
+
         elif action.action == "delete":
             # Delete container resources
             if not project.deployment_name:
@@ -140,7 +267,9 @@ async def container_action(
                     data={"exists": False}
                 )
 
-            result = KubernetesClient.delete_project_resources(project_id)
+            result = await k8s.delete_project_resources(project_id)
+            if settings.WARM_POOL_ENABLED:
+                result["released_pods"] = await warm_pool.release(project_id)
 
             # Update project in database
             project.deployment_name = None
@@ -160,7 +289,7 @@ async def container_action(
         else:
             raise HTTPException(
                 status_code=400,
-                detail=f"Invalid action: {action.action}. Valid actions are: start, stop, restart, logs, status, delete"
+                detail=f"Invalid action: {action.action}. Valid actions are: start, stop, restart, logs, status, sync, hibernate, delete"
             )
 
     except Exception as e:
@@ -182,71 +311,53 @@ async def create_container_resources(
         raise HTTPException(status_code=404, detail="Project not found")
 
     try:
-        # Create PVC
-        pvc_result = KubernetesClient.create_pvc(
-            project_id,
-            storage_size=config.storage_size if config and config.storage_size else "1Gi"
-        )
-
-        # Create ConfigMap for files
+        # Create PVC, ConfigMap, Deployment and Service as a dependency graph,
+        # serving from a warm pool pod meanwhile when the runtime defaults apply.
+        # A hibernated project has its data restored into the new PVC first.
         files = project.files if project.files else []
-        configmap_result = KubernetesClient.create_configmap_for_files(project_id, files)
-
-        # Determine container image based on project language
-        container_image = config.image if config and config.image else "python:3.9-slim"
-        if not config or not config.image:
-            if project.language and project.language.lower() == "javascript":
-                container_image = "node:14-alpine"
-            elif project.language and project.language.lower() == "python":
-                container_image = "python:3.9-slim"
-            elif project.language and project.language.lower() == "go":
-                container_image = "golang:1.17-alpine"
-            elif project.language and project.language.lower() == "java":
-                container_image = "openjdk:11-jdk-slim"
-
-        # Determine container port
-        container_port = config.port if config and config.port else 8000
-
-        # Determine container command
-        command = None
-        if config and config.command:
-            command = config.command
-        else:
-            if project.language and project.language.lower() == "javascript":
-                command = ["node", "index.js"]
-            elif project.language and project.language.lower() == "python":
-                command = ["python", "main.py"]
-            elif project.language and project.language.lower() == "go":
-                command = ["go", "run", "main.go"]
-            elif project.language and project.language.lower() == "java":
-                command = ["java", "-jar", "app.jar"]
-
-        # Create Deployment
-        deployment_result = KubernetesClient.create_deployment(
-            project_id,
-            pvc_name=pvc_result["name"],
-            configmap_name=configmap_result["name"],
-            container_image=container_image,
-            container_port=container_port,
-            command=command,
-            args=config.args if config and config.args else None,
-            env_vars=config.env_vars if config and config.env_vars else None,
-            cpu_limit=config.cpu_limit if config and config.cpu_limit else "500m",
-            memory_limit=config.memory_limit if config and config.memory_limit else "512Mi"
-        )
+        hibernation = hibernation_record(project)
+        restore_archive = hibernation["archive"] if hibernation else None
+
+        def provision() -> Any:
+            # Interactive: ahead of background creations, with reserved slots
+            return provisioning_scheduler.run(
+                project_id,
+                project.owner_id,
+                lambda: provision_project_resources(project_id, files, project.language, config, restore_archive),
+                cost=project_cost(config),
+                interactive=True,
+                timeout=settings.PROVISIONING_INTERACTIVE_TIMEOUT_SECONDS,
+            )
 
-        # Create Service
-        service_result = KubernetesClient.create_service(
-            project_id,
-            container_port=container_port
-        )
+        if settings.WARM_POOL_ENABLED and not hibernation and not (config and (config.image or config.command)):
+            claim, provisioned = await asyncio.gather(
+                warm_pool.claim(project_id, project.language, files),
+                provision(),
+                return_exceptions=True,
+            )
+            if isinstance(provisioned, BaseException):
+                if claim:
+                    await warm_pool.release(project_id)
+                raise provisioned
+        else:
+            claim = None
+            provisioned = await provision()
+        if claim:
+            warm_pool.schedule_handoff(project_id)
+        pvc_result = provisioned["results"]["pvc"]
+        configmap_result = provisioned["results"].get("configmap")
+        bundle_result = provisioned["results"].get("bundle")
+        deployment_result = provisioned["results"]["deployment"]
+        service_result = provisioned["results"]["service"]
+        container_image = provisioned["container_image"]
+        container_port = provisioned["container_port"]
 
         # Update project in database
         project.deployment_name = deployment_result["name"]
         project.service_name = service_result["name"]
         project.pvc_name = pvc_result["name"]
         project.container_running = True
-        project.container_status = "Creating"
+        project.container_status = "Running" if claim else "Creating"
         project.container_created_at = datetime.now(timezone.utc)
         project.container_last_started_at = datetime.now(timezone.utc)
         project.container_image = container_image
@@ -255,10 +366,15 @@ async def create_container_resources(
             "deployment": deployment_result,
             "service": service_result,
             "pvc": pvc_result,
-            "configmap": configmap_result
+            "configmap": configmap_result,
+            "bundle": bundle_result
         }
         db.commit()
 
+        # The data is in the new PVC and the project no longer refers to the archive
+        if restore_archive:
+            await asyncio.to_thread(release_archive, restore_archive)
+
         return ContainerActionResponse(
             success=True,
             message=f"Created container resources for project {project_id}",
@@ -266,10 +382,30 @@ async def create_container_resources(
                 "deployment": deployment_result,
                 "service": service_result,
                 "pvc": pvc_result,
-                "configmap": configmap_result
+                "configmap": configmap_result,
+                "bundle": bundle_result,
+                "timings": provisioned["timings"],
+                "warm_pod": claim,
+                "restored_from": restore_archive
             }
         )
 
+    except asyncio.TimeoutError:
+        return ContainerActionResponse(
+            success=False,
+            message="Error creating container resources: timed out waiting for provisioning capacity",
+            data={"provisioning": provisioning_scheduler.stats()}
+        )
+    except ProvisioningError as e:
+        return ContainerActionResponse(
+            success=False,
+            message=f"Error creating container resources: {str(e)}",
+            data={
+                "failed_step": e.step,
+                "rolled_back": e.rolled_back,
+                "timings": e.timings
+            }
+        )
     except Exception as e:
         return ContainerActionResponse(
             success=False,
@@ -286,6 +422,7 @@ async def get_container_status(
     project = db.query(ProjectDB).filter(ProjectDB.id == project_id).first()
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
+    activity_tracker.touch(project_id)
 
     try:
         # Check if container resources exist
@@ -295,23 +432,17 @@ async def get_container_status(
                 message=f"No container resources exist for project {project_id}",
                 data={
                     "exists": False,
-                    "status": "Not Created",
+                    "status": "Hibernated" if hibernation_record(project) else "Not Created",
                     "running": False
                 }
             )
 
         # Get container resources status
-        resources = KubernetesClient.get_project_resources(project_id)
+        resources = await k8s.get_project_resources(project_id)
 
         # Update project status based on resources
-        if resources["deployment"] and resources["pods"]:
-            pods = resources["pods"]
-            if isinstance(pods, list) and len(pods) > 0:
-                pod = pods[0]
-                running = pod["status"] == "Running" and pod["ready"]
-                project.container_running = running
-                project.container_status = pod["status"]
-                db.commit()
+        if update_project_container_status(project, resources):
+            db.commit()
 
         return ContainerActionResponse(
             success=True,
@@ -331,3 +462,224 @@ async def get_container_status(
                 "error": str(e)
             }
         )
+
+@router.post("/status:batch", response_model=ContainerActionResponse)
+async def get_container_status_batch(
+    request: ContainerStatusBatchRequest,
+    db: Session = Depends(get_db)
+):
+    """Get the status of many project containers with one list call per resource kind"""
+    projects = db.query(ProjectDB).filter(ProjectDB.id.in_(request.project_ids)).all()
+    projects_by_id = {project.id: project for project in projects}
+    not_found = [project_id for project_id in request.project_ids if project_id not in projects_by_id]
+
+    statuses: Dict[str, Any] = {}
+    provisioned_ids = []
+    for project in projects:
+        if project.deployment_name:
+            provisioned_ids.append(project.id)
+        else:
+            statuses[project.id] = {
+                "exists": False,
+                "status": "Hibernated" if hibernation_record(project) else "Not Created",
+                "running": False
+            }
+
+    try:
+        if provisioned_ids:
+            resources_by_project = await k8s.get_projects_resources(provisioned_ids)
+
+            # Update project status based on resources
+            changed = False
+            for project_id, resources in resources_by_project.items():
+                statuses[project_id] = resources
+                changed = update_project_container_status(projects_by_id[project_id], resources) or changed
+            if changed:
+                db.commit()
+
+        return ContainerActionResponse(
+            success=True,
+            message=f"Retrieved status for {len(statuses)} projects",
+            data={
+                "projects": statuses,
+                "not_found": not_found
+            }
+        )
+    except Exception as e:
+        print(f"Error getting batch container status: {str(e)}")
+        return ContainerActionResponse(
+            success=False,
+            message=f"Error getting batch container status: {str(e)}",
+            data={
+                "projects": {
+                    project.id: {
+                        "exists": project.deployment_name is not None,
+                        "status": project.container_status or "Unknown",
+                        "running": project.container_running or False
+                    }
+                    for project in projects
+                },
+                "not_found": not_found,
+                "error": str(e)
+            }
+        )
+
+@router.post("/delete:batch", response_model=ContainerActionResponse, status_code=status.HTTP_202_ACCEPTED)
+async def delete_containers_batch(
+    request: ContainerTeardownRequest,
+    db: Session = Depends(get_db)
+):
+    """Delete the container resources of many projects by label selector, returning a tracking handle"""
+    handle = teardown_tracker.start(request.project_ids)
+
+    # Update projects in database
+    projects = db.query(ProjectDB).filter(ProjectDB.id.in_(request.project_ids)).all()
+    for project in projects:
+        project.deployment_name = None
+        project.service_name = None
+        project.pvc_name = None
+        project.container_running = False
+        project.container_status = "Deleted"
+        project.k8s_resources = None
+    db.commit()
+
+    return ContainerActionResponse(
+        success=True,
+        message=f"Deleting container resources of {handle['project_count']} projects",
+        data=handle
+    )
+
+@router.get("/teardowns/{handle_id}", response_model=ContainerActionResponse)
+async def get_teardown(handle_id: str):
+    """Get the progress of a bulk container deletion"""
+    handle = teardown_tracker.get(handle_id)
+    if handle is None:
+        raise HTTPException(status_code=404, detail="Teardown not found")
+    return ContainerActionResponse(
+        success=handle["state"] != "failed",
+        message=f"Teardown {handle_id} is {handle['state']}",
+        data=handle
+    )
+
+@router.post("/orphans:collect", response_model=ContainerActionResponse)
+async def collect_orphans(
+    dry_run: Optional[bool] = Query(None, description="Only report orphans; defaults to ORPHAN_GC_DRY_RUN")
+):
+    """Delete the container resources of projects that no longer exist, now"""
+    report = await orphan_collector.collect(dry_run=dry_run)
+    return ContainerActionResponse(
+        success=not report["errors"],
+        message=f"{'Found' if report['dry_run'] else 'Reclaimed'} {len(report['orphaned_projects'])} orphaned projects",
+        data=report
+    )
+
+@router.get("/orphans", response_model=ContainerActionResponse)
+async def get_orphan_report():
+    """Get the report of the last orphan collection"""
+    report = orphan_collector.last_report
+    if report is None:
+        raise HTTPException(status_code=404, detail="No orphan collection has run yet")
+    return ContainerActionResponse(
+        success=not report["errors"],
+        message=f"Last orphan collection started at {report['started_at']}",
+        data=report
+    )
+
+@router.get("/provisioning", response_model=ContainerActionResponse)
+async def get_provisioning_queue():
+    """Get the state of the provisioning scheduler"""
+    return ContainerActionResponse(
+        success=True,
+        message="Provisioning queue",
+        data=provisioning_scheduler.stats()
+    )
+
+@router.get("/runtime-images", response_model=ContainerActionResponse)
+async def get_runtime_images():
+    """Get the pinned digest of each runtime image and how many nodes have it cached"""
+    report = await runtime_images.status()
+    return ContainerActionResponse(
+        success=not report["errors"],
+        message=f"Runtime images on {report['nodes_total']} nodes",
+        data=report
+    )
+
+@router.post("/runtime-images:refresh", response_model=ContainerActionResponse)
+async def refresh_runtime_images():
+    """Re-resolve runtime image tags now and roll changed digests out to the nodes"""
+    result = await runtime_images.refresh()
+    if result["changed"]:
+        result["applied"] = await runtime_images.apply()
+    return ContainerActionResponse(
+        success=not result["errors"],
+        message=f"{len(result['changed'])} runtime images changed digest",
+        data=result
+    )
+
+@router.get("/{project_id}/provisioning", response_model=ContainerActionResponse)
+async def get_provisioning_status(project_id: str):
+    """Get the queue position and estimated wait of a project's provisioning"""
+    ticket = provisioning_scheduler.status(project_id)
+    if ticket is None:
+        raise HTTPException(status_code=404, detail="No provisioning queued or running for this project")
+    message = (
+        f"Provisioning is queued at position {ticket['position']}"
+        if ticket["state"] == "queued"
+        else f"Provisioning is {ticket['state']}"
+    )
+    return ContainerActionResponse(success=True, message=message, data=ticket)
+
+@router.get("/{project_id}/logs/stream")
+async def stream_container_logs(
+    project_id: str,
+    tail_lines: int = Query(100, ge=0, description="Number of past log lines to send before following"),
+    db: Session = Depends(get_db)
+):
+    """Follow a project container's logs as Server-Sent Events"""
+    project = db.query(ProjectDB).filter(ProjectDB.id == project_id).first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    if not project.deployment_name:
+        raise HTTPException(
+            status_code=400,
+            detail="Container resources don't exist for this project"
+        )
+
+    async def event_stream():
+        lines = k8s.stream_pod_logs(project_id, tail_lines)
+        next_line = None
+        try:
+            while True:
+                if next_line is None:
+                    next_line = asyncio.ensure_future(lines.__anext__())
+                # Wait for the next line, sending keep-alives while the log is idle
+                done, _ = await asyncio.wait({next_line}, timeout=LOG_STREAM_KEEPALIVE_SECONDS)
+                # An open log view keeps the project from being scaled to zero
+                activity_tracker.touch(project_id)
+                if not done:
+                    yield ": keep-alive\n\n"
+                    continue
+                try:
+                    line = next_line.result()
+                except StopAsyncIteration:
+                    break
+                next_line = None
+                yield f"data: {json.dumps(line)}\n\n"
+            yield "event: end\ndata: {}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps(str(e))}\n\n"
+        finally:
+            # Client disconnected or stream ended; release the pod log connection
+            if next_line is not None:
+                next_line.cancel()
+                try:
+                    await next_line
+                except (asyncio.CancelledError, StopAsyncIteration):
+                    pass
+            await lines.aclose()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,135 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from starlette.background import BackgroundTask
+from typing import Dict, Any, Optional
+from datetime import datetime, timezone
+import asyncio
+import httpx
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.kubernetes_provider import k8s, get_namespace, require_kubernetes
+from app.models.project import Project as ProjectDB
+from app.services.idle_controller import activity_tracker
+
+router = APIRouter(prefix="/api/preview", tags=["preview"], dependencies=[Depends(require_kubernetes)])
+
+# Headers that apply to a single connection and must not be forwarded
+HOP_BY_HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+    "te", "trailers", "transfer-encoding", "upgrade", "host",
+}
+
+# One wake per project at a time; concurrent requests wait on the same wake.
+# A lock is dropped once no request holds or waits for it.
+_wake_locks: Dict[str, asyncio.Lock] = {}
+_wake_waiters: Dict[str, int] = {}
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Create the shared upstream HTTP client on first use"""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(timeout=httpx.Timeout(60.0, connect=5.0))
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared upstream HTTP client"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+async def wake_project(project: ProjectDB, db: Session) -> Dict[str, Any]:
+    """Scale a project back up if needed and wait until it serves traffic"""
+    lock = _wake_locks.setdefault(project.id, asyncio.Lock())
+    _wake_waiters[project.id] = _wake_waiters.get(project.id, 0) + 1
+    try:
+        async with lock:
+            return await _wake(project, db)
+    finally:
+        _wake_waiters[project.id] -= 1
+        if not _wake_waiters[project.id]:
+            del _wake_waiters[project.id]
+            del _wake_locks[project.id]
+
+
+async def _wake(project: ProjectDB, db: Session) -> Dict[str, Any]:
+    resources = await k8s.get_project_resources(project.id)
+    deployment = resources["deployment"]
+    if not isinstance(deployment, dict):
+        raise HTTPException(status_code=503, detail="Project deployment is not available")
+    if deployment["ready_replicas"]:
+        return {"woken": False}
+
+    if not deployment["replicas"]:
+        await k8s.start_container(project.id)
+    rollout = await k8s.wait_for_rollout(
+        project.id, settings.ACTIVATOR_WAKE_TIMEOUT_SECONDS
+    )
+    if rollout["timed_out"]:
+        raise HTTPException(status_code=504, detail="Timed out waiting for the project to start")
+
+    project.container_running = True
+    project.container_status = "Running"
+    project.container_last_started_at = datetime.now(timezone.utc)
+    db.commit()
+    return {"woken": True}
+
+
+@router.api_route(
+    "/{project_id}/{path:path}",
+    methods=["GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"],
+)
+async def preview_proxy(
+    project_id: str,
+    path: str,
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """Forward a preview request to the project Service, waking the project first if it was scaled to zero"""
+    project = db.query(ProjectDB).filter(ProjectDB.id == project_id).first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    if not project.service_name:
+        raise HTTPException(status_code=404, detail="Container resources don't exist for this project")
+
+    activity_tracker.touch(project_id)
+    # Holds the request until the project is ready
+    await wake_project(project, db)
+
+    from app.core.kubernetes import DEFAULT_CONTAINER_PORT
+
+    port = project.container_port or DEFAULT_CONTAINER_PORT
+    url = f"http://{project.service_name}.{get_namespace()}.svc.cluster.local:{port}/{path}"
+    headers = {
+        name: value for name, value in request.headers.items()
+        if name.lower() not in HOP_BY_HOP_HEADERS
+    }
+
+    client = get_http_client()
+    upstream_request = client.build_request(
+        request.method,
+        url,
+        params=request.query_params,
+        headers=headers,
+        content=await request.body(),
+    )
+    try:
+        upstream = await client.send(upstream_request, stream=True)
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"Error forwarding preview request: {str(e)}")
+
+    return StreamingResponse(
+        upstream.aiter_raw(),
+        status_code=upstream.status_code,
+        headers={
+            name: value for name, value in upstream.headers.items()
+            if name.lower() not in HOP_BY_HOP_HEADERS
+        },
+        background=BackgroundTask(upstream.aclose),
+    )
@@ -8,7 +8,11 @@ from app.core.database import get_db
 from app.models.user import User
 from app.models.project import Project as ProjectDB
 from app.schemas.project import Project, ProjectCreate, ProjectUpdate, ContainerConfig
-from app.core.kubernetes import KubernetesClient
+from app.core.kubernetes_provider import k8s
+from app.services.provisioning import provision_project_resources
+from app.services.bundles import bundle_file_hashes, publish_bundle
+from app.services.file_sync import sync_project_files
+from app.services.scheduler import provisioning_scheduler, project_cost, ProvisioningCancelledError
 
 router = APIRouter(prefix="/api/projects", tags=["projects"])
 
@@ -148,6 +152,8 @@ async def create_project(
         db_project.description = project.description
     if project.language:
         db_project.language = project.language
+    # Provisioning waits its turn in the owner's queue
+    db_project.container_status = "Queued"
 
     # Save the project to the database
     db.add(db_project)
@@ -158,6 +164,7 @@ async def create_project(
     background_tasks.add_task(
         create_kubernetes_resources_for_project,
         project_id=project_id,
+        owner_id=user.id,
         files=files_data,
         language=project.language,
         db=db,
@@ -168,6 +175,7 @@ async def create_project(
 
 async def create_kubernetes_resources_for_project(
     project_id: str,
+    owner_id: str,
     files: List[Dict[str, Any]],
     language: str,
     db: Session,
@@ -175,68 +183,32 @@ async def create_kubernetes_resources_for_project(
 ):
     """Create Kubernetes resources for a project in the background"""
     try:
-        # Get the project from the database
-        project = db.query(ProjectDB).filter(ProjectDB.id == project_id).first()
-        if not project:
-            return
+        # Don't hold a database connection while queued; the session
+        # reconnects for the query below
+        db.close()
 
-        # Create PVC
-        pvc_result = KubernetesClient.create_pvc(
+        # Create PVC, ConfigMap, Deployment and Service as a dependency graph,
+        # once the fair-share scheduler admits it
+        provisioned = await provisioning_scheduler.run(
             project_id,
-            storage_size=container_config.storage_size if container_config and container_config.storage_size else "1Gi"
+            owner_id,
+            lambda: provision_project_resources(project_id, files, language, container_config),
+            cost=project_cost(container_config),
         )
 
-        # Create ConfigMap for files
-        configmap_result = KubernetesClient.create_configmap_for_files(project_id, files)
-
-        # Determine container image based on project language
-        container_image = container_config.image if container_config and container_config.image else "python:3.9-slim"
-        if not container_config or not container_config.image:
-            if language and language.lower() == "javascript":
-                container_image = "node:14-alpine"
-            elif language and language.lower() == "python":
-                container_image = "python:3.9-slim"
-            elif language and language.lower() == "go":
-                container_image = "golang:1.17-alpine"
-            elif language and language.lower() == "java":
-                container_image = "openjdk:11-jdk-slim"
-
-        # Determine container port
-        container_port = container_config.port if container_config and container_config.port else 8000
-
-        # Determine container command
-        command = None
-        if container_config and container_config.command:
-            command = container_config.command
-        else:
-            if language and language.lower() == "javascript":
-                command = ["node", "index.js"]
-            elif language and language.lower() == "python":
-                command = ["python", "main.py"]
-            elif language and language.lower() == "go":
-                command = ["go", "run", "main.go"]
-            elif language and language.lower() == "java":
-                command = ["java", "-jar", "app.jar"]
-
-        # Create Deployment
-        deployment_result = KubernetesClient.create_deployment(
-            project_id,
-            pvc_name=pvc_result["name"],
-            configmap_name=configmap_result["name"],
-            container_image=container_image,
-            container_port=container_port,
-            command=command,
-            args=container_config.args if container_config and container_config.args else None,
-            env_vars=container_config.env_vars if container_config and container_config.env_vars else None,
-            cpu_limit=container_config.cpu_limit if container_config and container_config.cpu_limit else "500m",
-            memory_limit=container_config.memory_limit if container_config and container_config.memory_limit else "512Mi"
-        )
-
-        # Create Service
-        service_result = KubernetesClient.create_service(
-            project_id,
-            container_port=container_port
-        )
+        # Get the project from the database; it may have been deleted while
+        # provisioning ran, and then nothing else would remove its resources
+        project = db.query(ProjectDB).filter(ProjectDB.id == project_id).first()
+        if not project:
+            await delete_kubernetes_resources_for_project(project_id)
+            return
+        pvc_result = provisioned["results"]["pvc"]
+        configmap_result = provisioned["results"].get("configmap")
+        bundle_result = provisioned["results"].get("bundle")
+        deployment_result = provisioned["results"]["deployment"]
+        service_result = provisioned["results"]["service"]
+        container_image = provisioned["container_image"]
+        container_port = provisioned["container_port"]
 
         # Update project in database
         project.deployment_name = deployment_result["name"]
@@ -252,13 +224,30 @@ async def create_kubernetes_resources_for_project(
             "deployment": deployment_result,
             "service": service_result,
             "pvc": pvc_result,
-            "configmap": configmap_result
+            "configmap": configmap_result,
+            "bundle": bundle_result
         }
         db.commit()
 
+    except ProvisioningCancelledError:
+        # The project was deleted while queued
+        return
     except Exception as e:
         # Log the error but don't raise it (this is running in the background)
         print(f"Error creating Kubernetes resources for project {project_id}: {str(e)}")
+        mark_provisioning_failed(project_id, db)
+
+def mark_provisioning_failed(project_id: str, db: Session):
+    """Move a project out of "Queued" once its background provisioning has failed"""
+    try:
+        db.rollback()
+        project = db.query(ProjectDB).filter(ProjectDB.id == project_id).first()
+        if project:
+            project.container_status = "Failed"
+            project.container_running = False
+            db.commit()
+    except Exception as e:
+        print(f"Error marking provisioning failed for project {project_id}: {str(e)}")
 
 @router.get("/{project_id}", response_model=Project)
 async def get_project(
@@ -285,12 +274,36 @@ async def update_project(
     # No authorization check - allow updates to any project
 
     update_data = project_update.dict(exclude_unset=True)
+    previous_files = db_project.files or []
     for field, value in update_data.items():
         setattr(db_project, field, value)
 
     db_project.updated_at = datetime.now()
     db.commit()
     db.refresh(db_project)
+
+    # Push file changes to the project: bundle projects get them hot-synced
+    # into their running pods, ConfigMap projects get only the changed keys
+    if "files" in update_data and db_project.deployment_name:
+        try:
+            if (db_project.k8s_resources or {}).get("bundle"):
+                # Diff against what the pods hold; older records only have the saved files
+                previous_hashes = db_project.k8s_resources["bundle"].get("file_hashes")
+                if previous_hashes is None:
+                    previous_hashes = bundle_file_hashes(previous_files)
+                bundle = await publish_bundle(project_id, db_project.files or [])
+                synced = await sync_project_files(project_id, db_project.files or [], previous_hashes)
+                if not synced["confirmed"]:
+                    # Fall back to a rolling restart, which fetches the new bundle
+                    await k8s.restart_container(project_id)
+                db_project.k8s_resources = {**db_project.k8s_resources, "bundle": bundle}
+                db.commit()
+                db.refresh(db_project)
+            else:
+                await k8s.update_project_files(project_id, db_project.files or [])
+        except Exception as e:
+            print(f"Error updating files for project {project_id}: {str(e)}")
+
     return db_project
 
 @router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -305,6 +318,9 @@ async def delete_project(
         raise HTTPException(status_code=404, detail="Project not found")
     # No authorization check - allow deletion of any project
 
+    # A creation still waiting its turn never starts
+    provisioning_scheduler.cancel(project_id)
+
     # Delete Kubernetes resources in the background
     if db_project.deployment_name or db_project.service_name or db_project.pvc_name:
         background_tasks.add_task(
@@ -320,7 +336,7 @@ async def delete_kubernetes_resources_for_project(project_id: str):
     """Delete Kubernetes resources for a project in the background"""
     try:
         # Delete all Kubernetes resources for the project
-        KubernetesClient.delete_project_resources(project_id)
+        await k8s.delete_project_resources(project_id)
     except Exception as e:
         # Log the error but don't raise it (this is running in the background)
         print(f"Error deleting Kubernetes resources for project {project_id}: {str(e)}")
@@ -70,8 +70,20 @@ class Project(ProjectBase):
         orm_mode = True
 
 class ContainerAction(BaseModel):
-    action: str = Field(..., description="Action to perform: 'start', 'stop', 'restart', 'logs'")
+    action: str = Field(..., description="Action to perform: 'start', 'stop', 'restart', 'logs', 'status', 'sync', 'hibernate', 'delete'")
     tail_lines: Optional[int] = Field(100, description="Number of log lines to return when action is 'logs'")
+    all_pods: Optional[bool] = Field(False, description="Merge logs from every pod of the project by timestamp when action is 'logs'")
+    previous: Optional[bool] = Field(False, description="Include logs of previous (crashed) container instances; implies all_pods")
+    max_bytes: Optional[int] = Field(None, description="Byte budget for merged logs")
+    wait: Optional[bool] = Field(False, description="Wait for the rollout to complete when action is 'restart'")
+    timeout_seconds: Optional[int] = Field(120, description="Maximum time to wait for the rollout when wait is set")
+    reload: Optional[bool] = Field(False, description="Run the project's reload hook after pushing files when action is 'sync'")
+
+class ContainerStatusBatchRequest(BaseModel):
+    project_ids: List[str] = Field(..., max_length=500, description="Projects to fetch container status for")
+
+class ContainerTeardownRequest(BaseModel):
+    project_ids: List[str] = Field(..., min_length=1, max_length=10000, description="Projects whose container resources are deleted")
 
 class ContainerActionResponse(BaseModel):
     success: bool
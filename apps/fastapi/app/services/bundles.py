@@ -0,0 +1,113 @@
+from typing import Dict, List, Any
+import asyncio
+import gzip
+import hashlib
+import hmac
+import io
+import logging
+import posixpath
+import tarfile
+
+from app.core.config import settings
+from app.services.object_store import object_store
+
+logger = logging.getLogger(__name__)
+
+
+def safe_bundle_path(name: str) -> str:
+    """Normalize a project file name to a relative path, or "" if it escapes the bundle root"""
+    path = posixpath.normpath(name.replace("\\", "/").lstrip("/"))
+    if path in ("", ".") or path == ".." or path.startswith("../"):
+        return ""
+    return path
+
+
+def bundle_entries(files: List[Dict[str, Any]]) -> Dict[str, bytes]:
+    """Map the bundle paths of a file list to their content; empty files are left out"""
+    entries = {}
+    for file in files:
+        path = safe_bundle_path(file.get("name", ""))
+        content = file.get("content", "")
+        if not path:
+            if file.get("name"):
+                logger.warning(f"Skipping file outside the bundle root: {file.get('name')}")
+            continue
+        if content:
+            entries[path] = content.encode("utf-8")
+    return entries
+
+
+def bundle_file_hashes(files: List[Dict[str, Any]]) -> Dict[str, str]:
+    """Hash every file a bundle of the file list contains (path to sha256 hex)"""
+    return {path: hashlib.sha256(data).hexdigest() for path, data in bundle_entries(files).items()}
+
+
+def build_bundle(files: List[Dict[str, Any]]) -> bytes:
+    """Pack project files into a gzipped tar, keeping their directory structure.
+
+    The output is deterministic (sorted entries, fixed mtimes and owners), so
+    the same files always produce the same bytes and the same digest.
+    """
+    entries = bundle_entries(files)
+
+    buffer = io.BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode="wb", mtime=0) as compressed:
+        with tarfile.open(fileobj=compressed, mode="w", format=tarfile.PAX_FORMAT) as archive:
+            for path in sorted(entries):
+                data = entries[path]
+                info = tarfile.TarInfo(name=path)
+                info.size = len(data)
+                info.mode = 0o644
+                archive.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+def project_bundle_ref(project_id: str) -> str:
+    """Name of the object store ref pointing at a project's current bundle"""
+    return f"projects/{project_id}/files"
+
+
+def project_bundle_token(project_id: str) -> str:
+    """Token that lets a project's init container, and nothing else, fetch its bundle.
+
+    An HMAC of the project id under SECRET_KEY: every API replica derives
+    the same token, nothing has to be stored, and a pod that reads its own
+    token from its spec cannot use it for another project.
+    """
+    return hmac.new(settings.SECRET_KEY.encode(), f"bundle:{project_id}".encode(), hashlib.sha256).hexdigest()
+
+
+def check_project_bundle_token(project_id: str, token: str) -> bool:
+    """Whether a token is the bundle token of a project"""
+    return hmac.compare_digest(project_bundle_token(project_id), token)
+
+
+def project_bundle_url(project_id: str) -> str:
+    """Stable in-cluster URL serving a project's current bundle.
+
+    Pods resolve the project's ref when they start, so publishing a new
+    bundle does not change the pod template and never restarts running
+    pods; those are updated by hot sync instead. The URL carries the
+    project's bundle token.
+    """
+    return (
+        f"{settings.BUNDLE_BASE_URL.rstrip('/')}/internal/bundles/projects/{project_id}"
+        f"?token={project_bundle_token(project_id)}"
+    )
+
+
+async def publish_bundle(project_id: str, files: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build and store the bundle of a file list and make it the project's current one.
+
+    The result records the hash of every file in the bundle, which is what
+    pods started from it hold; hot sync diffs against it.
+    """
+    bundle = build_bundle(files)
+    digest = await asyncio.to_thread(object_store.put, bundle)
+    await asyncio.to_thread(object_store.set_ref, project_bundle_ref(project_id), digest)
+    return {
+        "digest": digest,
+        "url": project_bundle_url(project_id),
+        "size_bytes": len(bundle),
+        "file_hashes": bundle_file_hashes(files),
+    }
@@ -0,0 +1,173 @@
+from typing import Dict, List, Optional, Any, Tuple
+import asyncio
+import hashlib
+import logging
+import shlex
+import time
+
+from app.core.config import settings
+from app.core.kubernetes_provider import k8s
+from app.services.bundles import build_bundle, bundle_file_hashes, safe_bundle_path
+
+logger = logging.getLogger(__name__)
+
+# Where bundle-mode project pods keep their files (a writable emptyDir)
+SYNC_SRC_PATH = "/app/src"
+
+# Prefix of the reload hook status line in the sync script output
+RELOAD_MARKER = "vibecode-reload:"
+
+
+def file_contents(files: Optional[List[Dict[str, Any]]]) -> Dict[str, str]:
+    """Map the bundle paths of a file list to their content, as the bundle would contain them"""
+    contents = {}
+    for file in files or []:
+        path = safe_bundle_path(file.get("name", ""))
+        content = file.get("content", "")
+        # Empty files are left out of bundles, so they do not exist in the pod either
+        if path and content:
+            contents[path] = content
+    return contents
+
+
+def diff_files(
+    files: List[Dict[str, Any]],
+    previous_hashes: Optional[Dict[str, str]] = None,
+    resend: bool = False,
+) -> Tuple[Dict[str, str], List[str]]:
+    """Get the changed files (path to content) and removed paths against the pods' file hashes.
+
+    previous_hashes is what the pods hold, as recorded by publish_bundle and
+    by confirmed syncs. Without it every file counts as changed and nothing
+    is removed. With resend every current file is sent again, which repairs
+    edits made inside the pod, while removals still come from the diff.
+    """
+    current = file_contents(files)
+    if previous_hashes is None:
+        return current, []
+
+    removed = sorted(path for path in previous_hashes if path not in current)
+    if resend:
+        return current, removed
+    changed = {
+        path: content for path, content in current.items()
+        if previous_hashes.get(path) != hashlib.sha256(content.encode("utf-8")).hexdigest()
+    }
+    return changed, removed
+
+
+def build_sync_script(bundle_size: int, changed: List[str], removed: List[str], reload: bool) -> str:
+    """Build the shell script that applies a delta bundle read from stdin.
+
+    The script unpacks the changed files, removes deleted ones, prints the
+    sha256 of every changed file so the caller can confirm it is on disk, and
+    finally runs the project's reload hook if asked to and present.
+    """
+    lines = ["set -e", f"cd {SYNC_SRC_PATH}"]
+    if changed:
+        # Read exactly the bundle size so tar sees EOF without closing stdin
+        lines.append(f"head -c {bundle_size} | tar xzf -")
+    if removed:
+        lines.append(f"rm -f -- {' '.join(shlex.quote(path) for path in removed)}")
+    if changed:
+        lines.append(f"sha256sum -- {' '.join(shlex.quote(path) for path in changed)}")
+    if reload and settings.FILE_SYNC_RELOAD_HOOK:
+        hook = shlex.quote(settings.FILE_SYNC_RELOAD_HOOK)
+        # Hook output goes to the container log; a failing hook does not fail the sync
+        lines.append(
+            f"if [ -f {hook} ]; then "
+            f"if sh {hook} > /proc/1/fd/1 2>&1; then echo {RELOAD_MARKER}ok; else echo {RELOAD_MARKER}failed; fi; "
+            f"else echo {RELOAD_MARKER}none; fi"
+        )
+    return "\n".join(lines)
+
+
+def parse_sync_output(output: str) -> Tuple[Dict[str, str], Optional[str]]:
+    """Parse the sync script output into on-disk hashes (path to hex) and the reload status"""
+    hashes = {}
+    reload_status = None
+    for line in output.splitlines():
+        if line.startswith(RELOAD_MARKER):
+            reload_status = line[len(RELOAD_MARKER):].strip()
+            continue
+        digest, _, path = line.partition("  ")
+        if digest and path:
+            hashes[path] = digest
+    return hashes, reload_status
+
+
+async def sync_pod(
+    pod_name: str,
+    changed: Dict[str, str],
+    removed: List[str],
+    reload: bool = False,
+) -> Dict[str, Any]:
+    """Push changed files into one running pod and confirm they are on disk"""
+    started = time.perf_counter()
+    paths = sorted(changed)
+    bundle = build_bundle([{"name": path, "content": changed[path]} for path in paths]) if paths else b""
+    script = build_sync_script(len(bundle), paths, removed, reload)
+
+    result = {"pod": pod_name, "confirmed": False, "reload": None, "error": None}
+    try:
+        output = await k8s.exec_in_pod(
+            pod_name,
+            ["sh", "-c", script],
+            stdin=bundle if paths else None,
+            timeout_seconds=settings.FILE_SYNC_TIMEOUT_SECONDS,
+        )
+        hashes, result["reload"] = parse_sync_output(output)
+        mismatched = [
+            path for path in paths
+            if hashes.get(path) != hashlib.sha256(changed[path].encode("utf-8")).hexdigest()
+        ]
+        if mismatched:
+            result["error"] = f"Files not confirmed on disk: {', '.join(mismatched)}"
+        else:
+            result["confirmed"] = True
+    except Exception as e:
+        logger.error(f"Exception when syncing files into pod {pod_name}: {e}")
+        result["error"] = str(e)
+
+    result["duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return result
+
+
+async def sync_project_files(
+    project_id: str,
+    files: List[Dict[str, Any]],
+    previous_hashes: Optional[Dict[str, str]] = None,
+    reload: bool = False,
+    resend: bool = False,
+) -> Dict[str, Any]:
+    """Push file changes straight into the running pods of a bundle-mode project.
+
+    Instead of restarting, only the changed files are streamed over exec as a
+    small tarball and unpacked in place; each pod then reports the hashes of
+    the files it wrote, so a confirmed result means the new content is on
+    disk. Pods that start later fetch the project's current bundle, so they
+    never miss a change. ConfigMap-mode projects mount their files read-only
+    and cannot be synced this way.
+
+    The result's file_hashes are what the pods hold once the sync is
+    confirmed; callers record them as the next sync's previous_hashes.
+    """
+    started = time.perf_counter()
+    changed, removed = diff_files(files, previous_hashes, resend)
+    pods = await k8s.list_running_project_pods(project_id)
+
+    if not pods or (not changed and not removed and not reload):
+        results = []
+    else:
+        results = await asyncio.gather(*[
+            sync_pod(pod_name, changed, removed, reload) for pod_name in pods
+        ])
+
+    return {
+        "changed": sorted(changed),
+        "removed": removed,
+        "pods": list(results),
+        "confirmed": all(result["confirmed"] for result in results),
+        "file_hashes": bundle_file_hashes(files),
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
@@ -0,0 +1,160 @@
+from typing import Dict, Any
+from datetime import datetime, timezone
+import asyncio
+import base64
+import logging
+import time
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.kubernetes_provider import k8s
+from app.models.project import Project as ProjectDB
+from app.services.object_store import object_store
+from app.services.warm_pool import warm_pool
+
+logger = logging.getLogger(__name__)
+
+# Where the data helper pod mounts the project PVC
+DATA_PATH = "/app/data"
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 2)
+
+
+async def _delete_helper_pod(pod_name: str) -> None:
+    """Delete a data helper pod, logging a failure instead of raising.
+
+    Called from `finally` blocks, where raising would replace the error of
+    the archive or restore itself; a helper left behind is reused next time.
+    """
+    try:
+        await k8s.delete_pod(pod_name)
+    except Exception as e:
+        logger.error(f"Exception when deleting data helper pod {pod_name}: {e}")
+
+
+async def hibernate_project(project_id: str) -> Dict[str, Any]:
+    """Archive a project's /app/data into the object store and delete its resources.
+
+    The project is stopped first so nothing else holds the volume, then a
+    helper pod mounting the PVC streams a gzipped tar of /app/data back. The
+    archive is stored before any resource is deleted, so a failed hibernation
+    never loses data. Returns the archive reference to record on the project.
+
+    The archive is the only copy of the data once the PVC is gone, so this
+    refuses to run unless the object store is on a persistent volume
+    (OBJECT_STORE_DURABLE).
+    """
+    if not settings.OBJECT_STORE_DURABLE:
+        raise RuntimeError(
+            "Hibernation needs a durable object store; mount a persistent volume at "
+            "OBJECT_STORE_PATH and set OBJECT_STORE_DURABLE=true"
+        )
+
+    timings: Dict[str, float] = {}
+
+    # Stop the project and wait until nothing holds the volume
+    from kubernetes.client.rest import ApiException
+
+    started = time.perf_counter()
+    try:
+        await k8s.stop_container(project_id)
+    except ApiException as e:
+        if e.status != 404:  # Not Found - no Deployment to stop
+            raise
+    if settings.WARM_POOL_ENABLED:
+        await warm_pool.release(project_id)
+    await k8s.wait_for_project_pods_terminated(
+        project_id, settings.HIBERNATE_TIMEOUT_SECONDS
+    )
+    timings["stop_ms"] = _elapsed_ms(started)
+
+    # Archive the volume through a helper pod; exec stdout is text, hence base64
+    started = time.perf_counter()
+    helper = await k8s.create_data_helper_pod(project_id, settings.DATA_HELPER_IMAGE)
+    try:
+        await k8s.wait_for_pod_running(helper, settings.HIBERNATE_TIMEOUT_SECONDS)
+        encoded = await k8s.exec_in_pod(
+            helper,
+            ["sh", "-c", f"set -o pipefail; tar czf - -C {DATA_PATH} . | base64"],
+            timeout_seconds=settings.HIBERNATE_TIMEOUT_SECONDS,
+        )
+    finally:
+        await _delete_helper_pod(helper)
+    archive = base64.b64decode(encoded)
+    timings["archive_ms"] = _elapsed_ms(started)
+
+    started = time.perf_counter()
+    digest = await asyncio.to_thread(object_store.put, archive)
+    timings["store_ms"] = _elapsed_ms(started)
+
+    # Only now is it safe to free the PVC and the rest of the resources
+    started = time.perf_counter()
+    deleted = await k8s.delete_project_resources(project_id)
+    timings["delete_ms"] = _elapsed_ms(started)
+
+    logger.info(f"Hibernated project {project_id} into {digest} ({len(archive)} bytes)")
+    return {
+        "archive": digest,
+        "size_bytes": len(archive),
+        "hibernated_at": datetime.now(timezone.utc).isoformat(),
+        "deleted": deleted,
+        "timings": timings,
+    }
+
+
+async def restore_project_data(project_id: str, digest: str) -> Dict[str, Any]:
+    """Unpack a hibernation archive into a project's (new, empty) PVC.
+
+    Must run after the PVC exists and before the Deployment starts, which is
+    how the provisioning pipeline orders it.
+    """
+    started = time.perf_counter()
+    archive = await asyncio.to_thread(object_store.get, digest)
+
+    helper = await k8s.create_data_helper_pod(project_id, settings.DATA_HELPER_IMAGE)
+    try:
+        await k8s.wait_for_pod_running(helper, settings.HIBERNATE_TIMEOUT_SECONDS)
+        # Read exactly the archive size so tar sees EOF without closing stdin
+        await k8s.exec_in_pod(
+            helper,
+            ["sh", "-c", f"head -c {len(archive)} | tar xzf - -C {DATA_PATH}"],
+            stdin=archive,
+            timeout_seconds=settings.HIBERNATE_TIMEOUT_SECONDS,
+        )
+    finally:
+        await _delete_helper_pod(helper)
+
+    logger.info(f"Restored project {project_id} from {digest}")
+    return {
+        "archive": digest,
+        "size_bytes": len(archive),
+        "duration_ms": _elapsed_ms(started),
+    }
+
+
+def release_archive(digest: str) -> bool:
+    """Delete a hibernation archive once no project refers to it, returning whether it was deleted.
+
+    Call after the restored project has been committed without its
+    hibernation record. Archives are content-addressed, so another project
+    may have hibernated into the same blob; it is kept while one still does.
+    Never raises: a failure only leaves the archive behind.
+    """
+    db = SessionLocal()
+    try:
+        still_referenced = db.query(ProjectDB.id).filter(
+            ProjectDB.k8s_resources["hibernation"]["archive"].as_string() == digest
+        ).first()
+        if still_referenced:
+            return False
+        deleted = object_store.delete(digest)
+    except Exception as e:
+        logger.error(f"Exception when releasing hibernation archive {digest}: {e}")
+        return False
+    finally:
+        db.close()
+    if deleted:
+        logger.info(f"Deleted restored hibernation archive {digest}")
+    return deleted
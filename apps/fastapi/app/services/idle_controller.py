@@ -0,0 +1,183 @@
+from typing import Dict, List, Optional
+from datetime import datetime
+import asyncio
+import logging
+import threading
+
+from sqlalchemy import bindparam, or_, update
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.kubernetes_provider import k8s
+from app.models.project import Project as ProjectDB
+from app.services.warm_pool import warm_pool
+
+logger = logging.getLogger(__name__)
+
+
+class ActivityTracker:
+    """Last activity time per project: API calls, log views and preview requests.
+
+    Activity is shared through projects.last_activity_at so that every
+    worker and replica sees it; a project busy on one process must not be
+    scaled to zero by another. touch() only records in memory, and flush()
+    writes what was seen since the last flush in one batch, never moving a
+    project's time backwards.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Dict[str, datetime] = {}
+
+    def touch(self, project_id: str) -> None:
+        """Record activity on a project"""
+        with self._lock:
+            self._pending[project_id] = datetime.utcnow()
+
+    def forget(self, project_id: str) -> None:
+        """Drop the unflushed activity of a project"""
+        with self._lock:
+            self._pending.pop(project_id, None)
+
+    def flush(self) -> int:
+        """Write the recorded activity to the projects table, returning how many projects it covered"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        table = ProjectDB.__table__
+        statement = (
+            update(table)
+            .where(table.c.id == bindparam("project_id"))
+            .where(or_(table.c.last_activity_at.is_(None), table.c.last_activity_at < bindparam("seen_at")))
+            .values(last_activity_at=bindparam("seen_at"))
+        )
+        db = SessionLocal()
+        try:
+            db.execute(statement, [
+                {"project_id": project_id, "seen_at": seen_at} for project_id, seen_at in pending.items()
+            ])
+            db.commit()
+        except Exception:
+            db.rollback()
+            # Keep the activity for the next flush, unless newer activity replaced it
+            with self._lock:
+                for project_id, seen_at in pending.items():
+                    self._pending.setdefault(project_id, seen_at)
+            raise
+        finally:
+            db.close()
+        return len(pending)
+
+    def last_activity(self, project_ids: List[str]) -> Dict[str, Optional[datetime]]:
+        """Get the shared last activity time of projects that have a row"""
+        if not project_ids:
+            return {}
+        db = SessionLocal()
+        try:
+            rows = db.query(ProjectDB.id, ProjectDB.last_activity_at).filter(ProjectDB.id.in_(project_ids)).all()
+            return {row.id: row.last_activity_at for row in rows}
+        finally:
+            db.close()
+
+
+class IdleController:
+    """Periodically scales projects without recent activity to zero.
+
+    Running projects are taken from the informer cache when it is synced.
+    Each sweep first flushes this process's activity, then reads every
+    process's activity back from the database. A running project with no
+    recorded activity (e.g. after it was stopped and started elsewhere)
+    gets a full timeout of grace from the moment it is first seen. Idle
+    projects are stopped through the regular stop path and woken again by the
+    preview activator or an explicit start.
+    """
+
+    def __init__(self, tracker: ActivityTracker, idle_timeout: float, interval: float):
+        self.tracker = tracker
+        self.idle_timeout = idle_timeout
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start the sweep loop on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Started idle controller with a {self.idle_timeout}s timeout")
+
+    async def stop(self) -> None:
+        """Stop the sweep loop, writing out the activity not flushed yet"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await asyncio.to_thread(self.tracker.flush)
+        except Exception as e:
+            logger.error(f"Exception when flushing project activity: {e}")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"Idle sweep failed: {e}")
+
+    async def sweep(self) -> List[str]:
+        """Scale every idle running project to zero, returning their ids"""
+        running = await k8s.list_running_project_ids()
+        # Without the shared activity nothing is known to be idle; the sweep fails
+        await asyncio.to_thread(self.tracker.flush)
+        last_activity = await asyncio.to_thread(self.tracker.last_activity, running)
+
+        idle = []
+        now = datetime.utcnow()
+        for project_id in running:
+            seen_at = last_activity.get(project_id)
+            if seen_at is None:
+                self.tracker.touch(project_id)
+            elif (now - seen_at).total_seconds() >= self.idle_timeout:
+                idle.append(project_id)
+
+        stopped = []
+        for project_id in idle:
+            try:
+                await k8s.stop_container(project_id)
+                if settings.WARM_POOL_ENABLED:
+                    await warm_pool.release(project_id)
+                self.tracker.forget(project_id)
+                stopped.append(project_id)
+            except Exception as e:
+                logger.error(f"Exception when scaling idle project {project_id} to zero: {e}")
+
+        if stopped:
+            self._mark_idle(stopped)
+            logger.info(f"Scaled {len(stopped)} idle projects to zero: {stopped}")
+        return stopped
+
+    def _mark_idle(self, project_ids: List[str]) -> None:
+        """Record scaled-to-zero projects as stopped in the database"""
+        db = SessionLocal()
+        try:
+            for project in db.query(ProjectDB).filter(ProjectDB.id.in_(project_ids)).all():
+                project.container_running = False
+                project.container_status = "Idle"
+                # The next start gets a full timeout of grace
+                project.last_activity_at = None
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Exception when marking idle projects: {e}")
+        finally:
+            db.close()
+
+
+# Shared activity tracker and idle controller
+activity_tracker = ActivityTracker()
+idle_controller = IdleController(
+    activity_tracker, settings.IDLE_TIMEOUT_SECONDS, settings.IDLE_SWEEP_INTERVAL_SECONDS
+)
@@ -0,0 +1,100 @@
+from typing import Optional
+import hashlib
+import logging
+import os
+import re
+import tempfile
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DIGEST_RE = re.compile(r"^sha256:[0-9a-f]{64}$")
+REF_RE = re.compile(r"^[A-Za-z0-9_.-]+(/[A-Za-z0-9_.-]+)*$")
+
+
+class LocalObjectStore:
+    """Content-addressed blob store on the local filesystem.
+
+    Stand-in for an object storage bucket: blobs are immutable and keyed by
+    the sha256 of their content (`sha256:<hex>`), so identical content is
+    stored once. Blobs are fanned out into directories by their first two hex
+    digits and written atomically. Named refs (e.g. `projects/<id>/files`)
+    are small mutable pointers to a digest, like git refs.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, digest: str) -> str:
+        if not DIGEST_RE.match(digest):
+            raise ValueError(f"Invalid object digest: {digest}")
+        hex_digest = digest.split(":", 1)[1]
+        return os.path.join(self.root, hex_digest[:2], hex_digest)
+
+    def _ref_path(self, name: str) -> str:
+        if not REF_RE.match(name) or ".." in name.split("/"):
+            raise ValueError(f"Invalid ref name: {name}")
+        return os.path.join(self.root, "refs", name)
+
+    def _write_atomic(self, path: str, data: bytes) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except Exception:
+            os.unlink(temp_path)
+            raise
+
+    def put(self, data: bytes) -> str:
+        """Store a blob, returning its digest"""
+        digest = f"sha256:{hashlib.sha256(data).hexdigest()}"
+        path = self._path(digest)
+        if os.path.exists(path):
+            return digest
+
+        self._write_atomic(path, data)
+        logger.info(f"Stored object {digest} ({len(data)} bytes)")
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        """Read a blob, verifying its content against the digest"""
+        with open(self._path(digest), "rb") as f:
+            data = f.read()
+        if f"sha256:{hashlib.sha256(data).hexdigest()}" != digest:
+            raise ValueError(f"Object {digest} is corrupt")
+        return data
+
+    def size(self, digest: str) -> Optional[int]:
+        """Get the size of a blob, or None if it is not stored"""
+        try:
+            return os.path.getsize(self._path(digest))
+        except FileNotFoundError:
+            return None
+
+    def delete(self, digest: str) -> bool:
+        """Delete a blob, returning whether it existed"""
+        try:
+            os.unlink(self._path(digest))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def set_ref(self, name: str, digest: str) -> None:
+        """Point a named ref at a stored blob"""
+        self._path(digest)  # Validate
+        self._write_atomic(self._ref_path(name), digest.encode())
+
+    def get_ref(self, name: str) -> Optional[str]:
+        """Get the digest a named ref points at, or None if it is not set"""
+        try:
+            with open(self._ref_path(name), "r") as f:
+                return f.read().strip()
+        except FileNotFoundError:
+            return None
+
+
+# Shared object store
+object_store = LocalObjectStore(settings.OBJECT_STORE_PATH)
@@ -0,0 +1,192 @@
+from typing import Dict, List, Optional, Any, Set
+from datetime import datetime, timezone
+import asyncio
+import logging
+import time
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.quantity import parse_quantity
+from app.core.kubernetes_provider import k8s
+from app.models.project import Project as ProjectDB
+
+logger = logging.getLogger(__name__)
+
+# Kinds scanned for project-id labels, same as a teardown deletes
+SCAN_KINDS = ("deployment", "service", "configmap", "pvc", "pods")
+
+
+def find_existing_project_ids(project_ids: Set[str]) -> Set[str]:
+    """Get which of the given project ids have a row in the projects table, in one query"""
+    if not project_ids:
+        return set()
+    db = SessionLocal()
+    try:
+        rows = db.query(ProjectDB.id).filter(ProjectDB.id.in_(project_ids)).all()
+        return {row.id for row in rows}
+    finally:
+        db.close()
+
+
+class OrphanCollector:
+    """Periodically deletes cluster resources of projects missing from the database.
+
+    A collection pages through every app=vibecode object, takes the set of
+    project-id labels and subtracts the ids the projects table knows about;
+    whatever is left belongs to deleted projects (or failed creations) and
+    is torn down with label-selector deletes in throttled batches. Projects
+    with objects younger than the minimum age are skipped, since their row
+    may not be committed yet. If the database cannot be read nothing is
+    deleted.
+
+    A wrong database (restored backup, another environment's URL) makes
+    every project look orphaned, so by default collections only report,
+    and volumes, which hold user data that cannot be recreated, are kept
+    unless delete_pvcs is set; retained volumes are still reported.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        min_age: float,
+        page_size: int,
+        batch_size: int,
+        batch_delay: float,
+        dry_run: bool = True,
+        delete_pvcs: bool = False,
+    ):
+        self.interval = interval
+        self.min_age = min_age
+        self.page_size = page_size
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.dry_run = dry_run
+        self.delete_pvcs = delete_pvcs
+        self.last_report: Optional[Dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    def start(self) -> None:
+        """Start the collection loop on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Started orphan collector with a {self.interval}s interval")
+
+    async def stop(self) -> None:
+        """Stop the collection loop"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.collect()
+            except Exception as e:
+                logger.error(f"Orphan collection failed: {e}")
+
+    async def collect(self, dry_run: Optional[bool] = None) -> Dict[str, Any]:
+        """Find and delete orphaned project resources, returning a report of what was reclaimed"""
+        dry_run = self.dry_run if dry_run is None else dry_run
+        # One collection at a time; a manual run waits for the periodic one
+        async with self._lock:
+            report = await self._collect(dry_run)
+        self.last_report = report
+        return report
+
+    async def _collect(self, dry_run: bool) -> Dict[str, Any]:
+        started = time.perf_counter()
+        report = {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "dry_run": dry_run,
+            "pages": 0,
+            "scanned": {},
+            "orphaned_projects": [],
+            "skipped_young": 0,
+            "reclaimed": {kind: 0 for kind in SCAN_KINDS},
+            "reclaimed_storage_bytes": 0,
+            "retained_pvcs": 0,  # Orphaned volumes kept because PVC deletion is not enabled
+            "retained_storage_bytes": 0,
+            "batches": 0,
+            "errors": [],
+            "duration_ms": None,
+        }
+
+        scans = await asyncio.gather(*[
+            k8s.list_project_objects(kind, self.page_size) for kind in SCAN_KINDS
+        ])
+        objects_by_project: Dict[str, List[Dict[str, Any]]] = {}
+        for kind, scan in zip(SCAN_KINDS, scans):
+            report["pages"] += scan["pages"]
+            report["scanned"][kind] = len(scan["objects"])
+            for obj in scan["objects"]:
+                objects_by_project.setdefault(obj["project_id"], []).append(dict(obj, kind=kind))
+
+        # Skip projects with anything recent: they may still be being created
+        now = datetime.now(timezone.utc)
+        young = {
+            project_id for project_id, objects in objects_by_project.items()
+            if any(
+                obj["created_at"] and (now - obj["created_at"]).total_seconds() < self.min_age
+                for obj in objects
+            )
+        }
+        report["skipped_young"] = len(young)
+        candidates = set(objects_by_project) - young
+
+        try:
+            existing = await asyncio.to_thread(find_existing_project_ids, candidates)
+        except Exception as e:
+            # Without the table every project would look orphaned
+            logger.error(f"Exception when reading project ids, skipping orphan collection: {e}")
+            report["errors"].append(str(e))
+            report["duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            return report
+
+        orphans = sorted(candidates - existing)
+        report["orphaned_projects"] = orphans
+        delete_kinds = SCAN_KINDS if self.delete_pvcs else tuple(kind for kind in SCAN_KINDS if kind != "pvc")
+        for project_id in orphans:
+            for obj in objects_by_project[project_id]:
+                storage_bytes = int(parse_quantity(obj["storage"], default=0))
+                if obj["kind"] in delete_kinds:
+                    report["reclaimed"][obj["kind"]] += 1
+                    report["reclaimed_storage_bytes"] += storage_bytes
+                else:
+                    report["retained_pvcs"] += 1
+                    report["retained_storage_bytes"] += storage_bytes
+
+        if orphans and not dry_run:
+            for start in range(0, len(orphans), self.batch_size):
+                if start:
+                    # Leave API server capacity for user traffic between batches
+                    await asyncio.sleep(self.batch_delay)
+                result = await k8s.delete_projects_resources(orphans[start:start + self.batch_size], delete_kinds)
+                report["batches"] += 1
+                report["errors"].extend(result["errors"])
+
+        report["duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        if orphans:
+            logger.info(
+                f"{'Found' if dry_run else 'Reclaimed'} {len(orphans)} orphaned projects "
+                f"({report['reclaimed']}, {report['reclaimed_storage_bytes']} bytes of storage) "
+                f"in {report['duration_ms']}ms"
+            )
+        return report
+
+
+# Shared orphan collector
+orphan_collector = OrphanCollector(
+    settings.ORPHAN_GC_INTERVAL_SECONDS,
+    settings.ORPHAN_GC_MIN_AGE_SECONDS,
+    settings.ORPHAN_GC_PAGE_SIZE,
+    settings.ORPHAN_GC_BATCH_SIZE,
+    settings.ORPHAN_GC_BATCH_DELAY_SECONDS,
+    dry_run=settings.ORPHAN_GC_DRY_RUN,
+    delete_pvcs=settings.ORPHAN_GC_DELETE_PVCS,
+)
@@ -0,0 +1,277 @@
+from typing import Dict, List, Optional, Any, Callable, Awaitable, Iterable
+import asyncio
+import logging
+import time
+
+from app.core.config import settings
+from app.core.kubernetes_provider import k8s
+from app.schemas.project import ContainerConfig
+from app.services.bundles import publish_bundle
+
+logger = logging.getLogger(__name__)
+
+# Runtime defaults per project language: (image, command)
+LANGUAGE_RUNTIMES = {
+    "javascript": ("node:14-alpine", ["node", "index.js"]),
+    "python": ("python:3.9-slim", ["python", "main.py"]),
+    "go": ("golang:1.17-alpine", ["go", "run", "main.go"]),
+    "java": ("openjdk:11-jdk-slim", ["java", "-jar", "app.jar"]),
+}
+DEFAULT_IMAGE = "python:3.9-slim"
+DEFAULT_PORT = 8000
+
+
+class ProvisioningStep:
+    """One node of a provisioning DAG.
+
+    `action` receives the results of the steps it depends on, keyed by step
+    name. `rollback` receives the step's own result and undoes it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        action: Callable[[Dict[str, Any]], Awaitable[Any]],
+        depends_on: Iterable[str] = (),
+        rollback: Optional[Callable[[Any], Awaitable[Any]]] = None,
+    ):
+        self.name = name
+        self.action = action
+        self.depends_on = list(depends_on)
+        self.rollback = rollback
+
+
+class ProvisioningError(Exception):
+    """Raised when a step fails; completed steps have been rolled back"""
+
+    def __init__(self, step: str, error: BaseException, timings: Dict[str, Dict[str, float]], rolled_back: List[str]):
+        super().__init__(f"Provisioning step {step} failed: {error}")
+        self.step = step
+        self.error = error
+        self.timings = timings
+        self.rolled_back = rolled_back
+
+
+class ProvisioningPipeline:
+    """Executes a DAG of provisioning steps, running independent steps concurrently.
+
+    Each step starts as soon as all of its dependencies have finished, so the
+    total time is the critical path rather than the sum of all steps. Start
+    offset and duration of every step are recorded in milliseconds. If any step
+    fails, steps still running are allowed to finish and every completed step
+    is rolled back in reverse completion order.
+    """
+
+    def __init__(self, steps: List[ProvisioningStep]):
+        self.steps = {step.name: step for step in steps}
+        self._validate()
+
+    def _validate(self) -> None:
+        """Reject unknown dependencies and cycles"""
+        for step in self.steps.values():
+            for dependency in step.depends_on:
+                if dependency not in self.steps:
+                    raise ValueError(f"Step {step.name} depends on unknown step {dependency}")
+
+        visited: Dict[str, bool] = {}
+
+        def visit(name: str) -> None:
+            if visited.get(name) is False:
+                raise ValueError(f"Provisioning steps contain a cycle through {name}")
+            if name in visited:
+                return
+            visited[name] = False
+            for dependency in self.steps[name].depends_on:
+                visit(dependency)
+            visited[name] = True
+
+        for name in self.steps:
+            visit(name)
+
+    async def run(self) -> Dict[str, Any]:
+        """Run every step, returning their results and timings"""
+        results: Dict[str, Any] = {}
+        timings: Dict[str, Dict[str, float]] = {}
+        completed: List[str] = []
+        pending = dict(self.steps)
+        running: Dict[asyncio.Task, str] = {}
+        failure: Optional[tuple] = None
+        pipeline_start = time.perf_counter()
+
+        async def execute(step: ProvisioningStep) -> Any:
+            started = time.perf_counter()
+            try:
+                return await step.action({name: results[name] for name in step.depends_on})
+            finally:
+                timings[step.name] = {
+                    "start_ms": round((started - pipeline_start) * 1000, 2),
+                    "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                }
+
+        while pending or running:
+            # Launch every step whose dependencies are satisfied
+            if failure is None:
+                for name, step in list(pending.items()):
+                    if all(dependency in results for dependency in step.depends_on):
+                        running[asyncio.create_task(execute(step))] = name
+                        del pending[name]
+            if not running:
+                break
+
+            done, _ = await asyncio.wait(running.keys(), return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name = running.pop(task)
+                if task.exception() is not None:
+                    logger.error(f"Provisioning step {name} failed: {task.exception()}")
+                    if failure is None:
+                        failure = (name, task.exception())
+                else:
+                    results[name] = task.result()
+                    completed.append(name)
+
+        timings["total"] = {
+            "start_ms": 0.0,
+            "duration_ms": round((time.perf_counter() - pipeline_start) * 1000, 2),
+        }
+
+        if failure is not None:
+            rolled_back = await self._rollback(completed, results)
+            raise ProvisioningError(failure[0], failure[1], timings, rolled_back)
+
+        return {"results": results, "timings": timings}
+
+    async def _rollback(self, completed: List[str], results: Dict[str, Any]) -> List[str]:
+        """Undo completed steps in reverse completion order"""
+        rolled_back = []
+        for name in reversed(completed):
+            step = self.steps[name]
+            if step.rollback is None:
+                continue
+            try:
+                await step.rollback(results[name])
+                rolled_back.append(name)
+            except Exception as e:
+                logger.error(f"Rollback of provisioning step {name} failed: {e}")
+        return rolled_back
+
+
+def resolve_container_settings(language: Optional[str], config: Optional[ContainerConfig] = None) -> Dict[str, Any]:
+    """Pick image, port and command for a project from its language and config"""
+    runtime = LANGUAGE_RUNTIMES.get(language.lower()) if language else None
+
+    container_image = config.image if config and config.image else (runtime[0] if runtime else DEFAULT_IMAGE)
+    container_port = config.port if config and config.port else DEFAULT_PORT
+    if config and config.command:
+        command = config.command
+    else:
+        command = runtime[1] if runtime else None
+
+    return {
+        "container_image": container_image,
+        "container_port": container_port,
+        "command": command,
+    }
+
+
+def build_project_pipeline(
+    project_id: str,
+    files: List[Dict[str, Any]],
+    language: Optional[str],
+    config: Optional[ContainerConfig] = None,
+    restore_archive: Optional[str] = None,
+) -> ProvisioningPipeline:
+    """Declare the resources of a project as a provisioning DAG.
+
+    Only the Deployment depends on the PVC and the project files (ConfigMap,
+    or a published bundle when FILE_DELIVERY_MODE is "bundle"); the Service
+    has no dependency and is created alongside everything else. When
+    restoring a hibernated project, the archive is unpacked into the PVC
+    before the Deployment starts.
+    """
+    from app.services.hibernation import restore_project_data
+    from app.services.runtime_images import runtime_images
+
+    container_settings = resolve_container_settings(language, config)
+
+    def delete(kind: str) -> Callable[[Any], Awaitable[Any]]:
+        async def rollback(result: Dict[str, Any]) -> Any:
+            # Only remove what this run created, never pre-existing objects
+            if result.get("action") == "created":
+                return await k8s.delete_project_resource(kind, project_id)
+        return rollback
+
+    async def create_pvc(_deps: Dict[str, Any]) -> Dict[str, Any]:
+        return await k8s.create_pvc(
+            project_id,
+            storage_size=config.storage_size if config and config.storage_size else "1Gi"
+        )
+
+    async def create_configmap(_deps: Dict[str, Any]) -> Dict[str, Any]:
+        return await k8s.create_configmap_for_files(project_id, files)
+
+    async def create_bundle(_deps: Dict[str, Any]) -> Dict[str, Any]:
+        return await publish_bundle(project_id, files)
+
+    async def restore_data(_deps: Dict[str, Any]) -> Dict[str, Any]:
+        return await restore_project_data(project_id, restore_archive)
+
+    async def create_deployment(deps: Dict[str, Any]) -> Dict[str, Any]:
+        return await k8s.create_deployment(
+            project_id,
+            pvc_name=deps["pvc"]["name"],
+            configmap_name=deps["configmap"]["name"] if "configmap" in deps else None,
+            bundle_url=deps["bundle"]["url"] if "bundle" in deps else None,
+            container_image=runtime_images.pinned(container_settings["container_image"]),
+            container_port=container_settings["container_port"],
+            command=container_settings["command"],
+            args=config.args if config and config.args else None,
+            env_vars=config.env_vars if config and config.env_vars else None,
+            cpu_limit=config.cpu_limit if config and config.cpu_limit else "500m",
+            memory_limit=config.memory_limit if config and config.memory_limit else "512Mi"
+        )
+
+    async def create_service(_deps: Dict[str, Any]) -> Dict[str, Any]:
+        return await k8s.create_service(
+            project_id,
+            container_port=container_settings["container_port"]
+        )
+
+    steps = [
+        ProvisioningStep("pvc", create_pvc, rollback=delete("pvc")),
+        ProvisioningStep("service", create_service, rollback=delete("service")),
+    ]
+    if settings.FILE_DELIVERY_MODE == "bundle":
+        # Bundles are immutable and content-addressed; nothing to roll back
+        steps.append(ProvisioningStep("bundle", create_bundle))
+        deployment_dependencies = ["pvc", "bundle"]
+    else:
+        steps.append(ProvisioningStep("configmap", create_configmap, rollback=delete("configmap")))
+        deployment_dependencies = ["pvc", "configmap"]
+    if restore_archive:
+        steps.append(ProvisioningStep("restore", restore_data, depends_on=["pvc"]))
+        deployment_dependencies.append("restore")
+    steps.append(ProvisioningStep(
+        "deployment", create_deployment, depends_on=deployment_dependencies, rollback=delete("deployment")
+    ))
+    return ProvisioningPipeline(steps)
+
+
+async def provision_project_resources(
+    project_id: str,
+    files: List[Dict[str, Any]],
+    language: Optional[str],
+    config: Optional[ContainerConfig] = None,
+    restore_archive: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Create all Kubernetes resources for a project.
+
+    Returns the per-resource results, step timings and the container settings
+    that were used. Raises ProvisioningError after rolling back on failure.
+    """
+    pipeline = build_project_pipeline(project_id, files, language, config, restore_archive)
+    outcome = await pipeline.run()
+    logger.info(f"Provisioned resources for project {project_id} in {outcome['timings']['total']['duration_ms']} ms")
+    return {
+        **outcome,
+        **resolve_container_settings(language, config),
+    }
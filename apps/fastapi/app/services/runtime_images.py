@@ -0,0 +1,279 @@
+from typing import Dict, List, Optional, Any, Tuple, NamedTuple
+from datetime import datetime, timezone
+import asyncio
+import logging
+import re
+
+import httpx
+
+from app.core.config import settings
+from app.core.kubernetes_provider import k8s
+from app.services.provisioning import LANGUAGE_RUNTIMES
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REGISTRY = "docker.io"
+
+# Manifest types a tag may point at; lists/indexes first so a multi-arch tag
+# resolves to the digest every node architecture can pull
+MANIFEST_MEDIA_TYPES = ", ".join((
+    "application/vnd.oci.image.index.v1+json",
+    "application/vnd.docker.distribution.manifest.list.v2+json",
+    "application/vnd.oci.image.manifest.v1+json",
+    "application/vnd.docker.distribution.manifest.v2+json",
+))
+
+CHALLENGE_PARAM_RE = re.compile(r'(\w+)="([^"]*)"')
+
+
+class ImageReference(NamedTuple):
+    registry: str
+    repository: str
+    tag: Optional[str]
+    digest: Optional[str]
+
+
+def parse_image_reference(image: str) -> ImageReference:
+    """Split an image reference the way the container runtime does.
+
+    "python:3.9-slim" is docker.io/library/python, tag 3.9-slim; the first
+    path component is a registry host only if it has a dot or port or is
+    "localhost". A missing tag means "latest" unless a digest is given.
+    """
+    name, _, digest = image.partition("@")
+    first, _, rest = name.partition("/")
+    if rest and ("." in first or ":" in first or first == "localhost"):
+        registry, path = first, rest
+    else:
+        registry, path = DEFAULT_REGISTRY, name
+    tag = None
+    last_slash = path.rfind("/")
+    if ":" in path[last_slash + 1:]:
+        path, _, tag = path.rpartition(":")
+    if registry == DEFAULT_REGISTRY and "/" not in path:
+        path = f"library/{path}"
+    return ImageReference(registry, path, tag or (None if digest else "latest"), digest or None)
+
+
+def parse_registry_urls(spec: str) -> Dict[str, str]:
+    """Parse a `host=url,...` registry URL setting"""
+    urls = {}
+    for entry in spec.split(","):
+        host, _, url = entry.strip().partition("=")
+        if host.strip() and url.strip():
+            urls[host.strip()] = url.strip().rstrip("/")
+    return urls
+
+
+class RuntimeImageManager:
+    """Pins runtime images to digests and keeps them pulled on every node.
+
+    Tags are resolved with one HEAD request to the registry's manifest
+    endpoint per image (HEADs do not count against Docker Hub pull limits)
+    and cached; project Deployments and warm pools then run
+    "image:tag@digest", so a node that holds the image never has to ask the
+    registry again. A pre-pull DaemonSet lists every pinned image as an init
+    container, which makes each node pull the images once, ahead of the
+    first project that needs them, and again whenever a tag moves.
+
+    A failed resolution keeps the previous digest, or the plain tag if
+    there was none; image pinning never blocks a project start. The first
+    resolution runs in the refresh loop rather than on startup, so a slow
+    or unreachable registry does not delay the API; until it succeeds
+    images run by tag.
+    """
+
+    def __init__(self, images: Dict[str, str], registry_urls: Dict[str, str], timeout: float, interval: float):
+        self.images = images
+        self.registry_urls = registry_urls
+        self.timeout = timeout
+        self.interval = interval
+        # image -> {"digest", "resolved_at"}
+        self._digests: Dict[str, Dict[str, Any]] = {}
+        self._errors: Dict[str, str] = {}
+        # (registry, repository) -> last pull token, tried before asking for a new one
+        self._tokens: Dict[Tuple[str, str], str] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    def start(self) -> None:
+        """Start the refresh loop on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Started runtime image manager with a {self.interval}s refresh interval")
+
+    async def stop(self) -> None:
+        """Stop the refresh loop"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        first = True
+        while True:
+            try:
+                result = await self.refresh()
+                # The first pass also creates the pre-pull DaemonSet if it is missing
+                if result["changed"] or first:
+                    await self.apply()
+                first = False
+            except Exception as e:
+                logger.error(f"Runtime image refresh failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def pinned(self, image: str) -> str:
+        """Get the reference to run an image by: tag@digest once resolved, else the image as given"""
+        entry = self._digests.get(image)
+        if not settings.RUNTIME_IMAGE_PINNING_ENABLED or entry is None or "@" in image:
+            return image
+        return f"{image}@{entry['digest']}"
+
+    def registry_url(self, registry: str) -> str:
+        """Get the API URL of a registry host"""
+        return self.registry_urls.get(registry) or f"https://{registry}"
+
+    async def resolve(self, client: httpx.AsyncClient, image: str) -> str:
+        """Look up the digest an image tag currently points at"""
+        reference = parse_image_reference(image)
+        if reference.digest:
+            return reference.digest
+        url = f"{self.registry_url(reference.registry)}/v2/{reference.repository}/manifests/{reference.tag}"
+        headers = {"Accept": MANIFEST_MEDIA_TYPES}
+        token_key = (reference.registry, reference.repository)
+        if token_key in self._tokens:
+            headers["Authorization"] = f"Bearer {self._tokens[token_key]}"
+        response = await client.head(url, headers=headers)
+        if response.status_code == 401:  # Unauthorized - fetch a new anonymous pull token
+            token = await self._fetch_token(client, response.headers.get("WWW-Authenticate", ""))
+            self._tokens[token_key] = token
+            response = await client.head(url, headers={**headers, "Authorization": f"Bearer {token}"})
+        response.raise_for_status()
+        digest = response.headers.get("Docker-Content-Digest")
+        if not digest:
+            raise ValueError(f"Registry returned no digest for {image}")
+        return digest
+
+    async def _fetch_token(self, client: httpx.AsyncClient, challenge: str) -> str:
+        """Get a bearer token for the scope of a WWW-Authenticate challenge"""
+        if not challenge.lower().startswith("bearer "):
+            raise ValueError(f"Unsupported registry auth challenge: {challenge!r}")
+        params = dict(CHALLENGE_PARAM_RE.findall(challenge))
+        realm = params.pop("realm", None)
+        if not realm:
+            raise ValueError(f"Registry auth challenge has no realm: {challenge!r}")
+        response = await client.get(realm, params=params)
+        response.raise_for_status()
+        body = response.json()
+        return body.get("token") or body["access_token"]
+
+    async def refresh(self) -> Dict[str, Any]:
+        """Resolve every runtime image, returning which ones changed digest"""
+        async with self._lock:
+            images = sorted(set(self.images.values()))
+            async with httpx.AsyncClient(timeout=httpx.Timeout(self.timeout)) as client:
+                results = await asyncio.gather(
+                    *[self.resolve(client, image) for image in images], return_exceptions=True
+                )
+
+            changed: List[str] = []
+            resolved_at = datetime.now(timezone.utc).isoformat()
+            for image, result in zip(images, results):
+                if isinstance(result, BaseException):
+                    # Keep running the previous digest rather than an unknown one
+                    logger.error(f"Exception when resolving image {image}: {result}")
+                    self._errors[image] = str(result)
+                    continue
+                self._errors.pop(image, None)
+                previous = self._digests.get(image)
+                if previous is None or previous["digest"] != result:
+                    logger.info(f"Resolved image {image} to {result}")
+                    changed.append(image)
+                self._digests[image] = {"digest": result, "resolved_at": resolved_at}
+            return {"changed": changed, "errors": dict(self._errors)}
+
+    async def apply_prepull(self) -> Dict[str, Any]:
+        """Create or update the pre-pull DaemonSet with the current pinned images"""
+        try:
+            return await k8s.create_image_prepull_daemonset(
+                {name: self.pinned(image) for name, image in self.images.items()},
+                settings.RUNTIME_IMAGE_PAUSE_IMAGE,
+            )
+        except Exception as e:
+            logger.error(f"Exception when ensuring image pre-pull DaemonSet: {e}")
+            return {"error": str(e)}
+
+    async def apply(self) -> Dict[str, Any]:
+        """Roll the current pinned images out to the pre-pull DaemonSet and the warm pools"""
+        # Imported here: the warm pool itself runs pinned images from this manager
+        from app.services.warm_pool import warm_pool
+
+        results: Dict[str, Any] = {}
+        if settings.RUNTIME_IMAGE_PREPULL_ENABLED:
+            results["prepull"] = await self.apply_prepull()
+        if settings.WARM_POOL_ENABLED:
+            results["pools"] = await warm_pool.ensure_pools()
+        return results
+
+    @staticmethod
+    def _matches(reference: ImageReference, name: str, digest: Optional[str]) -> bool:
+        """Whether a node image name is the pinned digest (or, unpinned, the tag) of an image"""
+        candidate = parse_image_reference(name)
+        if (candidate.registry, candidate.repository) != (reference.registry, reference.repository):
+            return False
+        if digest:
+            return candidate.digest == digest
+        return candidate.tag == reference.tag
+
+    async def status(self) -> Dict[str, Any]:
+        """Get each runtime image's digest and how many nodes have it cached"""
+        errors = [f"{image}: {error}" for image, error in self._errors.items()]
+        nodes, prepull = await asyncio.gather(
+            k8s.list_node_images(), k8s.get_image_prepull_status(), return_exceptions=True
+        )
+        if isinstance(nodes, BaseException):
+            errors.append(f"nodes: {str(nodes)}")
+            nodes = None
+        if isinstance(prepull, BaseException):
+            errors.append(f"prepull: {str(prepull)}")
+            prepull = None
+
+        images: Dict[str, Any] = {}
+        for name, image in self.images.items():
+            entry = self._digests.get(image) or {}
+            reference = parse_image_reference(image)
+            digest = entry.get("digest")
+            images[name] = {
+                "image": image,
+                "pinned": self.pinned(image),
+                "digest": digest,
+                "resolved_at": entry.get("resolved_at"),
+                "nodes_cached": None,
+                "nodes_missing": None,
+            }
+            if nodes is not None:
+                missing = [
+                    node["name"] for node in nodes
+                    if not any(self._matches(reference, node_image, digest) for node_image in node["images"])
+                ]
+                images[name]["nodes_cached"] = len(nodes) - len(missing)
+                images[name]["nodes_missing"] = missing
+
+        return {
+            "images": images,
+            "nodes_total": len(nodes) if nodes is not None else None,
+            "prepull": prepull,
+            "errors": errors,
+        }
+
+
+# Shared runtime image manager
+runtime_images = RuntimeImageManager(
+    {language: image for language, (image, _command) in LANGUAGE_RUNTIMES.items()},
+    parse_registry_urls(settings.RUNTIME_IMAGE_REGISTRY_URLS),
+    settings.RUNTIME_IMAGE_RESOLVE_TIMEOUT_SECONDS,
+    settings.RUNTIME_IMAGE_REFRESH_INTERVAL_SECONDS,
+)
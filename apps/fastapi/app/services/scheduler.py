@@ -0,0 +1,452 @@
+from typing import Dict, Optional, Any, Callable, Awaitable, Deque
+from collections import deque
+from datetime import datetime, timezone
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+import uuid
+
+from app.core.config import settings
+from app.core.kubernetes_provider import k8s
+from app.core.quantity import parse_quantity
+from app.schemas.project import ContainerConfig
+
+logger = logging.getLogger(__name__)
+
+# Request priorities, in dispatch order
+INTERACTIVE = "interactive"  # A user waiting on a start or create button
+BACKGROUND = "background"  # Provisioning kicked off after a project is saved
+PRIORITIES = (INTERACTIVE, BACKGROUND)
+
+# Assumed provisioning time until real runs have been measured
+DEFAULT_DURATION_SECONDS = 5.0
+DURATION_SMOOTHING = 0.2  # Weight of the newest run in the moving average
+
+
+class InsufficientCapacityError(Exception):
+    """A project needs more than the namespace quota or any node could ever give it"""
+
+
+class ProvisioningCancelledError(Exception):
+    """A queued request was withdrawn before it started, e.g. its project was deleted"""
+
+
+def parse_owner_weights(value: str) -> Dict[str, float]:
+    """Parse "owner=2,other=0.5" into per-owner weights, skipping malformed entries"""
+    weights = {}
+    for entry in value.split(","):
+        if not entry.strip():
+            continue
+        owner, _, weight = entry.partition("=")
+        try:
+            if owner.strip() and float(weight) > 0:
+                weights[owner.strip()] = float(weight)
+        except ValueError:
+            logger.warning(f"Ignoring malformed provisioning weight: {entry}")
+    return weights
+
+
+def project_cost(config: Optional[ContainerConfig] = None) -> Dict[str, float]:
+    """What provisioning one project takes, keyed by ResourceQuota resource name"""
+    # Imported here so importing the scheduler does not load the kubernetes package
+    from app.core.kubernetes import (
+        DEFAULT_CPU_REQUEST,
+        DEFAULT_MEMORY_REQUEST,
+        DEFAULT_CPU_LIMIT,
+        DEFAULT_MEMORY_LIMIT,
+        DEFAULT_STORAGE_SIZE,
+    )
+
+    cpu = parse_quantity(DEFAULT_CPU_REQUEST)
+    memory = parse_quantity(DEFAULT_MEMORY_REQUEST)
+    return {
+        "requests.cpu": cpu,
+        "cpu": cpu,
+        "requests.memory": memory,
+        "memory": memory,
+        "limits.cpu": parse_quantity(config.cpu_limit if config and config.cpu_limit else DEFAULT_CPU_LIMIT),
+        "limits.memory": parse_quantity(config.memory_limit if config and config.memory_limit else DEFAULT_MEMORY_LIMIT),
+        "requests.storage": parse_quantity(config.storage_size if config and config.storage_size else DEFAULT_STORAGE_SIZE),
+        "pods": 1,
+        "persistentvolumeclaims": 1,
+        "services": 1,
+        "count/deployments.apps": 1,
+    }
+
+
+class ProvisioningScheduler:
+    """Queues project provisioning per owner and runs it fairly within cluster limits.
+
+    Each owner has its own queue per priority, served by weighted fair
+    queueing: a dispatch advances the owner's virtual time by 1/weight and
+    the owner furthest behind goes next, so one owner creating 50 projects
+    takes turns with everyone else instead of going first. Interactive
+    requests always go before background ones and have part of the global
+    concurrency limit reserved for them, so a start button stays fast during
+    a burst of creations.
+
+    Before a request starts, its project must fit the namespace
+    ResourceQuota and the free allocatable capacity of some node. Capacity
+    comes from a snapshot refreshed every few seconds and debited for each
+    admission in between; requests that do not fit wait in their queue.
+    A request that would not fit even an empty node or the quota's hard
+    limits is rejected instead, so it cannot hold up the requests behind it.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        interactive_reserved: int,
+        quota_check: bool,
+        node_check: bool,
+        capacity_ttl: float,
+        weights: Optional[Dict[str, float]] = None,
+    ):
+        self.max_concurrency = max(max_concurrency, 1)
+        # Background work always keeps at least one slot
+        self.interactive_reserved = max(min(interactive_reserved, self.max_concurrency - 1), 0)
+        self.quota_check = quota_check
+        self.node_check = node_check
+        self.capacity_ttl = capacity_ttl
+        self.weights = weights or {}
+
+        self._queues: Dict[str, Dict[str, Deque[Dict[str, Any]]]] = {priority: {} for priority in PRIORITIES}
+        self._virtual_time: Dict[str, Dict[str, float]] = {priority: {} for priority in PRIORITIES}
+        self._clock: Dict[str, float] = {priority: 0.0 for priority in PRIORITIES}
+        self._running: Dict[str, int] = {priority: 0 for priority in PRIORITIES}
+        self._tickets: Dict[str, Dict[str, Any]] = {}  # project id -> latest queued or running ticket
+        self._sequence = itertools.count()
+        self._capacity: Optional[Dict[str, Any]] = None
+        self._capacity_at = 0.0
+        self._blocked = False
+        self._average_duration = DEFAULT_DURATION_SECONDS
+        self._counters = {"completed": 0, "failed": 0, "timed_out": 0, "rejected": 0, "cancelled": 0, "capacity_waits": 0}
+        self._wake: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    async def run(
+        self,
+        project_id: str,
+        owner_id: Optional[str],
+        work: Callable[[], Awaitable[Any]],
+        cost: Optional[Dict[str, float]] = None,
+        interactive: bool = False,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """Queue provisioning work for a project and wait for its result.
+
+        Raises asyncio.TimeoutError when the work has not started within
+        timeout seconds; the timeout does not cover the work itself.
+        Raises InsufficientCapacityError when the project can never fit, and
+        ProvisioningCancelledError when cancel() withdrew it from the queue.
+        """
+        priority = INTERACTIVE if interactive else BACKGROUND
+        ticket = {
+            "id": str(uuid.uuid4()),
+            "project_id": project_id,
+            "owner_id": owner_id or "",
+            "priority": priority,
+            "state": "queued",
+            "enqueued_at": datetime.now(timezone.utc).isoformat(),
+            "started_at": None,
+            "cost": cost or {},
+            "work": work,
+            "sequence": next(self._sequence),
+            "started": asyncio.Event(),
+            "task": None,
+        }
+        self._enqueue(ticket)
+        self._ensure_dispatcher()
+        self._wake.set()
+
+        try:
+            await asyncio.wait_for(ticket["started"].wait(), timeout)
+        except asyncio.TimeoutError:
+            # It may have been dispatched just as the wait expired
+            if ticket["state"] == "queued":
+                self._remove(ticket)
+                ticket["state"] = "timed_out"
+                self._counters["timed_out"] += 1
+                raise
+        except asyncio.CancelledError:
+            if ticket["state"] == "queued":
+                self._remove(ticket)
+                ticket["state"] = "cancelled"
+            raise
+
+        if ticket["state"] in ("rejected", "cancelled"):
+            raise ticket["error"]
+        # Shielded so a caller that goes away does not cancel half-created resources
+        return await asyncio.shield(ticket["task"])
+
+    def cancel(self, project_id: str) -> bool:
+        """Withdraw a project's queued request; running work is left to finish.
+
+        Returns whether a queued request was cancelled.
+        """
+        ticket = self._tickets.get(project_id)
+        if ticket is None or ticket["state"] != "queued":
+            return False
+        self._remove(ticket)
+        ticket["state"] = "cancelled"
+        ticket["error"] = ProvisioningCancelledError(f"Provisioning of project {project_id} was cancelled")
+        self._counters["cancelled"] += 1
+        ticket["started"].set()
+        return True
+
+    def status(self, project_id: str) -> Optional[Dict[str, Any]]:
+        """Get the queue position and estimated wait of a project's provisioning, or None"""
+        ticket = self._tickets.get(project_id)
+        if ticket is None:
+            return None
+        info = {
+            key: ticket[key]
+            for key in ("id", "project_id", "owner_id", "priority", "state", "enqueued_at", "started_at")
+        }
+        if ticket["state"] == "queued":
+            position = self._position(ticket)
+            info["position"] = position
+            info["estimated_wait_seconds"] = self._estimate_wait(ticket["priority"], position)
+            info["waiting_for_capacity"] = self._blocked
+        return info
+
+    def stats(self) -> Dict[str, Any]:
+        """Get queue lengths, running counts and the last capacity snapshot"""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "interactive_reserved": self.interactive_reserved,
+            "running": dict(self._running),
+            "queued": {
+                priority: sum(len(queue) for queue in self._queues[priority].values())
+                for priority in PRIORITIES
+            },
+            "owners_queued": {priority: len(self._queues[priority]) for priority in PRIORITIES},
+            "average_duration_seconds": round(self._average_duration, 2),
+            "waiting_for_capacity": self._blocked,
+            "capacity": self._capacity,
+            **self._counters,
+        }
+
+    def _weight(self, owner_id: str) -> float:
+        return self.weights.get(owner_id, 1.0)
+
+    def _enqueue(self, ticket: Dict[str, Any]) -> None:
+        priority, owner_id = ticket["priority"], ticket["owner_id"]
+        queues = self._queues[priority]
+        if owner_id not in queues:
+            # An owner coming back from idle gets no credit for the idle time
+            virtual_time = self._virtual_time[priority]
+            virtual_time[owner_id] = max(virtual_time.get(owner_id, 0.0), self._clock[priority])
+            queues[owner_id] = deque()
+        queues[owner_id].append(ticket)
+        self._tickets[ticket["project_id"]] = ticket
+
+    def _remove(self, ticket: Dict[str, Any]) -> None:
+        queues = self._queues[ticket["priority"]]
+        queue = queues.get(ticket["owner_id"])
+        if queue is not None and ticket in queue:
+            queue.remove(ticket)
+            if not queue:
+                del queues[ticket["owner_id"]]
+        if self._tickets.get(ticket["project_id"]) is ticket:
+            del self._tickets[ticket["project_id"]]
+
+    def _pick(self, priority: str) -> Optional[str]:
+        """The owner whose turn it is: lowest virtual time, then oldest request"""
+        queues = self._queues[priority]
+        if not queues:
+            return None
+        virtual_time = self._virtual_time[priority]
+        return min(queues, key=lambda owner_id: (virtual_time[owner_id], queues[owner_id][0]["sequence"]))
+
+    def _dequeue(self, priority: str, owner_id: str) -> Dict[str, Any]:
+        queues = self._queues[priority]
+        ticket = queues[owner_id].popleft()
+        virtual_time = self._virtual_time[priority]
+        self._clock[priority] = virtual_time[owner_id]
+        virtual_time[owner_id] += 1 / self._weight(owner_id)
+        if not queues[owner_id]:
+            del queues[owner_id]
+        return ticket
+
+    def _has_slot(self, priority: str) -> bool:
+        if sum(self._running.values()) >= self.max_concurrency:
+            return False
+        if priority == BACKGROUND:
+            return self._running[BACKGROUND] < self.max_concurrency - self.interactive_reserved
+        return True
+
+    def _position(self, ticket: Dict[str, Any]) -> int:
+        """Count the requests dispatched before a queued one, replaying the fair order"""
+        priority = ticket["priority"]
+        ahead = 0
+        if priority == BACKGROUND:
+            ahead += sum(len(queue) for queue in self._queues[INTERACTIVE].values())
+
+        queues = self._queues[priority]
+        virtual_time = self._virtual_time[priority]
+        heap = [
+            (virtual_time[owner_id], queue[0]["sequence"], owner_id, 0)
+            for owner_id, queue in queues.items()
+        ]
+        heapq.heapify(heap)
+        while heap:
+            owner_time, _, owner_id, index = heapq.heappop(heap)
+            queue = queues[owner_id]
+            if queue[index] is ticket:
+                return ahead
+            ahead += 1
+            if index + 1 < len(queue):
+                heapq.heappush(heap, (
+                    owner_time + 1 / self._weight(owner_id), queue[index + 1]["sequence"], owner_id, index + 1
+                ))
+        return ahead
+
+    def _estimate_wait(self, priority: str, position: int) -> float:
+        slots = self.max_concurrency if priority == INTERACTIVE else self.max_concurrency - self.interactive_reserved
+        return round((position // slots + 1) * self._average_duration, 1)
+
+    def _ensure_dispatcher(self) -> None:
+        if self._wake is None:
+            self._wake = asyncio.Event()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch_loop())
+
+    async def _dispatch_loop(self) -> None:
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            try:
+                await self._dispatch()
+            except Exception as e:
+                logger.error(f"Provisioning dispatch failed: {e}")
+
+    async def _dispatch(self) -> None:
+        """Start queued requests while slots and capacity allow"""
+        for priority in PRIORITIES:
+            while self._has_slot(priority) and self._queues[priority]:
+                await self._refresh_capacity()
+                # The queues may have changed while the snapshot was read
+                owner_id = self._pick(priority)
+                if owner_id is None:
+                    break
+                ticket = self._queues[priority][owner_id][0]
+                reason = self._never_fits(ticket["cost"])
+                if reason is not None:
+                    self._reject(ticket, reason)
+                    continue
+                if not self._admit(ticket["cost"]):
+                    if not self._blocked:
+                        self._counters["capacity_waits"] += 1
+                        logger.info("Provisioning is waiting for cluster capacity")
+                    self._blocked = True
+                    # Look again once the snapshot can be refreshed
+                    asyncio.get_running_loop().call_later(self.capacity_ttl, self._wake.set)
+                    return
+                self._blocked = False
+                self._start(self._dequeue(priority, owner_id))
+
+    async def _refresh_capacity(self) -> None:
+        if not (self.quota_check or self.node_check):
+            return
+        if self._capacity is not None and time.monotonic() - self._capacity_at < self.capacity_ttl:
+            return
+        try:
+            self._capacity = await k8s.get_cluster_capacity()
+        except Exception as e:
+            # Without a snapshot nothing is held back
+            logger.error(f"Exception when reading cluster capacity: {e}")
+            self._capacity = {"quota": None, "nodes": None, "errors": [str(e)]}
+        self._capacity_at = time.monotonic()
+
+    def _never_fits(self, cost: Dict[str, float]) -> Optional[str]:
+        """Why a request could not be admitted even with nothing else running, or None"""
+        capacity = self._capacity
+        if capacity is None:
+            return None
+        hard = capacity.get("quota_hard") if self.quota_check else None
+        nodes = capacity["nodes"] if self.node_check else None
+
+        if hard is not None:
+            for resource, limit in hard.items():
+                if cost.get(resource, 0) > limit:
+                    return f"{resource} {cost[resource]:g} exceeds the namespace quota of {limit:g}"
+        # No ready nodes at all is an outage to wait out, not a verdict
+        if nodes:
+            cpu, memory = cost.get("requests.cpu", 0), cost.get("requests.memory", 0)
+            if not any(n["allocatable"]["cpu"] >= cpu and n["allocatable"]["memory"] >= memory for n in nodes):
+                return f"cpu {cpu:g} and memory {memory:g} requests do not fit on any node"
+        return None
+
+    def _reject(self, ticket: Dict[str, Any], reason: str) -> None:
+        logger.warning(f"Rejected provisioning of project {ticket['project_id']}: {reason}")
+        self._remove(ticket)
+        ticket["state"] = "rejected"
+        ticket["error"] = InsufficientCapacityError(reason)
+        self._counters["rejected"] += 1
+        ticket["started"].set()
+
+    def _admit(self, cost: Dict[str, float]) -> bool:
+        """Check a request against the capacity snapshot and debit it when it fits"""
+        capacity = self._capacity
+        if capacity is None:
+            return True
+        quota = capacity["quota"] if self.quota_check else None
+        nodes = capacity["nodes"] if self.node_check else None
+
+        if quota is not None:
+            if any(cost.get(resource, 0) > left for resource, left in quota.items()):
+                return False
+        node = None
+        if nodes is not None:
+            cpu, memory = cost.get("requests.cpu", 0), cost.get("requests.memory", 0)
+            fitting = [n for n in nodes if n["cpu"] >= cpu and n["memory"] >= memory and n["pods"] >= 1]
+            if not fitting:
+                return False
+            node = max(fitting, key=lambda n: n["memory"])
+
+        if quota is not None:
+            for resource in quota:
+                quota[resource] -= cost.get(resource, 0)
+        if node is not None:
+            node["cpu"] -= cost.get("requests.cpu", 0)
+            node["memory"] -= cost.get("requests.memory", 0)
+            node["pods"] -= 1
+        return True
+
+    def _start(self, ticket: Dict[str, Any]) -> None:
+        ticket["state"] = "running"
+        ticket["started_at"] = datetime.now(timezone.utc).isoformat()
+        self._running[ticket["priority"]] += 1
+        started = time.monotonic()
+        task = asyncio.create_task(ticket["work"]())
+        task.add_done_callback(lambda done: self._finish(ticket, done, started))
+        ticket["task"] = task
+        ticket["started"].set()
+
+    def _finish(self, ticket: Dict[str, Any], task: asyncio.Task, started: float) -> None:
+        self._running[ticket["priority"]] -= 1
+        duration = time.monotonic() - started
+        self._average_duration += DURATION_SMOOTHING * (duration - self._average_duration)
+        if task.cancelled() or task.exception() is not None:
+            ticket["state"] = "failed"
+            self._counters["failed"] += 1
+        else:
+            ticket["state"] = "completed"
+            self._counters["completed"] += 1
+        if self._tickets.get(ticket["project_id"]) is ticket:
+            del self._tickets[ticket["project_id"]]
+        self._wake.set()
+
+
+# Shared provisioning scheduler
+provisioning_scheduler = ProvisioningScheduler(
+    settings.PROVISIONING_MAX_CONCURRENCY,
+    settings.PROVISIONING_INTERACTIVE_RESERVED,
+    settings.PROVISIONING_QUOTA_CHECK_ENABLED,
+    settings.PROVISIONING_NODE_CHECK_ENABLED,
+    settings.PROVISIONING_CAPACITY_TTL_SECONDS,
+    parse_owner_weights(settings.PROVISIONING_OWNER_WEIGHTS),
+)
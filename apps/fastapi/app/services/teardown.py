@@ -0,0 +1,103 @@
+from typing import Dict, List, Optional, Any, Set
+from collections import OrderedDict
+from datetime import datetime, timezone
+import asyncio
+import logging
+import time
+import uuid
+
+from app.core.config import settings
+from app.core.kubernetes_provider import k8s
+
+logger = logging.getLogger(__name__)
+
+
+class TeardownTracker:
+    """Runs bulk project teardowns in the background and tracks them by handle.
+
+    A teardown issues the delete_collection calls for all its projects at
+    once, then polls until no object of those projects is left. Callers get
+    a handle immediately and query its state, which moves from "deleting"
+    to "terminating" to "completed" (or "failed" / "timed_out").
+    """
+
+    def __init__(self, max_handles: int):
+        self.max_handles = max_handles
+        self._handles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._tasks: Set[asyncio.Task] = set()
+
+    def start(self, project_ids: List[str]) -> Dict[str, Any]:
+        """Start tearing down the resources of many projects, returning the tracking handle"""
+        project_ids = list(dict.fromkeys(project_ids))
+        handle = {
+            "id": str(uuid.uuid4()),
+            "state": "deleting",
+            "project_count": len(project_ids),
+            "calls": 0,
+            "errors": [],
+            "remaining": None,
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "accepted_ms": None,  # Until the API server accepted every delete
+            "finished_at": None,
+        }
+        self._handles[handle["id"]] = handle
+        self._evict()
+
+        task = asyncio.create_task(self._run(handle, project_ids))
+        # Keep a reference so the task is not garbage collected mid-flight
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return dict(handle)
+
+    def get(self, handle_id: str) -> Optional[Dict[str, Any]]:
+        """Get the current state of a teardown, or None if it is unknown"""
+        handle = self._handles.get(handle_id)
+        return dict(handle) if handle else None
+
+    def _evict(self) -> None:
+        # Drop the oldest finished handles beyond the limit; running ones stay
+        finished = [
+            handle_id for handle_id, handle in self._handles.items()
+            if handle["finished_at"] is not None
+        ]
+        while len(self._handles) > self.max_handles and finished:
+            self._handles.pop(finished.pop(0), None)
+
+    def _finish(self, handle: Dict[str, Any], state: str) -> None:
+        handle["state"] = state
+        handle["finished_at"] = datetime.now(timezone.utc).isoformat()
+        self._evict()
+
+    async def _run(self, handle: Dict[str, Any], project_ids: List[str]) -> None:
+        started = time.perf_counter()
+        try:
+            result = await k8s.delete_projects_resources(project_ids)
+            handle["calls"] = result["calls"]
+            handle["errors"] = result["errors"]
+            handle["accepted_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+            # Background propagation: wait for the garbage collector to finish
+            handle["state"] = "terminating"
+            deadline = time.monotonic() + settings.TEARDOWN_TIMEOUT_SECONDS
+            while True:
+                handle["remaining"] = await k8s.count_projects_objects(project_ids)
+                if not any(handle["remaining"].values()):
+                    break
+                if time.monotonic() >= deadline:
+                    self._finish(handle, "timed_out")
+                    return
+                await asyncio.sleep(settings.TEARDOWN_POLL_INTERVAL_SECONDS)
+
+            self._finish(handle, "failed" if handle["errors"] else "completed")
+            logger.info(
+                f"Tore down {len(project_ids)} projects with {handle['calls']} delete calls "
+                f"in {time.perf_counter() - started:.1f}s"
+            )
+        except Exception as e:
+            logger.error(f"Exception when tearing down projects: {e}")
+            handle["errors"].append(str(e))
+            self._finish(handle, "failed")
+
+
+# Shared teardown tracker
+teardown_tracker = TeardownTracker(settings.TEARDOWN_HANDLES_KEPT)
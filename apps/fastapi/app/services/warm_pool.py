@@ -0,0 +1,151 @@
+from typing import Dict, List, Optional, Any, Set
+import asyncio
+import logging
+import shlex
+import time
+
+from app.core.config import settings
+from app.core.kubernetes_provider import k8s
+from app.services.bundles import build_bundle
+from app.services.provisioning import LANGUAGE_RUNTIMES
+from app.services.runtime_images import runtime_images
+
+logger = logging.getLogger(__name__)
+
+# Where claimed pods receive the project files (an emptyDir in the pool pod)
+POOL_SRC_PATH = "/app/src"
+
+
+def parse_pool_sizes(spec: str) -> Dict[str, int]:
+    """Parse a `language=size,...` pool size setting, ignoring unknown languages"""
+    sizes = {language: 0 for language in LANGUAGE_RUNTIMES}
+    for entry in spec.split(","):
+        language, _, size = entry.strip().partition("=")
+        language = language.strip().lower()
+        if language in LANGUAGE_RUNTIMES and size.strip().isdigit():
+            sizes[language] = int(size)
+    return sizes
+
+
+class WarmPoolManager:
+    """Keeps pre-started idle pods per runtime and hands them to projects on start.
+
+    Starting a project normally waits for scheduling, image pull and container
+    start. Instead, a ready idle pod of the project's runtime is claimed by
+    relabelling it, the project files are streamed into it over exec and the
+    runtime command is launched in the background, which takes about a second.
+    The project Deployment is started at the same time; once its rollout
+    completes the claimed pod is deleted, so the pool pod only bridges the
+    cold start. The pool Deployment refills itself as pods are claimed.
+
+    Claimed pods do not mount the project PVC or receive custom env vars, so
+    only projects on their runtime's default image and command are eligible.
+    """
+
+    def __init__(self, sizes: Dict[str, int]):
+        self.sizes = sizes
+        self._handoffs: Set[asyncio.Task] = set()
+
+    async def ensure_pools(self) -> Dict[str, Any]:
+        """Create or resize the pool Deployment of every runtime"""
+        results = {}
+        for language, (image, _command) in LANGUAGE_RUNTIMES.items():
+            try:
+                results[language] = await k8s.create_pool_deployment(
+                    language, runtime_images.pinned(image), self.sizes.get(language, 0)
+                )
+            except Exception as e:
+                logger.error(f"Exception when ensuring warm pool for {language}: {e}")
+                results[language] = f"error: {str(e)}"
+        return results
+
+    def eligible_runtime(self, language: Optional[str], container_image: Optional[str] = None) -> Optional[str]:
+        """Get the pool runtime a project can start on, if any"""
+        language = language.lower() if language else None
+        if language not in LANGUAGE_RUNTIMES or not self.sizes.get(language):
+            return None
+        if container_image and container_image != LANGUAGE_RUNTIMES[language][0]:
+            return None
+        return language
+
+    async def claim(
+        self,
+        project_id: str,
+        language: Optional[str],
+        files: List[Dict[str, Any]],
+        container_image: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Claim a pool pod for a project and start the project in it.
+
+        Returns the claimed pod and how long the claim took, or None when the
+        project is not eligible or no idle pod is ready. Never raises: the
+        regular start path is always taken as well.
+        """
+        runtime = self.eligible_runtime(language, container_image)
+        if runtime is None:
+            return None
+
+        started = time.perf_counter()
+        pod_name = None
+        try:
+            pod_name = await k8s.claim_pool_pod(runtime, project_id)
+            if pod_name is None:
+                logger.info(f"No idle {runtime} pool pod for project {project_id}")
+                return None
+
+            # Read exactly the bundle size so tar sees EOF without closing stdin
+            bundle = build_bundle(files)
+            await k8s.exec_in_pod(
+                pod_name,
+                ["sh", "-c", f"head -c {len(bundle)} | tar xzf - -C {POOL_SRC_PATH}"],
+                stdin=bundle,
+            )
+
+            # Launch the runtime command detached, logging to the container's stdout
+            command = shlex.join(LANGUAGE_RUNTIMES[runtime][1])
+            await k8s.exec_in_pod(
+                pod_name,
+                ["sh", "-c", f"cd {POOL_SRC_PATH} && nohup {command} > /proc/1/fd/1 2>&1 &"],
+            )
+        except Exception as e:
+            logger.error(f"Exception when claiming pool pod for project {project_id}: {e}")
+            if pod_name is not None:
+                await self.release(project_id)
+            return None
+
+        return {
+            "pod": pod_name,
+            "runtime": runtime,
+            "claimed_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+
+    async def release(self, project_id: str) -> List[str]:
+        """Delete every pool pod claimed by a project"""
+        try:
+            return await k8s.delete_claimed_pods(project_id)
+        except Exception as e:
+            logger.error(f"Exception when releasing pool pods of project {project_id}: {e}")
+            return []
+
+    def schedule_handoff(self, project_id: str) -> None:
+        """Release the claimed pod once the project Deployment has rolled out"""
+        task = asyncio.create_task(self._handoff(project_id))
+        # Keep a reference so the task is not garbage collected mid-flight
+        self._handoffs.add(task)
+        task.add_done_callback(self._handoffs.discard)
+
+    async def _handoff(self, project_id: str) -> None:
+        try:
+            rollout = await k8s.wait_for_rollout(
+                project_id, settings.WARM_POOL_HANDOFF_TIMEOUT_SECONDS
+            )
+            if rollout["timed_out"]:
+                logger.warning(f"Deployment of project {project_id} not ready, releasing pool pod anyway")
+        except Exception as e:
+            logger.error(f"Exception when waiting for rollout of project {project_id}: {e}")
+        released = await self.release(project_id)
+        logger.info(f"Handed off project {project_id} from pool pods {released}")
+
+
+# Shared pool manager
+warm_pool = WarmPoolManager(parse_pool_sizes(settings.WARM_POOL_SIZES))
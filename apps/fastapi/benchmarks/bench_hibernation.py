@@ -0,0 +1,82 @@
+"""Hibernate and restore timings against project data size.
+
+For each size, fills the PVC of a scratch project with that much data, then
+times hibernation (archive /app/data into the object store and delete the
+PVC) and restoration (recreate the PVC and unpack the archive). Exec and
+volumes need a real cluster, so this runs against the current kubeconfig
+context and cleans up after itself; the object store is a temporary
+directory.
+
+Usage (from apps/fastapi):
+    python -m benchmarks.bench_hibernation --sizes-mb 1 10 100 --content random
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import uuid
+
+
+async def _fill_pvc(project_id: str, size_mb: int, content: str) -> None:
+    from app.core.config import settings
+    from app.core.kubernetes import AsyncKubernetesClient
+
+    source = "/dev/urandom" if content == "random" else "/dev/zero"
+    helper = await AsyncKubernetesClient.create_data_helper_pod(project_id, settings.DATA_HELPER_IMAGE)
+    try:
+        await AsyncKubernetesClient.wait_for_pod_running(helper, settings.HIBERNATE_TIMEOUT_SECONDS)
+        await AsyncKubernetesClient.exec_in_pod(
+            helper,
+            ["sh", "-c", f"head -c {size_mb * 1024 * 1024} {source} > /app/data/blob"],
+            timeout_seconds=settings.HIBERNATE_TIMEOUT_SECONDS,
+        )
+    finally:
+        await AsyncKubernetesClient.delete_pod(helper)
+
+
+async def _run(sizes_mb: list, content: str, storage_size: str) -> None:
+    from app.core.kubernetes import AsyncKubernetesClient
+    from app.services.hibernation import hibernate_project, restore_project_data
+
+    print(f"{'size':>8}  {'archive':>10}  {'hibernate':>10}  {'restore':>10}")
+    for size_mb in sizes_mb:
+        project_id = f"bench-{uuid.uuid4().hex[:8]}"
+        try:
+            await AsyncKubernetesClient.create_pvc(project_id, storage_size=storage_size)
+            await _fill_pvc(project_id, size_mb, content)
+
+            start = time.perf_counter()
+            hibernated = await hibernate_project(project_id)
+            hibernate_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            await AsyncKubernetesClient.create_pvc(project_id, storage_size=storage_size)
+            await restore_project_data(project_id, hibernated["archive"])
+            restore_ms = (time.perf_counter() - start) * 1000
+
+            print(
+                f"{size_mb:>6}MB  {hibernated['size_bytes'] / 1024 / 1024:>8.1f}MB  "
+                f"{hibernate_ms:>8.0f}ms  {restore_ms:>8.0f}ms"
+            )
+        finally:
+            await AsyncKubernetesClient.delete_project_resources(project_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes-mb", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--content", choices=["random", "zeros"], default="random",
+                        help="Incompressible or highly compressible data")
+    parser.add_argument("--storage-size", default="2Gi", help="PVC size of the scratch projects")
+    args = parser.parse_args()
+
+    # Set before the app modules read their settings
+    os.environ.setdefault("OBJECT_STORE_PATH", tempfile.mkdtemp(prefix="vibecode-objects-"))
+    os.environ.setdefault("WARM_POOL_ENABLED", "false")
+
+    asyncio.run(_run(args.sizes_mb, args.content, args.storage_size))
+
+
+if __name__ == "__main__":
+    main()
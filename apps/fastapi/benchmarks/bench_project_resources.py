@@ -0,0 +1,63 @@
+"""Latency benchmark for KubernetesClient.get_project_resources.
+
+Compares reading the five project resources one after another with the
+concurrent fan-out, against a stand-in API server that injects a fixed delay
+into every request.
+
+Usage (from apps/fastapi):
+    python -m benchmarks.bench_project_resources --delay 0.02 --iterations 20
+"""
+import argparse
+import os
+import statistics
+import time
+
+from benchmarks.fake_apiserver import FakeApiServer
+
+
+def _measure(func, iterations: int) -> list:
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--delay", type=float, default=0.02, help="Injected API latency in seconds")
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    server = FakeApiServer(delay=args.delay).start()
+    server.add_project("bench")
+    os.environ["KUBECONFIG"] = server.write_kubeconfig()
+
+    # Imported after KUBECONFIG points at the stand-in server
+    from app.core.kubernetes import KubernetesClient, PROJECT_RESOURCE_KINDS
+
+    def sequential():
+        return {
+            kind: KubernetesClient.fetch_project_resource(kind, "bench")
+            for kind in PROJECT_RESOURCE_KINDS
+        }
+
+    def concurrent():
+        return KubernetesClient.get_project_resources("bench")
+
+    assert sequential() == concurrent()
+
+    print(f"Injected delay: {args.delay * 1000:.1f} ms, iterations: {args.iterations}")
+    for name, func in (("sequential", sequential), ("concurrent", concurrent)):
+        timings = _measure(func, args.iterations)
+        print(
+            f"{name:>10}: median {statistics.median(timings):7.1f} ms  "
+            f"p95 {sorted(timings)[int(len(timings) * 0.95) - 1]:7.1f} ms"
+        )
+
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Benchmark of runtime image pinning and pre-pull against local stand-ins.
+
+Runs the RuntimeImageManager against the stand-in registry (which
+challenges for a token like Docker Hub) and the stand-in API server with a
+set of nodes, and reports:
+  * the time and registry requests of a cold tag -> digest resolution of
+    every runtime image, and the cost of a pinned() lookup afterwards;
+  * the pre-pull DaemonSet and the per-image node cache counts, with part
+    of the nodes already holding the images;
+  * a tag moving in the registry: the refresh that notices it, the
+    DaemonSet rolling to the new digest and the cache count dropping until
+    nodes report the new image.
+
+Usage (from apps/fastapi):
+    python -m benchmarks.bench_runtime_images --nodes 50 --registry-delay 0.05
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks.fake_apiserver import FakeApiServer
+from benchmarks.fake_registry import FakeRegistry
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=50)
+    parser.add_argument("--cached-fraction", type=float, default=0.8, help="Share of nodes already holding the images")
+    parser.add_argument("--registry-delay", type=float, default=0.05, help="Seconds added to every registry request")
+    parser.add_argument("--lookups", type=int, default=100000)
+    args = parser.parse_args()
+
+    registry = FakeRegistry(delay=args.registry_delay).start()
+    server = FakeApiServer().start()
+    os.environ["KUBECONFIG"] = server.write_kubeconfig()
+    os.environ["RUNTIME_IMAGE_REGISTRY_URLS"] = f"docker.io={registry.url}"
+
+    # Imported after the environment points at the stand-ins
+    from app.services.runtime_images import runtime_images, parse_image_reference
+
+    digests = {}
+    for image in runtime_images.images.values():
+        reference = parse_image_reference(image)
+        digests[image] = registry.push(reference.repository, reference.tag)
+
+    def node_images(image_digests):
+        names = []
+        for image, digest in image_digests.items():
+            reference = parse_image_reference(image)
+            names.append([
+                f"docker.io/{reference.repository}@{digest}",
+                f"docker.io/{reference.repository}:{reference.tag}",
+            ])
+        return names
+
+    cached_nodes = int(args.nodes * args.cached_fraction)
+    for i in range(args.nodes):
+        server.add_node(f"node-{i}", images=node_images(digests) if i < cached_nodes else [])
+
+    async def run():
+        started = time.perf_counter()
+        result = await runtime_images.refresh()
+        cold_ms = (time.perf_counter() - started) * 1000
+        print(
+            f"Cold resolution of {len(runtime_images.images)} images: {cold_ms:.1f} ms, "
+            f"{registry.manifest_requests} manifest + {registry.token_requests} token requests, "
+            f"errors: {result['errors'] or 'none'}"
+        )
+
+        image = runtime_images.images["python"]
+        started = time.perf_counter()
+        for _ in range(args.lookups):
+            runtime_images.pinned(image)
+        lookup_us = (time.perf_counter() - started) * 1e6 / args.lookups
+        print(f"pinned() lookup: {lookup_us:.2f} us -> {runtime_images.pinned(image)}")
+
+        prepull = await runtime_images.apply_prepull()
+        print(f"Pre-pull DaemonSet {prepull['name']}: {prepull['action']}")
+        status = await runtime_images.status()
+        for name, entry in status["images"].items():
+            print(f"  {name:>10}: cached on {entry['nodes_cached']}/{status['nodes_total']} nodes")
+
+        # Move one tag: the next refresh must notice and roll the DaemonSet
+        reference = parse_image_reference(image)
+        new_digest = registry.push(reference.repository, reference.tag)
+        requests_before = registry.manifest_requests
+        started = time.perf_counter()
+        result = await runtime_images.refresh()
+        refresh_ms = (time.perf_counter() - started) * 1000
+        prepull = await runtime_images.apply_prepull()
+        daemonset = server.objects[("daemonsets", prepull["name"])]
+        rolled = any(
+            container["image"].endswith(new_digest)
+            for container in daemonset["spec"]["template"]["spec"]["initContainers"]
+        )
+        status = await runtime_images.status()
+        print(
+            f"Tag moved: refresh {refresh_ms:.1f} ms ({registry.manifest_requests - requests_before} manifest requests), "
+            f"changed {result['changed']}, DaemonSet {prepull['action']} to new digest: {rolled}, "
+            f"python cached on {status['images']['python']['nodes_cached']}/{status['nodes_total']} nodes"
+        )
+
+    asyncio.run(run())
+    server.stop()
+    registry.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""CPU benchmark for the plain-dict serialization path of KubernetesClient.
+
+Compares, per operation:
+  * rendering a project Deployment as a V1Deployment model tree and
+    serializing it, against rendering the dict template the client now sends;
+  * decoding a pod list into V1Pod models and summarizing them, against
+    parsing the raw JSON and summarizing the dicts;
+  * a full list_namespaced_pod round trip against the stand-in API server,
+    both ways.
+
+Usage (from apps/fastapi):
+    python -m benchmarks.bench_serialization --projects 500 --iterations 20
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+from types import SimpleNamespace
+
+from benchmarks.fake_apiserver import FakeApiServer
+
+
+def _measure(func, iterations: int) -> list:
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def _report(name: str, timings: list) -> float:
+    median = statistics.median(timings)
+    print(f"{name:>30}: median {median:8.2f} ms  p95 {sorted(timings)[int(len(timings) * 0.95) - 1]:8.2f} ms")
+    return median
+
+
+def model_deployment(client, project_id: str):
+    """The project Deployment built from models, as the client did before the dict templates"""
+    labels = {"app": "vibecode", "project-id": project_id}
+    return client.V1Deployment(
+        api_version="apps/v1",
+        kind="Deployment",
+        metadata=client.V1ObjectMeta(name=f"project-{project_id}-deployment", namespace="vibecode", labels=labels),
+        spec=client.V1DeploymentSpec(
+            replicas=1,
+            strategy=client.V1DeploymentStrategy(
+                type="RollingUpdate",
+                rolling_update=client.V1RollingUpdateDeployment(max_surge=1, max_unavailable=0),
+            ),
+            selector=client.V1LabelSelector(match_labels=labels),
+            template=client.V1PodTemplateSpec(
+                metadata=client.V1ObjectMeta(labels=labels),
+                spec=client.V1PodSpec(
+                    containers=[
+                        client.V1Container(
+                            name=f"project-{project_id}",
+                            image="python:3.9-slim",
+                            image_pull_policy="IfNotPresent",
+                            command=["python", "-m", "http.server", "8000"],
+                            ports=[client.V1ContainerPort(container_port=8000)],
+                            resources=client.V1ResourceRequirements(
+                                limits={"cpu": "500m", "memory": "512Mi"},
+                                requests={"cpu": "100m", "memory": "128Mi"},
+                            ),
+                            volume_mounts=[
+                                client.V1VolumeMount(name="project-data", mount_path="/app/data"),
+                                client.V1VolumeMount(name="project-files", mount_path="/app/src"),
+                            ],
+                            env=[],
+                            working_dir="/app/src",
+                        )
+                    ],
+                    volumes=[
+                        client.V1Volume(
+                            name="project-data",
+                            persistent_volume_claim=client.V1PersistentVolumeClaimVolumeSource(
+                                claim_name=f"project-{project_id}-pvc"
+                            ),
+                        ),
+                        client.V1Volume(
+                            name="project-files",
+                            config_map=client.V1ConfigMapVolumeSource(name=f"project-{project_id}-configmap"),
+                        ),
+                    ],
+                ),
+            ),
+        ),
+    )
+
+
+def summarize_model_pod(pod) -> dict:
+    """The pod summary read from a V1Pod model, as the client did before"""
+    statuses = pod.status.container_statuses
+    return {
+        "name": pod.metadata.name,
+        "status": pod.status.phase,
+        "ready": all(status.ready for status in statuses) if statuses else False,
+        "restart_count": sum(status.restart_count for status in statuses) if statuses else 0,
+        "start_time": pod.status.start_time.isoformat() if pod.status.start_time else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--projects", type=int, default=500, help="Projects (one pod each) in the pod list")
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    server = FakeApiServer().start()
+    for i in range(args.projects):
+        server.add_project(f"bench{i}")
+    os.environ["KUBECONFIG"] = server.write_kubeconfig()
+
+    # Imported after KUBECONFIG points at the stand-in server
+    from kubernetes import client
+    from app.core import kubernetes as kubernetes_module
+    from app.core.kubernetes import KubernetesClient, core_v1_api
+    from app.core.kubernetes_provider import kubernetes_provider
+    from app.core.raw_api import call_raw, loads, orjson
+
+    api_client = kubernetes_provider.get().api_client
+    captured = {}
+
+    def capture(kind, manifest, read, create, patch, summarize):
+        captured["manifest"] = manifest
+        return "unchanged", {"name": manifest["metadata"]["name"], "replicas": 1}
+
+    # Render the client's own template but keep the manifest instead of sending it
+    kubernetes_module.reconcile = capture
+
+    def render_dict():
+        KubernetesClient.create_deployment("bench", "project-bench-pvc", "project-bench-configmap")
+        return json.dumps(api_client.sanitize_for_serialization(captured["manifest"]))
+
+    def render_model():
+        return json.dumps(api_client.sanitize_for_serialization(model_deployment(client, "bench")))
+
+    # Equal apart from the spec hash annotation reconcile would stamp
+    assert {
+        key: value for key, value in json.loads(render_dict()).items() if key != "metadata"
+    } == {
+        key: value for key, value in json.loads(render_model()).items() if key != "metadata"
+    }
+
+    # One pod list body, decoded both ways without the network
+    body = call_raw(core_v1_api.list_namespaced_pod, namespace="vibecode", label_selector="app=vibecode")
+    raw = json.dumps(body).encode()
+
+    def decode_model():
+        response = api_client.deserialize(SimpleNamespace(data=raw), "V1PodList")
+        return [summarize_model_pod(pod) for pod in response.items]
+
+    def decode_raw():
+        return [KubernetesClient.summarize_pod(pod) for pod in loads(raw)["items"]]
+
+    assert decode_model() == decode_raw()
+
+    def list_model():
+        response = core_v1_api.list_namespaced_pod(namespace="vibecode", label_selector="app=vibecode")
+        return [summarize_model_pod(pod) for pod in response.items]
+
+    def list_raw():
+        response = call_raw(core_v1_api.list_namespaced_pod, namespace="vibecode", label_selector="app=vibecode")
+        return [KubernetesClient.summarize_pod(pod) for pod in response["items"]]
+
+    print(
+        f"Pods in list: {args.projects}, iterations: {args.iterations}, "
+        f"JSON parser: {'orjson' if orjson is not None else 'json'}"
+    )
+    for label, model_func, dict_func, repeat in (
+        ("render Deployment x100", render_model, render_dict, 100),
+        ("decode pod list", decode_model, decode_raw, 1),
+        ("list pods (round trip)", list_model, list_raw, 1),
+    ):
+        model_median = _report(f"{label} models", _measure(lambda: [model_func() for _ in range(repeat)], args.iterations))
+        dict_median = _report(f"{label} dicts", _measure(lambda: [dict_func() for _ in range(repeat)], args.iterations))
+        print(f"{'':>30}  {model_median / dict_median:.1f}x faster")
+
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+"""Minimal stand-in for the Kubernetes API server used by the benchmarks.
+
+Serves the core/v1 and apps/v1 endpoints the API touches from an
+in-memory store (one namespace; cluster-wide paths see the same
+objects), with an optional fixed delay injected into every request to
+simulate API server round-trip latency. It is deliberately small: label
+selectors support only `key=value` and `key in (a,b)` terms, JSON patches
+only test/add/replace/remove on object paths, lists page by name with
+`limit`/`continue`, field selectors are ignored, and watches return an
+empty stream.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Any, Optional, Tuple
+from urllib.parse import unquote_plus
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+
+KIND_PATHS = {
+    "pods": ("api/v1", "Pod"),
+    "services": ("api/v1", "Service"),
+    "configmaps": ("api/v1", "ConfigMap"),
+    "persistentvolumeclaims": ("api/v1", "PersistentVolumeClaim"),
+    "deployments": ("apis/apps/v1", "Deployment"),
+    "daemonsets": ("apis/apps/v1", "DaemonSet"),
+    "resourcequotas": ("api/v1", "ResourceQuota"),
+    "nodes": ("api/v1", "Node"),
+}
+
+PATH_RE = re.compile(
+    r"^/(?P<group>api/v1|apis/apps/v1)/(?:namespaces/(?P<namespace>[^/]+)/)?"
+    r"(?P<plural>[a-z]+)(?:/(?P<name>[^/]+))?(?:/(?P<sub>[a-z]+))?$"
+)
+
+
+def _match_selector(labels: Dict[str, str], selector: str) -> bool:
+    """Evaluate a simple label selector against a label dict"""
+    if not selector:
+        return True
+    for term in re.split(r",(?![^()]*\))", selector):
+        term = term.strip()
+        in_match = re.match(r"^([\w./-]+)\s+in\s+\((.*)\)$", term)
+        if in_match:
+            values = {v.strip() for v in in_match.group(2).split(",")}
+            if labels.get(in_match.group(1)) not in values:
+                return False
+        elif "=" in term:
+            key, value = term.split("=", 1)
+            if labels.get(key.rstrip("=")) != value:
+                return False
+    return True
+
+
+class FakeApiServer:
+    """In-memory API server listening on a local port"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.objects: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.request_count = 0
+        self.resource_version = 1
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeApiServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+
+    def write_kubeconfig(self) -> str:
+        """Write a kubeconfig pointing at this server and return its path"""
+        kubeconfig = {
+            "apiVersion": "v1",
+            "kind": "Config",
+            "clusters": [{"name": "fake", "cluster": {"server": self.url}}],
+            "contexts": [{"name": "fake", "context": {"cluster": "fake", "user": "fake"}}],
+            "current-context": "fake",
+            "users": [{"name": "fake", "user": {"token": "fake"}}],
+        }
+        fd, path = tempfile.mkstemp(suffix=".kubeconfig")
+        with os.fdopen(fd, "w") as f:
+            json.dump(kubeconfig, f)
+        return path
+
+    def add(self, plural: str, obj: Dict[str, Any]) -> Dict[str, Any]:
+        """Insert an object directly into the store"""
+        group, kind = KIND_PATHS[plural]
+        with self.lock:
+            self.resource_version += 1
+            obj.setdefault("apiVersion", "apps/v1" if group.startswith("apis") else "v1")
+            obj.setdefault("kind", kind)
+            obj["metadata"]["resourceVersion"] = str(self.resource_version)
+            obj["metadata"].setdefault(
+                "creationTimestamp", time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+            )
+            self.objects[(plural, obj["metadata"]["name"])] = obj
+        return obj
+
+    def add_project(self, project_id: str, pods: int = 1) -> None:
+        """Insert the objects the API creates for a running project"""
+        labels = {"app": "vibecode", "project-id": project_id}
+        prefix = f"project-{project_id}"
+        self.add("deployments", {
+            "metadata": {"name": f"{prefix}-deployment", "labels": labels},
+            "spec": {
+                "replicas": 1,
+                "selector": {"matchLabels": labels},
+                "template": {"metadata": {"labels": labels}, "spec": {"containers": [{"name": prefix, "image": "python:3.9-slim"}]}},
+            },
+            "status": {"availableReplicas": 1, "readyReplicas": 1},
+        })
+        self.add("services", {
+            "metadata": {"name": f"{prefix}-service", "labels": labels},
+            "spec": {"clusterIP": "10.0.0.1", "ports": [{"port": 8000, "targetPort": 8000}]},
+        })
+        self.add("persistentvolumeclaims", {
+            "metadata": {"name": f"{prefix}-pvc", "labels": labels},
+            "spec": {"accessModes": ["ReadWriteOnce"], "resources": {"requests": {"storage": "1Gi"}}},
+            "status": {"phase": "Bound", "capacity": {"storage": "1Gi"}},
+        })
+        self.add("configmaps", {
+            "metadata": {"name": f"{prefix}-configmap", "labels": labels},
+            "data": {"main.py": "print('Hello, World!')"},
+        })
+        for i in range(pods):
+            self.add("pods", {
+                "metadata": {"name": f"{prefix}-deployment-{i}", "labels": labels},
+                "spec": {"containers": [{"name": prefix, "image": "python:3.9-slim"}]},
+                "status": {
+                    "phase": "Running",
+                    "startTime": "2024-01-01T00:00:00Z",
+                    "containerStatuses": [{
+                        "name": prefix, "ready": True, "restartCount": 0,
+                        "image": "python:3.9-slim", "imageID": "", "state": {},
+                    }],
+                },
+            })
+
+    def add_node(
+        self, name: str, cpu: str = "4", memory: str = "16Gi", pods: str = "110", images: Optional[List[List[str]]] = None
+    ) -> None:
+        """Insert a ready, schedulable node with the given allocatable resources.
+
+        `images` lists the names (tag and digest references) of each image
+        the node reports as present.
+        """
+        self.add("nodes", {
+            "metadata": {"name": name, "labels": {"kubernetes.io/hostname": name}},
+            "spec": {},
+            "status": {
+                "allocatable": {"cpu": cpu, "memory": memory, "pods": pods},
+                "conditions": [{"type": "Ready", "status": "True"}],
+                "images": [{"names": names, "sizeBytes": 0} for names in images or []],
+            },
+        })
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: Any) -> None:
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _not_found(self, plural: str, name: str) -> None:
+                self._send(404, {
+                    "kind": "Status", "apiVersion": "v1", "status": "Failure",
+                    "reason": "NotFound", "code": 404,
+                    "message": f'{plural} "{name}" not found',
+                })
+
+            def _route(self):
+                with server.lock:
+                    server.request_count += 1
+                if server.delay:
+                    time.sleep(server.delay)
+                path, _, query = self.path.partition("?")
+                params = {}
+                for pair in query.split("&") if query else []:
+                    key, _, value = pair.partition("=")
+                    params[key] = unquote_plus(value)
+                match = PATH_RE.match(path)
+                return match, params
+
+            def _read_body(self) -> Any:
+                length = int(self.headers.get("Content-Length") or 0)
+                return json.loads(self.rfile.read(length) or b"{}")
+
+            def do_GET(self):
+                match, params = self._route()
+                if not match:
+                    return self._send(404, {"kind": "Status", "code": 404})
+                plural, name = match.group("plural"), match.group("name")
+                if params.get("watch") in ("true", "True", "1"):
+                    # No events; hold the stream briefly like an idle watch
+                    time.sleep(min(float(params.get("timeoutSeconds", 1)), 1.0))
+                    self.send_response(200)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                if name:
+                    obj = server.objects.get((plural, name))
+                    if obj is None:
+                        return self._not_found(plural, name)
+                    if match.group("sub") == "log":
+                        data = obj.get("_log", "").encode()
+                        self.send_response(200)
+                        self.send_header("Content-Type", "text/plain")
+                        self.send_header("Content-Length", str(len(data)))
+                        self.end_headers()
+                        self.wfile.write(data)
+                        return
+                    return self._send(200, obj)
+                selector = params.get("labelSelector", "")
+                with server.lock:
+                    items = sorted(
+                        (
+                            obj for (p, _), obj in server.objects.items()
+                            if p == plural and _match_selector(obj["metadata"].get("labels") or {}, selector)
+                        ),
+                        key=lambda obj: obj["metadata"]["name"],
+                    )
+                    resource_version = str(server.resource_version)
+                # Paging: the continue token is the name of the last item served
+                metadata = {"resourceVersion": resource_version}
+                if params.get("continue"):
+                    items = [obj for obj in items if obj["metadata"]["name"] > params["continue"]]
+                limit = int(params.get("limit") or 0)
+                if limit and len(items) > limit:
+                    items = items[:limit]
+                    metadata["continue"] = items[-1]["metadata"]["name"]
+                _, kind = KIND_PATHS[plural]
+                self._send(200, {
+                    "kind": f"{kind}List", "apiVersion": "v1",
+                    "metadata": metadata,
+                    "items": items,
+                })
+
+            def do_POST(self):
+                match, _ = self._route()
+                body = self._read_body()
+                plural = match.group("plural")
+                name = body["metadata"]["name"]
+                if (plural, name) in server.objects:
+                    return self._send(409, {"kind": "Status", "code": 409, "reason": "AlreadyExists"})
+                self._send(201, server.add(plural, body))
+
+            def do_PUT(self):
+                match, _ = self._route()
+                body = self._read_body()
+                self._send(200, server.add(match.group("plural"), body))
+
+            def do_PATCH(self):
+                match, _ = self._route()
+                body = self._read_body()
+                plural, name = match.group("plural"), match.group("name")
+                obj = server.objects.get((plural, name))
+                if obj is None:
+                    return self._not_found(plural, name)
+                if match.group("sub") == "scale":
+                    obj["spec"]["replicas"] = body.get("spec", {}).get("replicas", obj["spec"].get("replicas"))
+                    return self._send(200, {
+                        "kind": "Scale", "apiVersion": "autoscaling/v1",
+                        "metadata": {"name": name}, "spec": {"replicas": obj["spec"]["replicas"]},
+                    })
+                if isinstance(body, list):
+                    with server.lock:
+                        if not _json_patch(obj, body):
+                            return self._send(422, {"kind": "Status", "code": 422, "reason": "Invalid"})
+                else:
+                    _merge(obj, body)
+                self._send(200, server.add(plural, obj))
+
+            def do_DELETE(self):
+                match, params = self._route()
+                plural, name = match.group("plural"), match.group("name")
+                with server.lock:
+                    if name:
+                        if server.objects.pop((plural, name), None) is None:
+                            return self._not_found(plural, name)
+                    else:
+                        selector = params.get("labelSelector", "")
+                        for key in [
+                            key for key, obj in server.objects.items()
+                            if key[0] == plural and _match_selector(obj["metadata"].get("labels") or {}, selector)
+                        ]:
+                            del server.objects[key]
+                self._send(200, {"kind": "Status", "status": "Success"})
+
+        return Handler
+
+
+def _merge(target: Dict[str, Any], patch: Dict[str, Any]) -> None:
+    """Apply a JSON merge patch in place"""
+    for key, value in patch.items():
+        if value is None:
+            target.pop(key, None)
+        elif isinstance(value, dict) and isinstance(target.get(key), dict):
+            _merge(target[key], value)
+        else:
+            target[key] = value
+
+
+def _json_patch(target: Dict[str, Any], operations: List[Dict[str, Any]]) -> bool:
+    """Apply a JSON patch of test/add/replace/remove ops on object paths in place.
+
+    Returns False, leaving the target untouched, when a test op fails.
+    """
+    def resolve(path: str, create: bool) -> Tuple[Dict[str, Any], str]:
+        *parents, key = [part.replace("~1", "/").replace("~0", "~") for part in path.split("/")[1:]]
+        node = target
+        for part in parents:
+            node = node.setdefault(part, {}) if create else node.get(part) or {}
+        return node, key
+
+    for operation in operations:
+        node, key = resolve(operation["path"], create=False)
+        if operation["op"] == "test" and node.get(key) != operation["value"]:
+            return False
+    for operation in operations:
+        node, key = resolve(operation["path"], create=True)
+        if operation["op"] in ("add", "replace"):
+            node[key] = operation["value"]
+        elif operation["op"] == "remove":
+            node.pop(key, None)
+    return True
@@ -0,0 +1,118 @@
+"""Minimal stand-in for a container registry used by the benchmarks.
+
+Answers HEAD and GET on the Registry v2 manifest endpoint
+(`/v2/<repository>/manifests/<tag or digest>`) with a Docker-Content-Digest
+header, from an in-memory tag table. With `require_token` it challenges
+anonymous requests the way Docker Hub does (401 with a Bearer
+WWW-Authenticate header) and hands out tokens at `/token`. An optional
+fixed delay is injected into every request to simulate registry latency.
+Manifest bodies are empty; only the digest is meaningful.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+import hashlib
+import json
+import re
+import threading
+import time
+
+MANIFEST_PATH_RE = re.compile(r"^/v2/(?P<repository>.+)/manifests/(?P<reference>[^/]+)$")
+INDEX_MEDIA_TYPE = "application/vnd.oci.image.index.v1+json"
+TOKEN = "fake-registry-token"
+
+
+class FakeRegistry:
+    """In-memory registry listening on a local port"""
+
+    def __init__(self, delay: float = 0.0, require_token: bool = True):
+        self.delay = delay
+        self.require_token = require_token
+        self.lock = threading.Lock()
+        self.tags: Dict[Tuple[str, str], str] = {}
+        self.manifest_requests = 0
+        self.token_requests = 0
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeRegistry":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+
+    def push(self, repository: str, tag: str) -> str:
+        """Point a tag at a new manifest and return its digest"""
+        with self.lock:
+            seed = f"{repository}:{tag}:{time.time_ns()}"
+            digest = f"sha256:{hashlib.sha256(seed.encode()).hexdigest()}"
+            self.tags[(repository, tag)] = digest
+        return digest
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, headers: Dict[str, str], body: bytes = b"") -> None:
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(body)
+
+            def _manifest(self) -> None:
+                if server.delay:
+                    time.sleep(server.delay)
+                path = urlparse(self.path).path
+                if path == "/token":
+                    with server.lock:
+                        server.token_requests += 1
+                    self._send(200, {"Content-Type": "application/json"}, json.dumps({"token": TOKEN}).encode())
+                    return
+
+                match = MANIFEST_PATH_RE.match(path)
+                if not match:
+                    self._send(404, {})
+                    return
+                with server.lock:
+                    server.manifest_requests += 1
+                if server.require_token and self.headers.get("Authorization") != f"Bearer {TOKEN}":
+                    host, port = server._server.server_address
+                    challenge = (
+                        f'Bearer realm="http://{host}:{port}/token",service="fake-registry",'
+                        f'scope="repository:{match.group("repository")}:pull"'
+                    )
+                    self._send(401, {"WWW-Authenticate": challenge})
+                    return
+
+                repository, reference = match.group("repository"), match.group("reference")
+                with server.lock:
+                    if reference.startswith("sha256:"):
+                        digest = reference if reference in server.tags.values() else None
+                    else:
+                        digest = server.tags.get((repository, reference))
+                if digest is None:
+                    self._send(404, {"Content-Type": "application/json"}, b'{"errors":[{"code":"MANIFEST_UNKNOWN"}]}')
+                    return
+                self._send(200, {"Content-Type": INDEX_MEDIA_TYPE, "Docker-Content-Digest": digest}, b"{}")
+
+            do_GET = _manifest
+            do_HEAD = _manifest
+
+        return Handler
@@ -0,0 +1,17 @@
+from kubernetes.config import kube_config
+import pytest
+
+from benchmarks.fake_apiserver import FakeApiServer
+from app.core.kubernetes_provider import kubernetes_provider
+
+
+@pytest.fixture
+def fake_apiserver(monkeypatch):
+    """A fake API server the Kubernetes backend is loaded against"""
+    server = FakeApiServer().start()
+    # The default location is read from KUBECONFIG when the package is imported
+    monkeypatch.setattr(kube_config, "KUBE_CONFIG_DEFAULT_LOCATION", server.write_kubeconfig())
+    kubernetes_provider.reset()
+    yield server
+    kubernetes_provider.reset()
+    server.stop()
@@ -0,0 +1,87 @@
+from types import SimpleNamespace
+import gzip
+import io
+import tarfile
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import pytest
+
+from app.core.database import get_db
+from app.routers import bundles as bundles_router
+from app.services import bundles
+from app.services.bundles import build_bundle, project_bundle_token, safe_bundle_path
+from app.services.object_store import LocalObjectStore
+
+FILES = [
+    {"name": "src/app.py", "content": "print('app')"},
+    {"name": "main.py", "content": "print('main')"},
+    {"name": "empty.txt", "content": ""},
+]
+
+
+def unpack(bundle: bytes):
+    with tarfile.open(fileobj=io.BytesIO(gzip.decompress(bundle))) as archive:
+        return {member.name: archive.extractfile(member).read().decode() for member in archive.getmembers()}
+
+
+def test_bundle_is_deterministic():
+    first = build_bundle(FILES)
+    time.sleep(1.1)  # A wall-clock mtime would change the bytes
+    assert build_bundle(list(reversed(FILES))) == first
+
+
+def test_bundle_keeps_paths_and_skips_empty_files():
+    assert unpack(build_bundle(FILES)) == {"main.py": "print('main')", "src/app.py": "print('app')"}
+
+
+@pytest.mark.parametrize("name,expected", [
+    ("main.py", "main.py"),
+    ("/abs/main.py", "abs/main.py"),
+    ("a/../b.py", "b.py"),
+    ("dir\\file.py", "dir/file.py"),
+    ("../escape.py", ""),
+    ("..", ""),
+    ("", ""),
+])
+def test_safe_bundle_path(name, expected):
+    assert safe_bundle_path(name) == expected
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    store = LocalObjectStore(str(tmp_path))
+    monkeypatch.setattr(bundles, "object_store", store)
+    monkeypatch.setattr(bundles_router, "object_store", store)
+    projects = {"p1": SimpleNamespace(id="p1", files=FILES)}
+
+    class Query:
+        def filter(self, condition):
+            self.project_id = condition.right.value
+            return self
+
+        def first(self):
+            return projects.get(self.project_id)
+
+    app = FastAPI()
+    app.include_router(bundles_router.router)
+    app.dependency_overrides[get_db] = lambda: SimpleNamespace(query=lambda model: Query())
+    return TestClient(app)
+
+
+def test_project_bundle_needs_its_own_token(client):
+    assert client.get("/internal/bundles/projects/p1").status_code == 403
+    assert client.get(f"/internal/bundles/projects/p1?token={project_bundle_token('p2')}").status_code == 403
+
+
+def test_missing_project_bundle_is_rebuilt_from_the_database(client):
+    response = client.get(f"/internal/bundles/projects/p1?token={project_bundle_token('p1')}")
+    assert response.status_code == 200
+    assert response.content == build_bundle(FILES)
+    assert response.headers["cache-control"] == "no-cache"
+
+
+def test_unknown_project_has_no_bundle(client):
+    response = client.get(f"/internal/bundles/projects/p9?token={project_bundle_token('p9')}")
+    assert response.status_code == 404
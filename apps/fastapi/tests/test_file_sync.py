@@ -0,0 +1,80 @@
+import asyncio
+import hashlib
+
+from app.services import file_sync
+from app.services.bundles import bundle_file_hashes
+from app.services.file_sync import RELOAD_MARKER, build_sync_script, diff_files, parse_sync_output
+
+OLD = [
+    {"name": "main.py", "content": "print(1)"},
+    {"name": "lib/util.py", "content": "x = 1"},
+    {"name": "gone.py", "content": "old"},
+]
+NEW = [
+    {"name": "main.py", "content": "print(2)"},
+    {"name": "lib/util.py", "content": "x = 1"},
+    {"name": "added.py", "content": "new"},
+    {"name": "blank.py", "content": ""},
+]
+
+
+def test_diff_against_pod_hashes():
+    changed, removed = diff_files(NEW, bundle_file_hashes(OLD))
+    assert changed == {"main.py": "print(2)", "added.py": "new"}
+    assert removed == ["gone.py"]
+
+
+def test_diff_without_hashes_sends_everything_and_removes_nothing():
+    changed, removed = diff_files(NEW)
+    assert set(changed) == {"main.py", "lib/util.py", "added.py"}
+    assert removed == []
+
+
+def test_resend_keeps_removals():
+    changed, removed = diff_files(NEW, bundle_file_hashes(OLD), resend=True)
+    assert set(changed) == {"main.py", "lib/util.py", "added.py"}
+    assert removed == ["gone.py"]
+
+
+def test_sync_script_quotes_paths_and_reads_exact_bundle_size():
+    script = build_sync_script(123, ["a b.py"], ["it's.py"], reload=False)
+    lines = script.splitlines()
+    assert lines[:2] == ["set -e", "cd /app/src"]
+    assert "head -c 123 | tar xzf -" in lines
+    assert "rm -f -- 'it'\"'\"'s.py'" in lines
+    assert "sha256sum -- 'a b.py'" in lines
+    assert not any(RELOAD_MARKER in line for line in lines)
+
+
+def test_sync_script_without_changes_skips_tar():
+    script = build_sync_script(0, [], ["old.py"], reload=False)
+    assert "tar" not in script and "sha256sum" not in script
+
+
+def test_parse_sync_output():
+    digest = hashlib.sha256(b"new").hexdigest()
+    hashes, reload_status = parse_sync_output(f"{digest}  added.py\n{RELOAD_MARKER}ok\n")
+    assert hashes == {"added.py": digest}
+    assert reload_status == "ok"
+
+
+def test_sync_confirms_against_hashes_and_reports_new_state(monkeypatch):
+    class FakeK8s:
+        async def list_running_project_pods(self, project_id):
+            return ["pod-1"]
+
+        async def exec_in_pod(self, pod_name, command, stdin=None, timeout_seconds=None):
+            # Echo the hashes of the changed files, as sha256sum in the pod would
+            return "".join(
+                f"{hashlib.sha256(content.encode()).hexdigest()}  {path}\n"
+                for path, content in sorted(file_sync.file_contents(NEW).items())
+                if path in command[2]
+            )
+
+    monkeypatch.setattr(file_sync, "k8s", FakeK8s())
+    result = asyncio.run(file_sync.sync_project_files("p1", NEW, bundle_file_hashes(OLD)))
+
+    assert result["confirmed"]
+    assert result["changed"] == ["added.py", "main.py"]
+    assert result["removed"] == ["gone.py"]
+    assert result["file_hashes"] == bundle_file_hashes(NEW)
@@ -0,0 +1,38 @@
+import asyncio
+
+import pytest
+
+from app.services import hibernation
+from app.services.object_store import LocalObjectStore
+
+
+class FakeK8s:
+    """Helper pod calls where the exec and the cleanup both fail"""
+
+    def __init__(self):
+        self.deleted = []
+
+    async def create_data_helper_pod(self, project_id, image):
+        return f"project-{project_id}-data-helper"
+
+    async def wait_for_pod_running(self, pod_name, timeout_seconds):
+        return None
+
+    async def exec_in_pod(self, pod_name, command, **kwargs):
+        raise RuntimeError("tar exited with 2")
+
+    async def delete_pod(self, pod_name):
+        self.deleted.append(pod_name)
+        raise ConnectionError("API server unreachable")
+
+
+def test_restore_error_is_not_hidden_by_helper_cleanup(monkeypatch, tmp_path):
+    store = LocalObjectStore(str(tmp_path))
+    digest = store.put(b"archive")
+    fake = FakeK8s()
+    monkeypatch.setattr(hibernation, "object_store", store)
+    monkeypatch.setattr(hibernation, "k8s", fake)
+
+    with pytest.raises(RuntimeError, match="tar exited"):
+        asyncio.run(hibernation.restore_project_data("p1", digest))
+    assert fake.deleted == ["project-p1-data-helper"]
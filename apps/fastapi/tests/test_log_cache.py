@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.core.kubernetes import KubernetesClient
+from app.core.log_cache import LogCache, ProjectLogBuffer
+
+
+def stamp(seconds_ago: float, text: str) -> str:
+    moment = datetime.now(timezone.utc) - timedelta(seconds=seconds_ago)
+    return f"{moment.strftime('%Y-%m-%dT%H:%M:%S.%f')}Z {text}"
+
+
+class FakeLogs:
+    """Pod log reads over a fixed list of lines, honouring tail_lines"""
+
+    def __init__(self, lines):
+        self.lines = lines
+        self.calls = []
+
+    def __call__(self, pod_name, tail_lines=None, since_seconds=None):
+        self.calls.append({"tail_lines": tail_lines, "since_seconds": since_seconds})
+        lines = self.lines
+        if since_seconds is not None:
+            cutoff = datetime.now(timezone.utc) - timedelta(seconds=since_seconds)
+            lines = [line for line in lines if line.split(" ", 1)[0] >= cutoff.strftime("%Y-%m-%dT%H:%M:%S")]
+        return lines[-tail_lines:] if tail_lines else list(lines)
+
+
+def make_cache(monkeypatch, logs, project_max_bytes=1 << 20):
+    monkeypatch.setattr(KubernetesClient, "read_pod_log_lines", staticmethod(logs))
+    cache = LogCache(project_max_bytes, 1 << 30)
+    monkeypatch.setattr(cache, "_first_pod_name", lambda project_id: "pod-1")
+    return cache
+
+
+def test_refresh_fetches_only_new_lines(monkeypatch):
+    logs = FakeLogs([stamp(30 - i, f"old {i}") for i in range(5)])
+    cache = make_cache(monkeypatch, logs)
+    assert cache.get_logs("p1", tail_lines=3).splitlines() == ["old 2", "old 3", "old 4"]
+
+    logs.lines.append(stamp(0, "new"))
+    assert cache.get_logs("p1", tail_lines=3).splitlines() == ["old 3", "old 4", "new"]
+    assert logs.calls[-1]["since_seconds"] is not None
+
+
+def test_refresh_after_a_long_gap_is_bounded_by_tail_lines(monkeypatch):
+    logs = FakeLogs([stamp(7200, "first")])
+    cache = make_cache(monkeypatch, logs)
+    cache.get_logs("p1", tail_lines=100)
+
+    # Hours of output since the last view
+    logs.lines.extend(stamp(3600 - i, f"line {i}") for i in range(1000))
+    fetched_before = cache.stats()["fetched_bytes"]
+    tail = cache.get_logs("p1", tail_lines=100).splitlines()
+
+    assert logs.calls[-1]["tail_lines"] == 100
+    assert tail == [f"line {i}" for i in range(900, 1000)]
+    assert cache.stats()["fetched_bytes"] - fetched_before < 100 * 64
+    # The buffer does not claim the gap between "first" and the new tail
+    assert "first" not in cache.get_logs("p1", tail_lines=101)
+
+
+def test_buffer_counts_bytes_not_characters():
+    buffer = ProjectLogBuffer("pod-1", max_bytes=1 << 20)
+    line = stamp(0, "héllo ✓")
+    buffer.append(line)
+    assert buffer.size == len(line.encode("utf-8")) + 1
+
+
+def test_buffer_drops_oldest_lines_over_its_byte_cap():
+    lines = [stamp(10 - i, "x" * 50) for i in range(10)]
+    line_bytes = len(lines[0].encode("utf-8")) + 1
+    buffer = ProjectLogBuffer("pod-1", max_bytes=line_bytes * 4)
+    for line in lines:
+        buffer.append(line)
+    assert list(buffer.lines) == lines[-4:]
+    assert buffer.size == line_bytes * 4
+
+
+def test_first_pod_name_skips_terminating_and_helper_pods(monkeypatch, fake_apiserver):
+    monkeypatch.setattr(settings, "KUBERNETES_INFORMER_ENABLED", False)
+
+    def pod(name, app, **metadata):
+        return {"metadata": {"name": name, "labels": {"app": app, "project-id": "p1"}, **metadata}}
+
+    fake_apiserver.add("pods", pod("p1-data-helper", "vibecode-data-helper"))
+    fake_apiserver.add("pods", pod("p1-a", "vibecode", deletionTimestamp="2026-01-01T00:00:00Z"))
+    fake_apiserver.add("pods", pod("p1-c", "vibecode"))
+    fake_apiserver.add("pods", pod("p1-b", "vibecode"))
+
+    assert LogCache(1 << 20, 1 << 30)._first_pod_name("p1") == "p1-b"
+    assert LogCache(1 << 20, 1 << 30)._first_pod_name("p2") is None
@@ -0,0 +1,48 @@
+from app.core.kubernetes import KubernetesClient
+
+
+def add_pod(server, name, project_id, lines):
+    server.add("pods", {
+        "metadata": {"name": name, "labels": {"app": "vibecode", "project-id": project_id}},
+        "spec": {"containers": []},
+        "status": {"phase": "Running"},
+        "_log": "".join(f"{line}\n" for line in lines),
+    })
+
+
+def test_log_sort_key_pads_fractions():
+    # RFC3339Nano drops trailing zeros, so ".5" must sort after ".123456789"
+    short = KubernetesClient.log_sort_key("2024-01-01T00:00:00.5Z b")
+    long = KubernetesClient.log_sort_key("2024-01-01T00:00:00.123456789Z a")
+    whole = KubernetesClient.log_sort_key("2024-01-01T00:00:00Z c")
+    assert whole < long < short
+
+
+def test_merged_logs_interleave_pods_by_timestamp(fake_apiserver):
+    add_pod(fake_apiserver, "pod-a", "p1", [
+        "2024-01-01T00:00:01Z a1",
+        "2024-01-01T00:00:03.5Z a2",
+    ])
+    add_pod(fake_apiserver, "pod-b", "p1", [
+        "2024-01-01T00:00:02.25Z b1",
+        "2024-01-01T00:00:03.25Z b2",
+    ])
+
+    merged = KubernetesClient.get_merged_pod_logs("p1").splitlines()
+
+    assert [line.rsplit(" ", 1)[1] for line in merged] == ["a1", "b1", "b2", "a2"]
+    assert merged[0].startswith("[pod-a] ")
+    assert merged[1].startswith("[pod-b] ")
+
+
+def test_merged_logs_keep_the_newest_lines_within_budget(fake_apiserver):
+    add_pod(fake_apiserver, "pod-a", "p1", [f"2024-01-01T00:00:0{i}Z a{i}" for i in range(0, 10, 2)])
+    add_pod(fake_apiserver, "pod-b", "p1", [f"2024-01-01T00:00:0{i}Z b{i}" for i in range(1, 10, 2)])
+
+    merged = KubernetesClient.get_merged_pod_logs("p1", max_lines=3).splitlines()
+
+    assert [line.rsplit(" ", 1)[1] for line in merged] == ["b7", "a8", "b9"]
+
+
+def test_merged_logs_without_pods(fake_apiserver):
+    assert KubernetesClient.get_merged_pod_logs("missing") == "No pods found for this project"
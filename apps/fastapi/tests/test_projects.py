@@ -0,0 +1,142 @@
+from types import SimpleNamespace
+import asyncio
+
+import pytest
+
+from app.services.scheduler import InsufficientCapacityError, ProvisioningScheduler
+
+# The router imports app.core.auth, which is not in every checkout
+projects = pytest.importorskip("app.routers.projects")
+
+PROVISIONED = {
+    "results": {
+        "pvc": {"name": "p1-pvc"},
+        "deployment": {"name": "p1"},
+        "service": {"name": "p1-svc"},
+    },
+    "container_image": "python:3.9-slim",
+    "container_port": 8080,
+}
+
+
+class FakeDb:
+    """Just enough of a Session for the background provisioning task"""
+
+    def __init__(self, *project_ids):
+        self.projects = {
+            project_id: SimpleNamespace(id=project_id, container_status="Queued", container_running=False)
+            for project_id in project_ids
+        }
+        self.commits = 0
+
+    def query(self, model):
+        db = self
+
+        class Query:
+            def filter(self, condition):
+                self.project_id = condition.right.value
+                return self
+
+            def first(self):
+                return db.projects.get(self.project_id)
+
+        return Query()
+
+    def close(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def commit(self):
+        self.commits += 1
+
+
+def create(db):
+    return projects.create_kubernetes_resources_for_project("p1", "owner", [], "python", db)
+
+
+def use_scheduler(monkeypatch, scheduler):
+    monkeypatch.setattr(projects, "provisioning_scheduler", scheduler)
+
+
+def test_rejected_provisioning_marks_the_project_failed(monkeypatch):
+    async def run(*args, **kwargs):
+        raise InsufficientCapacityError("limits.memory exceeds the namespace quota")
+
+    use_scheduler(monkeypatch, SimpleNamespace(run=run))
+    db = FakeDb("p1")
+    asyncio.run(create(db))
+    assert db.projects["p1"].container_status == "Failed"
+
+
+def test_failed_provisioning_marks_the_project_failed(monkeypatch):
+    async def provision(*args):
+        raise RuntimeError("deployment create failed")
+
+    monkeypatch.setattr(projects, "provision_project_resources", provision)
+    use_scheduler(monkeypatch, ProvisioningScheduler(1, 0, False, False, 5.0))
+    db = FakeDb("p1")
+    asyncio.run(create(db))
+    assert db.projects["p1"].container_status == "Failed"
+
+
+def test_provisioned_project_is_updated(monkeypatch):
+    async def provision(*args):
+        return PROVISIONED
+
+    monkeypatch.setattr(projects, "provision_project_resources", provision)
+    use_scheduler(monkeypatch, ProvisioningScheduler(1, 0, False, False, 5.0))
+    db = FakeDb("p1")
+    asyncio.run(create(db))
+    assert db.projects["p1"].container_status == "Creating"
+    assert db.projects["p1"].deployment_name == "p1"
+
+
+def test_deleting_a_queued_project_cancels_its_provisioning(monkeypatch):
+    scheduler = ProvisioningScheduler(1, 0, False, False, 5.0)
+    use_scheduler(monkeypatch, scheduler)
+    provisioned = []
+
+    async def provision(project_id, *args):
+        provisioned.append(project_id)
+        return PROVISIONED
+
+    monkeypatch.setattr(projects, "provision_project_resources", provision)
+    db = FakeDb("p1")
+
+    async def scenario():
+        gate = asyncio.Event()
+        # Another project holds the only slot, so p1 stays queued
+        busy = asyncio.create_task(scheduler.run("other", "owner", gate.wait))
+        task = asyncio.create_task(create(db))
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert scheduler.status("p1")["state"] == "queued"
+
+        del db.projects["p1"]
+        assert scheduler.cancel("p1")
+        await task
+        gate.set()
+        await busy
+
+    asyncio.run(scenario())
+    assert provisioned == []
+    assert scheduler.status("p1") is None
+    assert scheduler.stats()["cancelled"] == 1
+
+
+def test_project_deleted_while_provisioning_has_its_resources_removed(monkeypatch):
+    async def provision(*args):
+        return PROVISIONED
+
+    deleted = []
+
+    async def delete_resources(project_id):
+        deleted.append(project_id)
+
+    monkeypatch.setattr(projects, "provision_project_resources", provision)
+    monkeypatch.setattr(projects, "delete_kubernetes_resources_for_project", delete_resources)
+    use_scheduler(monkeypatch, ProvisioningScheduler(1, 0, False, False, 5.0))
+    asyncio.run(create(FakeDb()))
+    assert deleted == ["p1"]
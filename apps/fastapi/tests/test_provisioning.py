@@ -0,0 +1,136 @@
+from types import SimpleNamespace
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.services import provisioning
+from app.services.provisioning import ProvisioningError, ProvisioningPipeline, ProvisioningStep
+
+
+def step(name, log, depends_on=(), fail=False, delay=0.0, rollback=True):
+    async def action(deps):
+        await asyncio.sleep(delay)
+        log.append(("start", name, sorted(deps)))
+        if fail:
+            raise RuntimeError(f"{name} broke")
+        return f"{name}-result"
+
+    async def undo(result):
+        log.append(("rollback", name, result))
+
+    return ProvisioningStep(name, action, depends_on=depends_on, rollback=undo if rollback else None)
+
+
+def test_unknown_dependency_is_rejected():
+    with pytest.raises(ValueError, match="unknown step missing"):
+        ProvisioningPipeline([step("a", [], depends_on=["missing"])])
+
+
+def test_cycle_is_rejected():
+    log = []
+    with pytest.raises(ValueError, match="cycle"):
+        ProvisioningPipeline([
+            step("a", log, depends_on=["c"]),
+            step("b", log, depends_on=["a"]),
+            step("c", log, depends_on=["b"]),
+            step("d", log),
+        ])
+
+
+def test_steps_get_their_dependency_results():
+    log = []
+    pipeline = ProvisioningPipeline([
+        step("deployment", log, depends_on=["pvc", "configmap"]),
+        step("pvc", log),
+        step("configmap", log),
+    ])
+    outcome = asyncio.run(pipeline.run())
+    assert outcome["results"] == {
+        "pvc": "pvc-result", "configmap": "configmap-result", "deployment": "deployment-result",
+    }
+    assert log[-1] == ("start", "deployment", ["configmap", "pvc"])
+    assert set(outcome["timings"]) == {"pvc", "configmap", "deployment", "total"}
+
+
+def test_independent_steps_run_concurrently():
+    log = []
+    pipeline = ProvisioningPipeline([step(name, log, delay=0.1) for name in ("a", "b", "c")])
+    outcome = asyncio.run(pipeline.run())
+    # Three 100ms steps side by side, not one after another
+    assert outcome["timings"]["total"]["duration_ms"] < 250
+
+
+def test_failure_rolls_back_completed_steps_in_reverse_order():
+    log = []
+    pipeline = ProvisioningPipeline([
+        step("pvc", log),
+        step("service", log, delay=0.02),
+        step("bundle", log, rollback=False),
+        step("configmap", log, delay=0.05, fail=True),
+        step("slow", log, delay=0.1),
+        step("deployment", log, depends_on=["pvc", "configmap"]),
+    ])
+    with pytest.raises(ProvisioningError) as raised:
+        asyncio.run(pipeline.run())
+
+    error = raised.value
+    assert error.step == "configmap"
+    assert isinstance(error.error, RuntimeError)
+    # The step still running when configmap failed finished and is undone too;
+    # the deployment never started and the bundle has no rollback
+    assert error.rolled_back == ["slow", "service", "pvc"]
+    assert ("start", "deployment", ["configmap", "pvc"]) not in log
+    assert [entry for entry in log if entry[0] == "rollback"] == [
+        ("rollback", "slow", "slow-result"),
+        ("rollback", "service", "service-result"),
+        ("rollback", "pvc", "pvc-result"),
+    ]
+
+
+def test_a_failing_rollback_does_not_stop_the_others():
+    log = []
+
+    async def broken_rollback(result):
+        raise RuntimeError("delete failed")
+
+    pipeline = ProvisioningPipeline([
+        step("pvc", log),
+        ProvisioningStep("service", step("service", log).action, rollback=broken_rollback),
+        step("deployment", log, depends_on=["pvc", "service"], fail=True),
+    ])
+    with pytest.raises(ProvisioningError) as raised:
+        asyncio.run(pipeline.run())
+    assert raised.value.rolled_back == ["pvc"]
+
+
+def test_project_pipeline_rolls_back_only_what_it_created(monkeypatch):
+    deleted = []
+
+    async def created(name):
+        return {"name": name, "action": "created"}
+
+    async def existing(name):
+        return {"name": name, "action": "exists"}
+
+    async def create_deployment(project_id, **kwargs):
+        raise RuntimeError("deployment rejected")
+
+    async def delete_project_resource(kind, project_id):
+        deleted.append(kind)
+        return "deleted"
+
+    monkeypatch.setattr(settings, "FILE_DELIVERY_MODE", "configmap")
+    monkeypatch.setattr(provisioning, "k8s", SimpleNamespace(
+        create_pvc=lambda project_id, storage_size: existing("p1-pvc"),
+        create_configmap_for_files=lambda project_id, files: created("p1-files"),
+        create_service=lambda project_id, container_port: created("p1-svc"),
+        create_deployment=create_deployment,
+        delete_project_resource=delete_project_resource,
+    ))
+
+    with pytest.raises(ProvisioningError) as raised:
+        asyncio.run(provisioning.provision_project_resources("p1", [], "python"))
+    assert raised.value.step == "deployment"
+    # The PVC was already there, so it is kept
+    assert sorted(deleted) == ["configmap", "service"]
@@ -0,0 +1,38 @@
+import pytest
+
+from app.core.quantity import parse_quantity
+
+
+@pytest.mark.parametrize("quantity,expected", [
+    ("2", 2),
+    ("1.5", 1.5),
+    ("100m", 0.1),
+    ("250u", 0.00025),
+    ("1k", 1000),
+    ("2M", 2_000_000),
+    ("1G", 10**9),
+    ("128Mi", 128 * 2**20),
+    ("1Ki", 1024),
+    ("1Gi", 2**30),
+    ("2e3", 2000),
+    ("1E3", 1000),
+    (" 512Mi ", 512 * 2**20),
+])
+def test_parse_quantity(quantity, expected):
+    assert parse_quantity(quantity) == pytest.approx(expected)
+
+
+def test_exponent_is_not_exa():
+    # "1E" alone is an exa suffix, "1E3" an exponent
+    assert parse_quantity("1E") == 10**18
+
+
+@pytest.mark.parametrize("quantity", [None, "", "lots", "1Xi", "1 Gi"])
+def test_invalid_quantity_raises_without_a_default(quantity):
+    with pytest.raises(ValueError):
+        parse_quantity(quantity)
+
+
+@pytest.mark.parametrize("quantity", [None, "", "lots"])
+def test_invalid_quantity_uses_the_default(quantity):
+    assert parse_quantity(quantity, default=7) == 7
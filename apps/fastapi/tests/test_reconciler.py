@@ -0,0 +1,95 @@
+from kubernetes.client.rest import ApiException
+
+from app.core import reconciler
+from app.core.reconciler import SPEC_HASH_ANNOTATION, compute_spec_hash, reconcile
+
+
+def manifest():
+    return {
+        "apiVersion": "v1",
+        "kind": "ConfigMap",
+        "metadata": {"name": "project-p1-configmap", "labels": {"project-id": "p1"}},
+        "data": {"main.py": "print(1)"},
+    }
+
+
+class FakeObject:
+    """A single object behind read/create/patch callables"""
+
+    def __init__(self, live=None):
+        self.live = live
+        self.reads = 0
+        self.created = []
+        self.patched = []
+
+    def read(self):
+        self.reads += 1
+        if self.live is None:
+            raise ApiException(status=404)
+        return self.live
+
+    def create(self, body):
+        self.created.append(body)
+        self.live = body
+        return body
+
+    def patch(self, live, body):
+        self.patched.append(body)
+        self.live = body
+        return body
+
+
+def run(obj):
+    return reconcile("configmap", manifest(), obj.read, obj.create, obj.patch, lambda o: o["metadata"]["name"])
+
+
+def live_copy(**metadata):
+    body = manifest()
+    body["metadata"]["annotations"] = {SPEC_HASH_ANNOTATION: compute_spec_hash(manifest())}
+    body["metadata"].update(metadata)
+    return body
+
+
+def test_missing_object_is_created():
+    obj = FakeObject()
+    assert run(obj) == ("created", "project-p1-configmap")
+    assert len(obj.created) == 1
+
+
+def test_matching_hash_is_unchanged():
+    obj = FakeObject(live_copy())
+    assert run(obj) == ("unchanged", "project-p1-configmap")
+    assert not obj.created and not obj.patched
+
+
+def test_changed_spec_is_patched():
+    live = live_copy()
+    live["metadata"]["annotations"][SPEC_HASH_ANNOTATION] = "stale"
+    obj = FakeObject(live)
+    assert run(obj)[0] == "patched"
+
+
+def test_terminating_object_is_recreated_once_gone(monkeypatch):
+    monkeypatch.setattr(reconciler, "TERMINATING_POLL_INTERVAL", 0)
+    obj = FakeObject(live_copy(deletionTimestamp="2026-01-01T00:00:00Z"))
+    original_read = obj.read
+
+    def read():
+        # Finalizers release the object after a few polls
+        if obj.reads == 3:
+            obj.live = None
+        return original_read()
+
+    obj.read = read
+    assert run(obj)[0] == "created"
+    assert obj.reads > 3
+
+
+def test_terminating_cache_entry_is_not_trusted(monkeypatch):
+    terminating = live_copy(deletionTimestamp="2026-01-01T00:00:00Z")
+    monkeypatch.setattr(reconciler, "_cache_lookup", lambda kind, project_id, name: {
+        "spec_hash": reconciler.live_spec_hash(terminating), "summary": "cached",
+    })
+    monkeypatch.setattr(reconciler, "TERMINATING_POLL_INTERVAL", 0)
+    obj = FakeObject(None)
+    assert run(obj)[0] == "created"
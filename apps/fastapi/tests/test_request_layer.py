@@ -0,0 +1,51 @@
+from kubernetes.client.rest import ApiException
+import pytest
+
+from app.core.request_layer import RequestLayer
+
+
+def make_layer() -> RequestLayer:
+    return RequestLayer(
+        read_qps=0, read_burst=1, write_qps=0, write_burst=1,
+        max_attempts=3, base_delay=0, max_delay=0,
+    )
+
+
+def failing_once(status: int):
+    calls = []
+
+    def send():
+        calls.append(1)
+        if len(calls) == 1:
+            raise ApiException(status=status)
+        return "ok"
+
+    return send, calls
+
+
+def test_dict_patch_is_retried_after_server_error():
+    # Strategic and JSON merge patches arrive with a dict body
+    layer = make_layer()
+    send, calls = failing_once(503)
+
+    assert layer.execute("PATCH", {"spec": {"replicas": 0}}, send) == "ok"
+    assert len(calls) == 2
+    assert layer.stats()["retries_by_reason"] == {"503": 1}
+
+
+def test_json_patch_is_not_retried_after_server_error():
+    layer = make_layer()
+    send, calls = failing_once(503)
+
+    with pytest.raises(ApiException):
+        layer.execute("PATCH", [{"op": "test", "path": "/spec/replicas", "value": 1}], send)
+    assert len(calls) == 1
+
+
+def test_json_patch_is_retried_when_throttled():
+    # A 429 is rejected before the server acts, so any request may be resent
+    layer = make_layer()
+    send, calls = failing_once(429)
+
+    assert layer.execute("PATCH", [{"op": "replace", "path": "/spec/replicas", "value": 1}], send) == "ok"
+    assert len(calls) == 2
@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+from benchmarks.fake_registry import FakeRegistry
+from app.core.config import settings
+from app.services.runtime_images import (
+    ImageReference,
+    RuntimeImageManager,
+    parse_image_reference,
+    parse_registry_urls,
+)
+
+DIGEST = "sha256:" + "ab" * 32
+
+
+@pytest.mark.parametrize("image,expected", [
+    ("python:3.9-slim", ("docker.io", "library/python", "3.9-slim", None)),
+    ("node", ("docker.io", "library/node", "latest", None)),
+    ("bitnami/redis:7", ("docker.io", "bitnami/redis", "7", None)),
+    ("ghcr.io/org/app:v1", ("ghcr.io", "org/app", "v1", None)),
+    ("registry:5000/team/app", ("registry:5000", "team/app", "latest", None)),
+    ("localhost/app:dev", ("localhost", "app", "dev", None)),
+    (f"python@{DIGEST}", ("docker.io", "library/python", None, DIGEST)),
+    (f"python:3.9-slim@{DIGEST}", ("docker.io", "library/python", "3.9-slim", DIGEST)),
+    (f"registry:5000/app:1@{DIGEST}", ("registry:5000", "app", "1", DIGEST)),
+])
+def test_parse_image_reference(image, expected):
+    assert parse_image_reference(image) == ImageReference(*expected)
+
+
+def test_parse_registry_urls():
+    spec = " docker.io=http://mirror:5000/ ,bad, =http://x,ghcr.io=https://ghcr.io"
+    assert parse_registry_urls(spec) == {"docker.io": "http://mirror:5000", "ghcr.io": "https://ghcr.io"}
+
+
+@pytest.fixture
+def registry():
+    server = FakeRegistry().start()
+    yield server
+    server.stop()
+
+
+def make_manager(registry, images):
+    return RuntimeImageManager(images, {"docker.io": registry.url}, timeout=5.0, interval=60.0)
+
+
+def test_refresh_resolves_tags_with_one_token_per_repository(monkeypatch, registry):
+    monkeypatch.setattr(settings, "RUNTIME_IMAGE_PINNING_ENABLED", True)
+    digest = registry.push("library/python", "3.9-slim")
+    manager = make_manager(registry, {"python": "python:3.9-slim"})
+
+    result = asyncio.run(manager.refresh())
+    assert result == {"changed": ["python:3.9-slim"], "errors": {}}
+    assert manager.pinned("python:3.9-slim") == f"python:3.9-slim@{digest}"
+    assert registry.token_requests == 1
+
+    # The cached token is sent up front, and an unmoved tag changes nothing
+    requests = registry.manifest_requests
+    assert asyncio.run(manager.refresh())["changed"] == []
+    assert registry.manifest_requests == requests + 1
+    assert registry.token_requests == 1
+
+    moved = registry.push("library/python", "3.9-slim")
+    assert asyncio.run(manager.refresh())["changed"] == ["python:3.9-slim"]
+    assert manager.pinned("python:3.9-slim") == f"python:3.9-slim@{moved}"
+
+
+def test_failed_resolution_keeps_the_previous_digest(monkeypatch, registry):
+    monkeypatch.setattr(settings, "RUNTIME_IMAGE_PINNING_ENABLED", True)
+    digest = registry.push("library/node", "14-alpine")
+    manager = make_manager(registry, {"node": "node:14-alpine", "go": "golang:1.17-alpine"})
+
+    result = asyncio.run(manager.refresh())
+    assert result["changed"] == ["node:14-alpine"]
+    assert "golang:1.17-alpine" in result["errors"]
+    # Unresolved images run by tag
+    assert manager.pinned("golang:1.17-alpine") == "golang:1.17-alpine"
+
+    registry.tags.clear()
+    result = asyncio.run(manager.refresh())
+    assert "node:14-alpine" in result["errors"]
+    assert manager.pinned("node:14-alpine") == f"node:14-alpine@{digest}"
+
+
+def test_pinned_leaves_digest_references_and_disabled_pinning_alone(monkeypatch, registry):
+    registry.push("library/python", "3.9-slim")
+    manager = make_manager(registry, {"python": "python:3.9-slim"})
+    asyncio.run(manager.refresh())
+
+    monkeypatch.setattr(settings, "RUNTIME_IMAGE_PINNING_ENABLED", False)
+    assert manager.pinned("python:3.9-slim") == "python:3.9-slim"
+    monkeypatch.setattr(settings, "RUNTIME_IMAGE_PINNING_ENABLED", True)
+    assert manager.pinned(f"python:3.9-slim@{DIGEST}") == f"python:3.9-slim@{DIGEST}"
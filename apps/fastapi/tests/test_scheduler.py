@@ -0,0 +1,200 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services.scheduler import (
+    BACKGROUND,
+    INTERACTIVE,
+    InsufficientCapacityError,
+    ProvisioningCancelledError,
+    ProvisioningScheduler,
+    parse_owner_weights,
+)
+
+GI = 2**30
+
+
+def make_scheduler(max_concurrency=1, interactive_reserved=0, weights=None, capacity=None):
+    checks = capacity is not None
+    scheduler = ProvisioningScheduler(max_concurrency, interactive_reserved, checks, checks, 60.0, weights)
+    if capacity is not None:
+        # A fresh snapshot, so the scheduler never reads the cluster
+        scheduler._capacity = capacity
+        scheduler._capacity_at = time.monotonic()
+    return scheduler
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def dispatch_order(scheduler, requests):
+    """Queue (project, owner, interactive) requests behind a busy slot and record their start order"""
+    started = []
+
+    def work(project_id):
+        async def run():
+            started.append(project_id)
+        return run
+
+    async def scenario():
+        gate = asyncio.Event()
+        busy = asyncio.create_task(scheduler.run("busy", "other", gate.wait))
+        await settle()
+        waiters = [
+            asyncio.create_task(scheduler.run(project_id, owner_id, work(project_id), interactive=interactive))
+            for project_id, owner_id, interactive in requests
+        ]
+        await settle()
+        gate.set()
+        await asyncio.gather(busy, *waiters)
+
+    asyncio.run(scenario())
+    return started
+
+
+def test_owners_take_turns():
+    requests = [("a1", "a", False), ("a2", "a", False), ("a3", "a", False), ("b1", "b", False)]
+    assert dispatch_order(make_scheduler(), requests) == ["a1", "b1", "a2", "a3"]
+
+
+def test_weights_give_an_owner_more_turns():
+    requests = [(f"a{i}", "a", False) for i in range(1, 5)] + [("b1", "b", False), ("b2", "b", False)]
+    order = dispatch_order(make_scheduler(weights={"a": 2}), requests)
+    assert order == ["a1", "b1", "a2", "a3", "b2", "a4"]
+
+
+def test_interactive_goes_before_background():
+    requests = [("bg1", "a", False), ("bg2", "b", False), ("start", "c", True)]
+    assert dispatch_order(make_scheduler(), requests) == ["start", "bg1", "bg2"]
+
+
+def test_background_cannot_take_reserved_slots():
+    scheduler = make_scheduler(max_concurrency=2, interactive_reserved=1)
+    scheduler._running[BACKGROUND] = 1
+    assert not scheduler._has_slot(BACKGROUND)
+    assert scheduler._has_slot(INTERACTIVE)
+    scheduler._running[INTERACTIVE] = 1
+    assert not scheduler._has_slot(INTERACTIVE)
+
+
+def test_background_always_keeps_a_slot():
+    assert make_scheduler(max_concurrency=2, interactive_reserved=5).interactive_reserved == 1
+    assert make_scheduler(max_concurrency=1, interactive_reserved=1).interactive_reserved == 0
+
+
+def test_queue_position_and_wait_estimate():
+    scheduler = make_scheduler()
+
+    async def noop():
+        pass
+
+    async def scenario():
+        gate = asyncio.Event()
+        busy = asyncio.create_task(scheduler.run("busy", "other", gate.wait))
+        await settle()
+        waiters = [
+            asyncio.create_task(scheduler.run(project_id, owner_id, noop, interactive=interactive))
+            for project_id, owner_id, interactive in [
+                ("a1", "a", False), ("a2", "a", False), ("b1", "b", False), ("start", "c", True),
+            ]
+        ]
+        await settle()
+        statuses = {project_id: scheduler.status(project_id) for project_id in ("a1", "a2", "b1", "start")}
+        assert scheduler.status("busy")["state"] == "running"
+        gate.set()
+        await asyncio.gather(busy, *waiters)
+        return statuses
+
+    statuses = asyncio.run(scenario())
+    # The interactive request goes first, then a and b alternate
+    assert {key: status["position"] for key, status in statuses.items()} == {
+        "start": 0, "a1": 1, "b1": 2, "a2": 3,
+    }
+    # One slot and the default duration of 5s per request ahead
+    assert statuses["a2"]["estimated_wait_seconds"] == 20.0
+    assert scheduler.status("a1") is None
+
+
+def test_wait_estimate_counts_only_usable_slots():
+    scheduler = make_scheduler(max_concurrency=4, interactive_reserved=2)
+    # Interactive requests may use all four slots, background ones two
+    assert scheduler._estimate_wait(INTERACTIVE, 3) == 5.0
+    assert scheduler._estimate_wait(BACKGROUND, 3) == 10.0
+
+
+def test_a_request_that_never_fits_is_rejected():
+    capacity = {
+        "quota": {"limits.memory": 8 * GI},
+        "quota_hard": {"limits.memory": 8 * GI},
+        "nodes": [{"cpu": 4, "memory": 16 * GI, "pods": 10, "allocatable": {"cpu": 4, "memory": 16 * GI}}],
+    }
+    scheduler = make_scheduler(capacity=capacity)
+
+    async def noop():
+        return "done"
+
+    async def scenario():
+        with pytest.raises(InsufficientCapacityError, match="limits.memory"):
+            await scheduler.run("big", "a", noop, cost={"limits.memory": 16 * GI})
+        with pytest.raises(InsufficientCapacityError, match="any node"):
+            await scheduler.run("wide", "a", noop, cost={"requests.cpu": 8})
+        # Requests behind a rejected one are not held up
+        return await scheduler.run("small", "a", noop, cost={"limits.memory": GI, "requests.cpu": 1})
+
+    assert asyncio.run(scenario()) == "done"
+    assert scheduler.stats()["rejected"] == 2
+    assert capacity["quota"]["limits.memory"] == 7 * GI
+    assert capacity["nodes"][0]["pods"] == 9
+
+
+def test_a_request_without_capacity_waits_until_its_timeout():
+    capacity = {
+        "quota": {"pods": 0},
+        "quota_hard": {"pods": 10},
+        "nodes": None,
+    }
+    scheduler = make_scheduler(capacity=capacity)
+
+    async def noop():
+        pass
+
+    async def scenario():
+        with pytest.raises(asyncio.TimeoutError):
+            await scheduler.run("p1", "a", noop, cost={"pods": 1}, timeout=0.05)
+
+    asyncio.run(scenario())
+    stats = scheduler.stats()
+    assert stats["timed_out"] == 1
+    assert stats["waiting_for_capacity"]
+    assert scheduler.status("p1") is None
+
+
+def test_cancel_withdraws_only_queued_requests():
+    scheduler = make_scheduler()
+
+    async def noop():
+        pass
+
+    async def scenario():
+        gate = asyncio.Event()
+        busy = asyncio.create_task(scheduler.run("busy", "a", gate.wait))
+        queued = asyncio.create_task(scheduler.run("p1", "b", noop))
+        await settle()
+        assert not scheduler.cancel("busy")
+        assert scheduler.cancel("p1")
+        assert not scheduler.cancel("p1")
+        with pytest.raises(ProvisioningCancelledError):
+            await queued
+        gate.set()
+        await busy
+
+    asyncio.run(scenario())
+    assert scheduler.stats()["cancelled"] == 1
+    assert scheduler.stats()["completed"] == 1
+
+
+def test_parse_owner_weights_skips_malformed_entries():
+    assert parse_owner_weights("a=2, b=0.5,c=0,d=x,=3,,e") == {"a": 2.0, "b": 0.5}